@@ -27,6 +27,7 @@ CREATE TABLE `articulos` (
   `ubicacion` enum('nivel_1','nivel_2','planta_baja','estante_compras') DEFAULT NULL,
   PRIMARY KEY (`id_articulo`),
   KEY `id_proveedor_idx` (`proveedor`),
+  KEY `idx_articulos_nombre` (`nombre`),
   CONSTRAINT `id_proveedor` FOREIGN KEY (`proveedor`) REFERENCES `proveedores` (`id_proveedor`)
 ) ENGINE=InnoDB AUTO_INCREMENT=5 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci
 
@@ -48,6 +49,8 @@ CREATE TABLE `movimientos` (
   `responsable` varchar(45) DEFAULT NULL,
   PRIMARY KEY (`id_movimiento`),
   KEY `id_proyecto` (`id_proyecto`),
+  KEY `idx_movimientos_tipo_fecha` (`tipo`,`fecha_hora`),
+  KEY `idx_movimientos_proyecto_fecha` (`id_proyecto`,`fecha_hora`),
   CONSTRAINT `movimientos_ibfk_1` FOREIGN KEY (`id_proyecto`) REFERENCES `proyectos` (`id_proyecto`)
 ) ;
 CREATE TABLE `stock_puntas` (
@@ -56,8 +59,10 @@ CREATE TABLE `stock_puntas` (
   `nombre_punta` varchar(45) DEFAULT NULL,
   `longitud` decimal(10,2) NOT NULL,
   `color` varchar(30) DEFAULT NULL,
+  `disponible` tinyint(1) NOT NULL DEFAULT '1',
   PRIMARY KEY (`id_punta`),
   KEY `inventario_stock_ibfk_1` (`id_articulo`),
+  KEY `idx_stock_puntas_articulo_disponible` (`id_articulo`,`disponible`),
   CONSTRAINT `stock_puntas_ibfk_1` FOREIGN KEY (`id_articulo`) REFERENCES `articulos` (`id_articulo`)
 ) ;
 
@@ -76,5 +81,14 @@ CREATE TABLE `detalle_movimientos` (
   CONSTRAINT `detalle_movimientos_ibfk_3` FOREIGN KEY (`id_articulo`) REFERENCES `articulos` (`id_articulo`)
 ) ;
 
-
-
+CREATE TABLE `resumen_movimientos_diario` (
+  `id_proyecto` int NOT NULL,
+  `id_articulo` int NOT NULL,
+  `tipo_movimiento` enum('entrada','salida') NOT NULL,
+  `dia` date NOT NULL,
+  `cantidad` double NOT NULL DEFAULT '0',
+  PRIMARY KEY (`id_proyecto`,`id_articulo`,`tipo_movimiento`,`dia`),
+  KEY `resumen_movimientos_diario_ibfk_1` (`id_articulo`),
+  CONSTRAINT `resumen_movimientos_diario_ibfk_1` FOREIGN KEY (`id_articulo`) REFERENCES `articulos` (`id_articulo`),
+  CONSTRAINT `resumen_movimientos_diario_ibfk_2` FOREIGN KEY (`id_proyecto`) REFERENCES `proyectos` (`id_proyecto`)
+) ;
@@ -0,0 +1,355 @@
+"""
+cache.py - Caché de lecturas versionada por escrituras de inventario
+
+Mantiene una "versión de datos" que crece de forma monótona cada vez que una
+escritura modifica el inventario. Las funciones de lectura de data.py se
+cachean con esa versión como parte de la llave, así que una escritura invalida
+todas las lecturas previas sin tener que limpiar cada caché por separado.
+
+El almacenamiento es intercambiable (backend):
+- "memory": LRU dentro del proceso (valor por defecto).
+- "sqlite": archivo SQLite compartido por todos los procesos de la máquina.
+- "redis": servidor Redis (o cualquier cliente compatible) compartido entre workers.
+
+Con los backends compartidos la versión de datos también vive en el backend,
+por lo que una escritura en un worker invalida la caché de todos los demás.
+
+Configuración opcional en .streamlit/secrets.toml:
+
+    [cache]
+    backend = "sqlite"          # memory | sqlite | redis
+    path = "cache/almacen.db"   # solo sqlite
+    url = "redis://localhost:6379/0"  # solo redis
+    max_entries = 512           # solo memory
+"""
+import functools
+import hashlib
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import streamlit as st
+
+DEFAULT_CACHE_TTL = 300
+DATA_VERSION_KEY = "data_version"
+
+
+# =============================================================================
+# BACKENDS
+# =============================================================================
+
+class CacheBackend:
+    """
+    Interfaz que implementan los backends de caché.
+
+    Los valores son bytes ya serializados; los contadores son enteros que
+    deben incrementarse de forma atómica entre todos los clientes del backend.
+    """
+
+    def get(self, key):
+        """Devuelve el valor guardado en key (bytes) o None si no existe o expiró."""
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        """Guarda value (bytes) en key durante ttl segundos."""
+        raise NotImplementedError
+
+    def get_counter(self, key):
+        """Devuelve el valor actual del contador key (0 si no existe)."""
+        raise NotImplementedError
+
+    def incr(self, key):
+        """Incrementa atómicamente el contador key y devuelve el nuevo valor."""
+        raise NotImplementedError
+
+
+class LRUCacheBackend(CacheBackend):
+    """Caché LRU en memoria, local al proceso."""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_counter(self, key):
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Caché en un archivo SQLite compartido por todos los procesos de la máquina.
+
+    Usa modo WAL para que las lecturas de un worker no bloqueen las escrituras
+    de otro. Cada hilo abre su propia conexión.
+    """
+
+    PRUNE_EVERY = 200
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._sets = 0
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_counters ("
+                "key TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._connection().execute(
+            "SELECT value FROM cache_entries WHERE key = ? AND expires_at >= ?",
+            (key, time.time()),
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, now + ttl),
+            )
+            self._sets += 1
+            if self._sets % self.PRUNE_EVERY == 0:
+                conn.execute("DELETE FROM cache_entries WHERE expires_at < ?", (now,))
+
+    def get_counter(self, key):
+        row = self._connection().execute(
+            "SELECT value FROM cache_counters WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def incr(self, key):
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO cache_counters (key, value) VALUES (?, 1) "
+                "ON CONFLICT(key) DO UPDATE SET value = value + 1",
+                (key,),
+            )
+            return conn.execute(
+                "SELECT value FROM cache_counters WHERE key = ?", (key,)
+            ).fetchone()[0]
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Caché en Redis compartida por todos los workers.
+
+    Acepta un cliente ya construido con la interfaz de redis-py (get, set con
+    ex=, incr); así puede usarse un sustituto local en pruebas. Si no se pasa
+    cliente, se crea uno con redis.Redis.from_url(url).
+    """
+
+    def __init__(self, client=None, url=None, prefix="almacen:"):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError(
+                    "El backend de caché 'redis' requiere el paquete redis (pip install redis)."
+                ) from e
+            client = redis.Redis.from_url(url or "redis://localhost:6379/0")
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, value, ex=int(ttl))
+
+    def get_counter(self, key):
+        value = self.client.get(self.prefix + key)
+        return int(value) if value is not None else 0
+
+    def incr(self, key):
+        return int(self.client.incr(self.prefix + key))
+
+
+# =============================================================================
+# SELECCIÓN DE BACKEND
+# =============================================================================
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def _read_cache_config():
+    try:
+        return dict(st.secrets.get("cache", {}))
+    except FileNotFoundError:
+        return {}
+
+
+def create_cache_backend(config):
+    """
+    Construye un backend de caché a partir de la sección [cache] de secrets.
+
+    Args:
+        config (Mapping): Configuración con la llave "backend" y sus opciones.
+
+    Returns:
+        CacheBackend: Backend configurado.
+
+    Raises:
+        ValueError: Si el nombre de backend no es válido.
+    """
+    name = config.get("backend", "memory")
+    if name == "memory":
+        return LRUCacheBackend(max_entries=int(config.get("max_entries", 512)))
+    if name == "sqlite":
+        return SQLiteCacheBackend(config.get("path", "cache/almacen_cache.db"))
+    if name == "redis":
+        return RedisCacheBackend(
+            url=config.get("url"), prefix=config.get("prefix", "almacen:")
+        )
+    raise ValueError(f"Backend de caché desconocido: {name}")
+
+
+def get_cache_backend():
+    """
+    Devuelve el backend de caché del proceso, creándolo la primera vez.
+
+    Returns:
+        CacheBackend: Backend activo.
+    """
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_cache_backend(_read_cache_config())
+    return _backend
+
+
+def set_cache_backend(backend):
+    """
+    Reemplaza el backend de caché del proceso (p. ej. en scripts o pruebas).
+
+    Args:
+        backend (CacheBackend): Backend a utilizar.
+    """
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+# =============================================================================
+# VERSIÓN DE DATOS Y DECORADOR
+# =============================================================================
+
+def get_data_version():
+    """
+    Devuelve la versión actual de los datos de inventario.
+
+    Returns:
+        int: Versión vigente.
+    """
+    return get_cache_backend().get_counter(DATA_VERSION_KEY)
+
+
+def bump_data_version():
+    """
+    Incrementa la versión de datos tras una escritura confirmada.
+
+    Con un backend compartido el incremento es visible para todos los workers.
+
+    Returns:
+        int: Nueva versión.
+    """
+    return get_cache_backend().incr(DATA_VERSION_KEY)
+
+
+def _make_cache_key(fn, data_version, args, kwargs):
+    digest = hashlib.sha1(
+        pickle.dumps((args, sorted(kwargs.items())), protocol=pickle.HIGHEST_PROTOCOL)
+    ).hexdigest()
+    return f"{fn.__module__}.{fn.__qualname__}:{data_version}:{digest}"
+
+
+def versioned_cache(ttl=DEFAULT_CACHE_TTL):
+    """
+    Decorador que cachea una función de lectura por (versión de datos, argumentos).
+
+    Si el backend falla (p. ej. Redis no disponible), la función se ejecuta
+    directamente contra la base de datos en lugar de propagar el error.
+
+    La función decorada debe leer con utils.get_cached_read_session(): la
+    versión se lee antes de consultar, y la sesión compartida del rerun puede
+    conservar un snapshot anterior a una escritura ya confirmada por otro
+    usuario. Ese resultado quedaría guardado bajo la versión nueva para todos;
+    get_cached_read_session() solo devuelve la sesión del rerun cuando la
+    versión no ha cambiado desde que se abrió.
+
+    Args:
+        ttl (int): Segundos que una entrada permanece en caché como máximo.
+
+    Returns:
+        Callable: Decorador para funciones de lectura.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            backend = get_cache_backend()
+            try:
+                key = _make_cache_key(fn, get_data_version(), args, kwargs)
+                cached = backend.get(key)
+            except Exception as e:
+                print(f"Error al leer caché de {fn.__qualname__}: {e}")
+                return fn(*args, **kwargs)
+
+            if cached is not None:
+                return pickle.loads(cached)
+
+            result = fn(*args, **kwargs)
+            try:
+                backend.set(key, pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL), ttl)
+            except Exception as e:
+                print(f"Error al escribir caché de {fn.__qualname__}: {e}")
+            return result
+
+        return wrapper
+
+    return decorator
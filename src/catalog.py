@@ -0,0 +1,149 @@
+"""
+catalog.py - Índice en memoria del catálogo de artículos
+
+Guarda una fila compacta (__slots__) por artículo y tres índices para
+búsquedas O(1): nombre → id, id → fila y num_catalogo → id.
+El catálogo se construye una vez desde data.py y se parcha en sitio cuando
+una escritura confirma cambios, en lugar de volver a consultar MySQL.
+También mantiene el índice de búsqueda de search.py, que se construye la
+primera vez que se usa.
+"""
+import threading
+
+from search import ArticleSearchIndex
+
+
+class ArticuloRow:
+    """Fila de solo lectura de un artículo, con los mismos atributos que Articulos."""
+
+    __slots__ = (
+        "id_articulo",
+        "nombre",
+        "num_catalogo",
+        "cantidad_en_stock",
+        "unidad_medida",
+        "es_cable",
+        "tipo",
+        "categoria",
+        "almacen",
+        "ubicacion",
+        "stock_minimo",
+        "precio_unitario",
+        "proveedor",
+    )
+
+    def __init__(self, **values):
+        for field in self.__slots__:
+            setattr(self, field, values.get(field))
+
+    def __repr__(self):
+        return f"ArticuloRow(id_articulo={self.id_articulo!r}, nombre={self.nombre!r})"
+
+
+class ArticleCatalog:
+    """
+    Catálogo de artículos indexado por id, nombre y número de catálogo.
+
+    Si hay nombres o números de catálogo repetidos, el índice apunta al
+    artículo con menor id, igual que una consulta .first() ordenada por id.
+    """
+
+    def __init__(self, rows=(), version=0):
+        self.version = version
+        self._rows = {}
+        self._id_by_name = {}
+        self._id_by_num_catalogo = {}
+        self._lock = threading.Lock()
+        self._search_index = None
+        for row in sorted(rows, key=lambda r: r.id_articulo):
+            self._index(row)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _index(self, row):
+        self._rows[row.id_articulo] = row
+        if row.nombre is not None:
+            self._id_by_name.setdefault(row.nombre, row.id_articulo)
+        if row.num_catalogo:
+            self._id_by_num_catalogo.setdefault(row.num_catalogo, row.id_articulo)
+
+    # --- Consultas ---------------------------------------------------------
+
+    def by_id(self, id_articulo):
+        """Devuelve la fila del artículo con ese id o None."""
+        return self._rows.get(id_articulo)
+
+    def by_name(self, nombre):
+        """Devuelve la fila del artículo con ese nombre o None."""
+        id_articulo = self._id_by_name.get(nombre)
+        return self._rows.get(id_articulo) if id_articulo is not None else None
+
+    def by_num_catalogo(self, num_catalogo):
+        """Devuelve la fila del artículo con ese número de catálogo o None."""
+        id_articulo = self._id_by_num_catalogo.get(num_catalogo)
+        return self._rows.get(id_articulo) if id_articulo is not None else None
+
+    def rows(self):
+        """Devuelve una lista con todas las filas del catálogo."""
+        return list(self._rows.values())
+
+    def search(self, query, limit=20, fuzzy=False):
+        """
+        Busca artículos por nombre o número de catálogo, sin importar acentos ni mayúsculas.
+
+        Args:
+            query (str): Texto buscado.
+            limit (int | None): Máximo de resultados; None para todos.
+            fuzzy (bool): Si ninguno coincide, devolver los más parecidos.
+
+        Returns:
+            list[ArticuloRow]: Filas ordenadas por relevancia.
+        """
+        index = self._search_index
+        if index is None:
+            with self._lock:
+                if self._search_index is None:
+                    self._search_index = ArticleSearchIndex(
+                        (row.id_articulo, row.nombre, row.num_catalogo)
+                        for row in self._rows.values()
+                    )
+                index = self._search_index
+        rows = self._rows
+        return [rows[i] for i in index.search(query, limit, fuzzy) if i in rows]
+
+    # --- Parches tras escrituras ---------------------------------------------
+
+    def upsert(self, row):
+        """Agrega o reemplaza la fila de un artículo y actualiza los índices."""
+        with self._lock:
+            if row.id_articulo in self._rows:
+                # Un cambio de nombre puede destapar otro artículo con el
+                # nombre anterior, así que se reconstruyen los índices.
+                self._rows[row.id_articulo] = row
+                self._reindex_names()
+            else:
+                self._index(row)
+            if self._search_index is not None:
+                self._search_index.upsert(row.id_articulo, row.nombre, row.num_catalogo)
+
+    def adjust_stock(self, id_articulo, delta):
+        """Suma delta a cantidad_en_stock del artículo, si está en el catálogo."""
+        with self._lock:
+            row = self._rows.get(id_articulo)
+            if row is not None:
+                row.cantidad_en_stock = (row.cantidad_en_stock or 0) + delta
+
+    def _reindex_names(self):
+        # Se construyen índices nuevos y se asignan al final para que los
+        # lectores concurrentes nunca vean un índice a medio construir.
+        id_by_name = {}
+        id_by_num_catalogo = {}
+        for id_articulo in sorted(self._rows):
+            row = self._rows[id_articulo]
+            if row.nombre is not None:
+                id_by_name.setdefault(row.nombre, id_articulo)
+            if row.num_catalogo:
+                id_by_num_catalogo.setdefault(row.num_catalogo, id_articulo)
+        self._id_by_name = id_by_name
+        self._id_by_num_catalogo = id_by_num_catalogo
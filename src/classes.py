@@ -1,5 +1,5 @@
 from sqlalchemy.orm import declarative_base
-from sqlalchemy import Column, Integer, String, Float, Boolean, Enum, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Float, Boolean, Enum, ForeignKey, DateTime, Date, Index
 import enum
 Base = declarative_base()
 class CatEnum(enum.Enum):
@@ -93,6 +93,9 @@ class Articulos(Base):
     almacen = Column(Enum(AlmacenEnum)) # Ubicación del artículo en el almacén
     ubicacion = Column(Enum(UbicacionEnum)) # Ubicación específica dentro del almacén (e.g., "nivel_1", "nivel_2", "planta_baja", "estante_compras")
     proveedor = Column(Integer, ForeignKey('proveedores.id_proveedor')) # Proveedor asociado al artículo, útil para gestión de compras y relaciones con proveedores
+    __table_args__ = (
+        Index('idx_articulos_nombre', 'nombre'), # Búsquedas por nombre
+    )
     # Add other columns as needed 
 
 class DetalleMovimiento(Base):
@@ -102,6 +105,13 @@ class DetalleMovimiento(Base):
     id_articulo = Column(Integer, ForeignKey('articulos.id_articulo'))
     cantidad = Column(Integer)
     id_punta = Column(Integer, ForeignKey('stock_puntas.id_punta')) # Precio por unidad en el momento del movimiento
+    # Mismos índices que crea MySQL para las llaves foráneas (sql_table_creation.sql);
+    # SQLite no los crea solo y sin ellos el detalle se recorre completo.
+    __table_args__ = (
+        Index('detalle_movimientos_ibfk_1', 'id_movimiento'),
+        Index('detalle_movimientos_ibfk_2', 'id_punta'),
+        Index('detalle_movimientos_ibfk_3_idx', 'id_articulo'),
+    )
 
 class Movimientos(Base):
     __tablename__ = 'movimientos'
@@ -111,6 +121,10 @@ class Movimientos(Base):
     fecha_hora = Column(DateTime) # Fecha del movimiento
     observaciones = Column(String) # Detalles adicionales sobre el movimiento
     responsable = Column(String) # Persona responsable del movimiento
+    __table_args__ = (
+        Index('idx_movimientos_tipo_fecha', 'tipo', 'fecha_hora'), # Movimientos recientes y reportes por fecha
+        Index('idx_movimientos_proyecto_fecha', 'id_proyecto', 'fecha_hora'), # Comparación por centro de costo y rango de fechas
+    )
 
 class Proyectos(Base):
     __tablename__ = 'proyectos'
@@ -126,6 +140,10 @@ class StockPuntas(Base):
     longitud = Column(Float) # Cantidad actual en stock
     nombre_punta = Column(String) # Nombre descriptivo de la punta (e.g., "Punta Phillips #2", "Punta de Taladro 5mm", etc.)
     color = Column(String) # Color de la punta, útil para identificar visualmente diferentes tipos de puntas
+    disponible = Column(Boolean, default=True, nullable=False) # False cuando la punta ya salió en un movimiento de salida
+    __table_args__ = (
+        Index('idx_stock_puntas_articulo_disponible', 'id_articulo', 'disponible'), # Búsqueda de puntas libres por cable
+    )
 
 class Proveedores(Base):
     __tablename__ = 'proveedores'
@@ -137,3 +155,11 @@ class Proveedores(Base):
     direccion = Column(String) # Dirección física del proveedor
     pagina_web = Column(String) # Página web del proveedor, si aplica
     notas = Column(String) # Cualquier información adicional relevante sobre el proveedor (e.g., condiciones de pago, tiempos de entrega, etc.)
+
+class ResumenMovimientosDiario(Base):
+    __tablename__ = 'resumen_movimientos_diario'
+    id_proyecto = Column(Integer, ForeignKey('proyectos.id_proyecto'), primary_key=True) # Proyecto del movimiento; su c_c se lee de proyectos
+    id_articulo = Column(Integer, ForeignKey('articulos.id_articulo'), primary_key=True)
+    tipo_movimiento = Column(Enum(TipoMovimientoEnum), primary_key=True) # 'entrada' o 'salida'
+    dia = Column(Date, primary_key=True) # Día del movimiento (sin hora)
+    cantidad = Column(Float, nullable=False, default=0) # Suma de detalle_movimientos.cantidad del día
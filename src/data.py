@@ -5,11 +5,27 @@ Contiene todas las funciones que interactúan con la base de datos MySQL
 usando SQLAlchemy. No contiene llamadas a Streamlit.
 Todas las funciones de consulta y manipulación de datos están centralizadas aquí.
 """
-import streamlit as st  # Solo para manejo de caché, no para UI
-from datetime import datetime
-
-from sqlalchemy import String, and_, cast, func
-from sqlalchemy.orm import load_only, sessionmaker
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+
+import pandas as pd
+from sqlalchemy import (
+    Column,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    bindparam,
+    cast,
+    delete,
+    func,
+    insert,
+    select,
+    update,
+)
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateTable, DropTable
 
 from classes import (
     Articulos,
@@ -17,94 +33,289 @@ from classes import (
     Movimientos,
     Proveedores,
     Proyectos,
+    ResumenMovimientosDiario,
     StockPuntas,
 )
-from utils import get_session
+from cache import bump_data_version, get_data_version, versioned_cache
+from catalog import ArticleCatalog, ArticuloRow
+from retry import retry_transaction
+from rollup import add_movement_to_rollup
+from utils import get_cached_read_session, get_session, refresh_request_session
 
 
 def clear_cached_reference_data():
-    """Limpia caches de lectura afectados por escrituras de inventario."""
-    cached_funcs = [
-        get_all_articulos,
-        get_all_articulo_names,
-        get_cable_names,
-        get_available_puntas,
-        get_proyectos_info,
-        get_proyectos_table_data,
-    ]
-    for fn in cached_funcs:
-        clear_method = getattr(fn, "clear", None)
-        if callable(clear_method):
-            clear_method()
+    """
+    Invalida las lecturas cacheadas tras una escritura de inventario.
+
+    Incrementa la versión de datos; las funciones decoradas con versioned_cache
+    incluyen esa versión en su llave, por lo que ninguna lectura posterior
+    reutiliza resultados anteriores a la escritura. La escritura ya está
+    confirmada en este punto, por lo que un fallo del backend de caché no se
+    propaga al usuario.
+
+    Returns:
+        int | None: Nueva versión de datos, o None si no se pudo incrementar.
+    """
+    try:
+        return bump_data_version()
+    except Exception as e:
+        print(f"Error al invalidar caché de lecturas: {e}")
+        return None
+
+
+def _invalidate_after_write(catalog_patch=None):
+    """
+    Invalida cachés tras una escritura confirmada y parcha el catálogo en memoria.
+
+    Si ninguna otra escritura (de este u otro proceso) ocurrió desde que se
+    construyó el catálogo, se aplica catalog_patch en sitio y el catálogo
+    adopta la nueva versión; de lo contrario se descarta y se reconstruye
+    en la siguiente lectura.
+
+    Args:
+        catalog_patch (Callable | None): Función que recibe el ArticleCatalog
+            y aplica los cambios de la escritura.
+    """
+    global _catalog
+    with _catalog_lock:
+        catalog = _catalog
+        new_version = clear_cached_reference_data()
+        if (
+            catalog is not None
+            and new_version is not None
+            and new_version == catalog.version + 1
+        ):
+            if catalog_patch is not None:
+                catalog_patch(catalog)
+            catalog.version = new_version
+        else:
+            _catalog = None
 
 
 # =============================================================================
 # ARTÍCULOS
 # =============================================================================
-#@st.cache_data(ttl=300)  # Cachear por 5 minutos para mejorar rendimiento
-def get_all_articulos():
+
+def _articulo_columns():
+    # Consultar columnas concretas evita fallos por conversión estricta de Enum
+    # cuando hay valores históricos que no coinciden con la definición Python.
+    return (
+        Articulos.id_articulo.label("id"),
+        Articulos.nombre,
+        Articulos.num_catalogo,
+        Articulos.cantidad_en_stock,
+        Articulos.unidad_medida,
+        Articulos.es_cable,
+        Articulos.stock_minimo,
+        Articulos.precio_unitario,
+        cast(Articulos.tipo, String).label("tipo"),
+        cast(Articulos.categoria, String).label("categoria"),
+        cast(Articulos.almacen, String).label("almacen"),
+        cast(Articulos.ubicacion, String).label("ubicacion"),
+        Proveedores.nombre.label("proveedor"),
+    )
+
+
+def _read_frame(stmt, session=None):
     """
-    Obtiene todos los artículos de la base de datos.
+    Ejecuta una consulta y devuelve un DataFrame con columnas respaldadas por Arrow.
+
+    Las filas del driver se convierten por columna en pandas (sin un dict por
+    fila), y st.dataframe puede pasar esas columnas a Arrow sin copiarlas.
+    Sin sesión usa get_cached_read_session(), porque sus llamadores se
+    cachean con versioned_cache.
+
+    Args:
+        stmt (sqlalchemy.sql.Select): Consulta a ejecutar.
+        session (sqlalchemy.orm.Session, optional): Sesión del llamador, que
+            se deja abierta; necesaria si la consulta usa tablas temporales.
 
     Returns:
-        list[dict]: Lista de diccionarios con los datos de cada artículo.
+        pd.DataFrame: Resultado con dtypes de pyarrow.
     """
-    session = get_session()
+    if session is not None:
+        return pd.read_sql(stmt, session.connection(), dtype_backend="pyarrow")
+    session = get_cached_read_session()
     try:
-        # Consultar columnas concretas evita fallos por conversión estricta de Enum
-        # cuando hay valores históricos que no coinciden con la definición Python.
-        rows = (
-            session.query(
-                Articulos.id_articulo.label("id"),
-                Articulos.nombre,
-                Articulos.num_catalogo,
-                Articulos.cantidad_en_stock,
-                Articulos.unidad_medida,
-                Articulos.es_cable,
-                Articulos.stock_minimo,
-                Articulos.precio_unitario,
-                cast(Articulos.tipo, String).label("tipo"),
-                cast(Articulos.categoria, String).label("categoria"),
-                cast(Articulos.almacen, String).label("almacen"),
-                cast(Articulos.ubicacion, String).label("ubicacion"),
-                Proveedores.nombre.label("proveedor"),
+        return pd.read_sql(stmt, session.connection(), dtype_backend="pyarrow")
+    finally:
+        session.close()
+
+
+_ARTICULO_NUMERIC_COLUMNS = ["cantidad_en_stock", "stock_minimo", "precio_unitario"]
+_ARTICULO_FRAME_NAMES = {
+    "cantidad_en_stock": "cantidad en stock",
+    "unidad_medida": "unidad de medida",
+    "stock_minimo": "stock minimo",
+}
+
+
+def _format_articulos_frame(df):
+    # Redondeo y nulos por columna; los nombres son los que muestra Inventario.
+    numeric = df[_ARTICULO_NUMERIC_COLUMNS].astype("float64[pyarrow]").fillna(0).round(2)
+    return df.assign(
+        **numeric,
+        es_cable=df["es_cable"].astype("bool[pyarrow]").fillna(False),
+    ).rename(columns=_ARTICULO_FRAME_NAMES)
+
+
+# Columnas por las que puede ordenarse el inventario paginado. Ambas son
+# NOT NULL e indexadas, así que el cursor (valor, id_articulo) siempre avanza.
+ARTICULOS_SORT_COLUMNS = {
+    "nombre": Articulos.nombre,
+    "id": Articulos.id_articulo,
+}
+SEARCH_IN_LIST_LIMIT = 2000
+# Ids de una búsqueda con más de SEARCH_IN_LIST_LIMIT coincidencias; vive solo
+# mientras se arma una página, en la conexión que la consulta.
+_SEARCH_IDS = Table(
+    "tmp_busqueda_articulos",
+    MetaData(),
+    Column("id_articulo", Integer, primary_key=True),
+    prefixes=["TEMPORARY"],
+)
+
+
+def _create_search_ids(connection):
+    # IF NOT EXISTS y DELETE: si un error dejó la tabla en esta conexión del
+    # pool, se reutiliza vacía en lugar de fallar.
+    connection.execute(CreateTable(_SEARCH_IDS, if_not_exists=True))
+    connection.execute(delete(_SEARCH_IDS))
+
+
+def _drop_search_ids(connection):
+    # En MySQL un DROP TABLE sin TEMPORARY hace COMMIT implícito de la
+    # transacción; SQLite no acepta DROP TEMPORARY.
+    if connection.dialect.name == "mysql":
+        connection.exec_driver_sql(f"DROP TEMPORARY TABLE IF EXISTS {_SEARCH_IDS.name}")
+    else:
+        connection.execute(DropTable(_SEARCH_IDS, if_exists=True))
+
+
+@contextmanager
+def _articulos_page_filters(session, filters):
+    """
+    Arma los predicados de get_articulos_page a partir de los filtros.
+
+    El filtro "nombre" usa el índice de búsqueda, que ignora acentos y también
+    cubre num_catalogo. Con pocas coincidencias los ids van en una lista IN;
+    con más de SEARCH_IN_LIST_LIMIT se cargan en una tabla temporal para no
+    inflar cada sentencia, con el mismo resultado. La tabla se borra al salir.
+
+    Args:
+        session (sqlalchemy.orm.Session): Sesión con la que se consultará.
+        filters (dict | None): Filtros "categoria", "tipo" y "nombre".
+
+    Yields:
+        list: Predicados para Query.filter.
+    """
+    filters = filters or {}
+    predicates = []
+    if filters.get("categoria"):
+        predicates.append(cast(Articulos.categoria, String) == filters["categoria"])
+    if filters.get("tipo"):
+        predicates.append(cast(Articulos.tipo, String) == filters["tipo"])
+    nombre = (filters.get("nombre") or "").strip()
+    search_connection = None
+    try:
+        if nombre:
+            ids = [row.id_articulo for row in search_articulos(nombre, limit=None, fuzzy=False)]
+            if len(ids) <= SEARCH_IN_LIST_LIMIT:
+                predicates.append(Articulos.id_articulo.in_(ids))
+            else:
+                connection = session.connection()
+                search_connection = connection
+                _create_search_ids(connection)
+                connection.execute(insert(_SEARCH_IDS), [{"id_articulo": i} for i in ids])
+                predicates.append(Articulos.id_articulo.in_(select(_SEARCH_IDS.c.id_articulo)))
+        yield predicates
+    finally:
+        if search_connection is not None:
+            _drop_search_ids(search_connection)
+
+
+@versioned_cache()
+def get_articulos_page(filters=None, sort="nombre", descending=False, cursor=None, page_size=50):
+    """
+    Obtiene una página del inventario con filtros, orden y paginación por llave en SQL.
+
+    La paginación es por llave (keyset): en lugar de OFFSET se recibe el
+    cursor (valor de orden, id_articulo) de la última fila de la página
+    anterior, así que cada página cuesta lo mismo sin importar qué tan
+    adelante esté.
+
+    Args:
+        filters (dict, optional): Filtros opcionales "categoria", "tipo" y
+            "nombre" (búsqueda parcial en nombre y num_catalogo, sin
+            distinguir mayúsculas ni acentos).
+        sort (str): Columna de orden, una de ARTICULOS_SORT_COLUMNS.
+        descending (bool): True para orden descendente.
+        cursor (tuple, optional): next_cursor devuelto por la página anterior.
+        page_size (int): Cantidad máxima de filas por página.
+
+    Returns:
+        dict: {"frame": pd.DataFrame, "total": int, "next_cursor": tuple | None}.
+            El DataFrame tiene una fila por artículo, con dtypes de pyarrow.
+
+    Raises:
+        ValueError: Si la columna de orden no es válida.
+    """
+    if sort not in ARTICULOS_SORT_COLUMNS:
+        raise ValueError(f"Columna de orden no válida: {sort}")
+    sort_column = ARTICULOS_SORT_COLUMNS[sort]
+    session = get_cached_read_session()
+    try:
+        with _articulos_page_filters(session, filters) as predicates:
+            total = session.query(func.count(Articulos.id_articulo)).filter(*predicates).scalar()
+
+            query = (
+                session.query(*_articulo_columns())
+                .outerjoin(Proveedores, Proveedores.id_proveedor == Articulos.proveedor)
+                .filter(*predicates)
             )
-            .outerjoin(Proveedores, Proveedores.id_proveedor == Articulos.proveedor)
-            .all()
-        )
+            if cursor is not None:
+                last_value, last_id = cursor
+                if sort_column is Articulos.id_articulo:
+                    query = query.filter(
+                        Articulos.id_articulo < last_id if descending else Articulos.id_articulo > last_id
+                    )
+                # La cota simple (<= / >=) permite al motor buscar en el índice;
+                # el OR solo descarta los empates ya mostrados.
+                elif descending:
+                    query = query.filter(
+                        sort_column <= last_value,
+                        (sort_column < last_value) | (Articulos.id_articulo < last_id),
+                    )
+                else:
+                    query = query.filter(
+                        sort_column >= last_value,
+                        (sort_column > last_value) | (Articulos.id_articulo > last_id),
+                    )
 
-        return [
-            {
-                "id": row.id,
-                "nombre": row.nombre,
-                "num_catalogo": row.num_catalogo,
-                "cantidad en stock": round(row.cantidad_en_stock, 2)
-                if row.cantidad_en_stock is not None
-                else 0.00,
-                "unidad de medida": row.unidad_medida,
-                "es_cable": bool(row.es_cable),
-                "stock minimo": round(row.stock_minimo, 2)
-                if row.stock_minimo is not None
-                else 0.00,
-                "precio_unitario": round(row.precio_unitario, 2)
-                if row.precio_unitario is not None
-                else 0.00,
-                "tipo": row.tipo,
-                "categoria": row.categoria,
-                "almacen": row.almacen,
-                "ubicacion": row.ubicacion,
-                "proveedor": row.proveedor,
+            if descending:
+                query = query.order_by(sort_column.desc(), Articulos.id_articulo.desc())
+            else:
+                query = query.order_by(sort_column, Articulos.id_articulo)
+
+            # Se pide una fila extra solo para saber si existe una página siguiente.
+            df = _read_frame(query.limit(page_size + 1).statement, session)
+            next_cursor = None
+            if len(df) > page_size:
+                df = df.iloc[:page_size]
+                last = df.iloc[-1]
+                last_id = int(last["id"])
+                next_cursor = (last["nombre"] if sort == "nombre" else last_id, last_id)
+
+            return {
+                "frame": _format_articulos_frame(df),
+                "total": total or 0,
+                "next_cursor": next_cursor,
             }
-            for row in rows
-        ]
-    except Exception as e:
-        print(f"Error al obtener artículos: {e}")
-        return []
-
     finally:
         session.close()
 
-# @st.cache_data(ttl=300)
+
+@versioned_cache()
 def get_all_articulo_names():
     """
     Obtiene los nombres de todos los artículos.
@@ -112,7 +323,7 @@ def get_all_articulo_names():
     Returns:
         list[str]: Lista de nombres de artículos.
     """
-    session = get_session()
+    session = get_cached_read_session()
     try:
         rows = session.query(Articulos.nombre).order_by(Articulos.nombre).all()
         return [row.nombre for row in rows]
@@ -123,7 +334,7 @@ def get_all_articulo_names():
     finally:
         session.close()
 
-# @st.cache_data(ttl=300)
+@versioned_cache()
 def get_cable_names():
     """
     Obtiene los nombres de todos los artículos que son cables.
@@ -131,7 +342,7 @@ def get_cable_names():
     Returns:
         list[str]: Lista de nombres de artículos tipo cable.
     """
-    session = get_session()
+    session = get_cached_read_session()
     try:
         rows = (
             session.query(Articulos.nombre)
@@ -147,85 +358,133 @@ def get_cable_names():
         session.close()
 
 
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def _load_article_catalog(version):
+    """
+    Construye el catálogo en memoria con una sola consulta de artículos.
+
+    Lee con get_cached_read_session(): el catálogo se comparte en todo el
+    proceso con la etiqueta de la versión vigente, así que solo usa la sesión
+    del rerun si su snapshot no es anterior a esa versión.
+
+    Args:
+        version (int): Versión de datos con la que se construye.
+
+    Returns:
+        ArticleCatalog: Catálogo indexado.
+    """
+    session = get_cached_read_session()
+    try:
+        rows = session.query(
+            Articulos.id_articulo,
+            Articulos.nombre,
+            Articulos.num_catalogo,
+            Articulos.cantidad_en_stock,
+            Articulos.unidad_medida,
+            Articulos.es_cable,
+            Articulos.stock_minimo,
+            Articulos.precio_unitario,
+            Articulos.proveedor,
+            cast(Articulos.tipo, String).label("tipo"),
+            cast(Articulos.categoria, String).label("categoria"),
+            cast(Articulos.almacen, String).label("almacen"),
+            cast(Articulos.ubicacion, String).label("ubicacion"),
+        ).all()
+        return ArticleCatalog(
+            (ArticuloRow(**row._asdict()) for row in rows),
+            version=version,
+        )
+    finally:
+        session.close()
+
+
+def get_article_catalog():
+    """
+    Devuelve el catálogo de artículos en memoria, construyéndolo si hace falta.
+
+    El catálogo se reconstruye solo cuando la versión de datos cambió por una
+    escritura que no pudo parcharse en sitio (p. ej. desde otro worker).
+
+    Returns:
+        ArticleCatalog: Catálogo vigente.
+    """
+    global _catalog
+    version = get_data_version()
+    catalog = _catalog
+    if catalog is None or catalog.version != version:
+        with _catalog_lock:
+            if _catalog is None or _catalog.version != version:
+                _catalog = _load_article_catalog(version)
+            catalog = _catalog
+    return catalog
+
+
 def get_article_by_name(nombre):
     """
-    Busca un artículo por su nombre.
+    Busca un artículo por su nombre en el catálogo en memoria.
 
     Args:
         nombre (str): Nombre del artículo.
 
     Returns:
-        Articulos | None: Objeto artículo o None si no existe.
+        ArticuloRow | None: Fila del artículo o None si no existe.
     """
-    session = get_session()
     try:
-        return (
-            session.query(Articulos)
-            .options(
-                load_only(
-                    Articulos.id_articulo,
-                    Articulos.nombre,
-                    Articulos.num_catalogo,
-                    Articulos.cantidad_en_stock,
-                    Articulos.unidad_medida,
-                    Articulos.es_cable,
-                    Articulos.tipo,
-                    Articulos.categoria,
-                    Articulos.almacen,
-                    Articulos.ubicacion,
-                    Articulos.stock_minimo,
-                    Articulos.precio_unitario,
-                    Articulos.proveedor,
-                )
-            )
-            .filter(Articulos.nombre == nombre)
-            .first()
-        )
+        return get_article_catalog().by_name(nombre)
     except Exception as e:
         print(f"Error al buscar artículo por nombre '{nombre}': {e}")
         return None
-    finally:
-        session.close()
 
 
 def get_article_by_id(id_articulo):
     """
-    Busca un artículo por su ID.
+    Busca un artículo por su ID en el catálogo en memoria.
 
     Args:
         id_articulo (int): ID del artículo.
 
     Returns:
-        Articulos | None: Objeto artículo o None si no existe.
+        ArticuloRow | None: Fila del artículo o None si no existe.
     """
-    session = get_session()
-    try:
-        return (
-            session.query(Articulos)
-            .options(
-                load_only(
-                    Articulos.id_articulo,
-                    Articulos.nombre,
-                    Articulos.num_catalogo,
-                    Articulos.cantidad_en_stock,
-                    Articulos.unidad_medida,
-                    Articulos.es_cable,
-                    Articulos.tipo,
-                    Articulos.categoria,
-                    Articulos.almacen,
-                    Articulos.ubicacion,
-                    Articulos.stock_minimo,
-                    Articulos.precio_unitario,
-                    Articulos.proveedor,
-                )
-            )
-            .filter(Articulos.id_articulo == id_articulo)
-            .first()
-        )
-    finally:
-        session.close()
+    return get_article_catalog().by_id(id_articulo)
 
 
+def get_article_by_num_catalogo(num_catalogo):
+    """
+    Busca un artículo por su número de catálogo en el catálogo en memoria.
+
+    Args:
+        num_catalogo (str): Número de catálogo del artículo.
+
+    Returns:
+        ArticuloRow | None: Fila del artículo o None si no existe.
+    """
+    return get_article_catalog().by_num_catalogo(num_catalogo)
+
+
+def search_articulos(query, limit=20, fuzzy=False):
+    """
+    Busca artículos por nombre o número de catálogo para autocompletado.
+
+    No distingue mayúsculas ni acentos; con fuzzy=True también tolera errores
+    de escritura menores. Se resuelve con el índice en memoria del catálogo,
+    sin consultar MySQL.
+
+    Args:
+        query (str): Texto escrito por el usuario.
+        limit (int | None): Máximo de resultados; None para todos.
+        fuzzy (bool): Si ninguno coincide, devolver los más parecidos.
+
+    Returns:
+        list[ArticuloRow]: Artículos ordenados por relevancia.
+    """
+    return get_article_catalog().search(query, limit, fuzzy)
+
+
+@retry_transaction()
 def update_articulo(id_articulo, nombre, num_catalogo, cantidad_en_stock, unidad_medida, stock_minimo, tipo, categoria, es_cable, almacen, ubicacion, proveedor_name):
     """
     Actualiza los campos editables de un artículo.
@@ -241,7 +500,7 @@ def update_articulo(id_articulo, nombre, num_catalogo, cantidad_en_stock, unidad
         ValueError: Si el artículo no existe.
         Exception: Si ocurre un error en la base de datos.
     """
-    session = get_session()
+    session = get_session(shared=False)
     try:
         articulo = session.query(Articulos).filter(
             Articulos.id_articulo == id_articulo
@@ -259,8 +518,25 @@ def update_articulo(id_articulo, nombre, num_catalogo, cantidad_en_stock, unidad
         articulo.almacen = almacen
         articulo.ubicacion = ubicacion
         articulo.proveedor = get_id_proveedor_by_name(proveedor_name)
+        updated_row = ArticuloRow(
+            id_articulo=id_articulo,
+            nombre=nombre,
+            num_catalogo=num_catalogo,
+            cantidad_en_stock=cantidad_en_stock,
+            unidad_medida=unidad_medida,
+            es_cable=es_cable,
+            tipo=tipo,
+            categoria=categoria,
+            almacen=almacen,
+            ubicacion=ubicacion,
+            stock_minimo=stock_minimo,
+            precio_unitario=articulo.precio_unitario,
+            proveedor=articulo.proveedor,
+        )
 
         session.commit()
+        refresh_request_session()
+        _invalidate_after_write(lambda catalog: catalog.upsert(updated_row))
     except Exception as e:
         session.rollback()
         print(f"Error al actualizar artículo ID {id_articulo}: {e}")
@@ -293,11 +569,12 @@ def get_id_proveedor_by_name(nombre_proveedor):
 # =============================================================================
 # CABLES / PUNTAS
 # =============================================================================
-# @st.cache_data(ttl=300)
+@versioned_cache()
 def get_available_puntas(id_articulo: int):
     """
     Obtiene las puntas disponibles para un artículo cable,
-    excluyendo las que ya fueron utilizadas en movimientos de salida.
+    excluyendo las que ya fueron utilizadas en movimientos de salida
+    (marcadas con disponible = False por add_salida_to_db).
 
     Args:
         id_articulo (int): ID del artículo cable.
@@ -305,15 +582,8 @@ def get_available_puntas(id_articulo: int):
     Returns:
         list[dict]: Lista de diccionarios con id, nombre y longitud de cada punta.
     """
-    session = get_session()
+    session = get_cached_read_session()
     try:
-        used_puntas_subquery = session.query(DetalleMovimiento.id_punta).join(
-            Movimientos, DetalleMovimiento.id_movimiento == Movimientos.id_movimiento
-        ).filter(
-            Movimientos.tipo == "salida",
-            DetalleMovimiento.id_punta.isnot(None),
-        ).distinct()
-
         puntas = session.query(
             StockPuntas.id_punta,
             StockPuntas.nombre_punta,
@@ -321,7 +591,7 @@ def get_available_puntas(id_articulo: int):
             StockPuntas.color,
         ).filter(
             StockPuntas.id_articulo == id_articulo,
-            ~StockPuntas.id_punta.in_(used_puntas_subquery),
+            StockPuntas.disponible == True,
         ).order_by(StockPuntas.id_punta).all()
 
         return [
@@ -356,6 +626,72 @@ def get_punta_by_id(id_punta: int):
         session.close()
 
 
+def get_puntas_by_ids(id_puntas):
+    """
+    Obtiene varias puntas en una sola consulta.
+
+    Args:
+        id_puntas (Iterable[int]): IDs de las puntas.
+
+    Returns:
+        dict: {id_punta: {'id_punta', 'nombre_punta', 'longitud', 'color'}}
+    """
+    id_puntas = {id_punta for id_punta in id_puntas if id_punta is not None}
+    if not id_puntas:
+        return {}
+
+    session = get_session()
+    try:
+        puntas = session.query(
+            StockPuntas.id_punta,
+            StockPuntas.nombre_punta,
+            StockPuntas.longitud,
+            StockPuntas.color,
+        ).filter(StockPuntas.id_punta.in_(id_puntas)).all()
+        return {
+            punta.id_punta: {
+                "id_punta": punta.id_punta,
+                "nombre_punta": punta.nombre_punta,
+                "longitud": punta.longitud,
+                "color": punta.color,
+            }
+            for punta in puntas
+        }
+    finally:
+        session.close()
+
+
+def get_pending_items_info(movement_items):
+    """
+    Resuelve en bloque el artículo y la punta de cada ítem pendiente de un movimiento.
+
+    Los artículos se leen del catálogo en memoria (por id_articulo si el ítem
+    lo tiene, si no por nombre_item) y todas las puntas en una sola consulta,
+    en lugar de una consulta por ítem.
+
+    Args:
+        movement_items (list[dict]): Ítems agregados al movimiento en curso.
+
+    Returns:
+        list[tuple]: Una tupla (ArticuloRow | None, dict | None) por ítem,
+            en el mismo orden que movement_items.
+    """
+    if not movement_items:
+        return []
+
+    catalog = get_article_catalog()
+    puntas = get_puntas_by_ids(item.get("id_punta") for item in movement_items)
+
+    resolved = []
+    for item in movement_items:
+        if item.get("id_articulo") is not None:
+            articulo = catalog.by_id(item["id_articulo"])
+        else:
+            articulo = catalog.by_name(item.get("nombre_item"))
+        resolved.append((articulo, puntas.get(item.get("id_punta"))))
+    return resolved
+
+
 def get_cables_without_salida():
     """
     Obtiene nombres de puntas de cable que no tienen movimiento de salida.
@@ -365,20 +701,13 @@ def get_cables_without_salida():
     """
     session = get_session()
     try:
-        puntas_with_salida = session.query(DetalleMovimiento.id_punta).join(
-            Movimientos, DetalleMovimiento.id_movimiento == Movimientos.id_movimiento
-        ).filter(Movimientos.tipo == "salida").distinct().all()
-        salida_punta_ids = {row.id_punta for row in puntas_with_salida}
-
-        cable_puntas = session.query(StockPuntas).join(
+        rows = session.query(StockPuntas.nombre_punta).join(
             Articulos, StockPuntas.id_articulo == Articulos.id_articulo
-        ).filter(Articulos.es_cable == 1).all()
-
-        return [
-            punta.nombre_punta
-            for punta in cable_puntas
-            if punta.id_punta not in salida_punta_ids
-        ]
+        ).filter(
+            Articulos.es_cable == 1,
+            StockPuntas.disponible == True,
+        ).all()
+        return [row.nombre_punta for row in rows]
     finally:
         session.close()
 
@@ -401,7 +730,7 @@ def get_all_proyectos():
         session.close()
 
 
-# @st.cache_data(ttl=300)
+@versioned_cache()
 def get_proyectos_info():
     """
     Obtiene un diccionario con la información de todos los proyectos.
@@ -409,7 +738,7 @@ def get_proyectos_info():
     Returns:
         dict: {id_proyecto: (nombre_obra, c_c)}
     """
-    session = get_session()
+    session = get_cached_read_session()
     try:
         proyectos = session.query(Proyectos).all()
         return {
@@ -420,30 +749,22 @@ def get_proyectos_info():
         session.close()
 
 
-#@st.cache_data(ttl=300)
-def get_proyectos_table_data():
+@versioned_cache()
+def get_proyectos_table_df():
     """
     Obtiene los proyectos en formato tabular para la UI.
 
     Returns:
-        list[dict]: Lista de diccionarios con id, centro de costo, obra y encargado.
+        pd.DataFrame: Columnas "C.C", "Obra" y "Encargado", con dtypes de pyarrow.
     """
-    session = get_session()
-    try:
-        proyectos = session.query(Proyectos).order_by(Proyectos.c_c, Proyectos.nombre_obra).all()
-        return [
-            {
-                
-                "C.C": p.c_c,
-                "Obra": p.nombre_obra,
-                "Encargado": p.encargado,
-            }
-            for p in proyectos
-        ]
-    finally:
-        session.close()
+    df = _read_frame(
+        select(Proyectos.c_c, Proyectos.nombre_obra, Proyectos.encargado)
+        .order_by(Proyectos.c_c, Proyectos.nombre_obra)
+    )
+    return df.rename(columns={"c_c": "C.C", "nombre_obra": "Obra", "encargado": "Encargado"})
 
 
+@retry_transaction()
 def add_proyecto(c_c, nombre_obra, encargado):
     """
     Agrega un nuevo proyecto a la base de datos.
@@ -459,14 +780,15 @@ def add_proyecto(c_c, nombre_obra, encargado):
     Raises:
         Exception: Si ocurre un error en la base de datos.
     """
-    session = get_session()
+    session = get_session(shared=False)
     try:
         nuevo_proyecto = Proyectos(
             c_c=c_c, nombre_obra=nombre_obra, encargado=encargado
         )
         session.add(nuevo_proyecto)
         session.commit()
-        clear_cached_reference_data()
+        refresh_request_session()
+        _invalidate_after_write()
         return nuevo_proyecto
     except Exception:
         session.rollback()
@@ -509,34 +831,37 @@ def get_proveedor_names():
         return []
     finally:
         session.close()
-#@st.cache_data(ttl=300)
-def get_proveedores_table_data():
+@versioned_cache()
+def get_proveedores_table_df():
     """
     Obtiene los proveedores en formato tabular para la UI.
 
     Returns:
-        list[dict]: Lista de diccionarios con datos de proveedores.
+        pd.DataFrame: Datos de contacto de cada proveedor, con dtypes de pyarrow.
     """
-    session = get_session()
-    try:
-        proveedores = session.query(Proveedores).order_by(Proveedores.nombre).all()
-        return [
-            {
-                "Nombre": p.nombre,
-                "Teléfono": p.telefono,
-                "Email": p.email,
-                "Página Web": p.pagina_web,
-                "Dirección": p.direccion,
-                "Contacto": p.contacto,
-                "Notas": p.notas
-            }
-            for p in proveedores
-        ]
-    finally:
-        session.close()
-
-
-#@st.cache_data(ttl=300)
+    df = _read_frame(
+        select(
+            Proveedores.nombre,
+            Proveedores.telefono,
+            Proveedores.email,
+            Proveedores.pagina_web,
+            Proveedores.direccion,
+            Proveedores.contacto,
+            Proveedores.notas,
+        ).order_by(Proveedores.nombre)
+    )
+    return df.rename(columns={
+        "nombre": "Nombre",
+        "telefono": "Teléfono",
+        "email": "Email",
+        "pagina_web": "Página Web",
+        "direccion": "Dirección",
+        "contacto": "Contacto",
+        "notas": "Notas",
+    })
+
+
+@versioned_cache()
 def get_proveedores_for_edit():
     """
     Obtiene proveedores con campos completos para selección/edición en UI.
@@ -544,7 +869,7 @@ def get_proveedores_for_edit():
     Returns:
         list[dict]: Lista con id y datos del proveedor.
     """
-    session = get_session()
+    session = get_cached_read_session()
     try:
         proveedores = session.query(Proveedores).order_by(Proveedores.nombre, Proveedores.id_proveedor).all()
         return [
@@ -563,6 +888,7 @@ def get_proveedores_for_edit():
         session.close()
 
 
+@retry_transaction()
 def add_proveedor(nombre, telefono=None, email=None, pagina_web=None, direccion=None, contacto=None, notas=None):
     """
     Agrega un nuevo proveedor a la base de datos.
@@ -591,7 +917,7 @@ def add_proveedor(nombre, telefono=None, email=None, pagina_web=None, direccion=
         cleaned = (value or "").strip()
         return cleaned if cleaned else None
 
-    session = get_session()
+    session = get_session(shared=False)
     try:
         nuevo_proveedor = Proveedores(
             nombre=nombre_limpio,
@@ -605,10 +931,8 @@ def add_proveedor(nombre, telefono=None, email=None, pagina_web=None, direccion=
         session.add(nuevo_proveedor)
         session.flush()  # Para obtener el ID asignado antes de commit
         session.commit()
-
-        clear_method = getattr(get_proveedores_table_data, "clear", None)
-        if callable(clear_method):
-            clear_method()
+        refresh_request_session()
+        _invalidate_after_write()
 
         return nuevo_proveedor
     except Exception:
@@ -618,6 +942,7 @@ def add_proveedor(nombre, telefono=None, email=None, pagina_web=None, direccion=
         session.close()
 
 
+@retry_transaction()
 def update_proveedor(id_proveedor, nombre, telefono=None, email=None, pagina_web=None, direccion=None, contacto=None, notas=None):
     """
     Actualiza un proveedor existente.
@@ -646,7 +971,7 @@ def update_proveedor(id_proveedor, nombre, telefono=None, email=None, pagina_web
         cleaned = (value or "").strip()
         return cleaned if cleaned else None
 
-    session = get_session()
+    session = get_session(shared=False)
     try:
         proveedor = session.query(Proveedores).filter(
             Proveedores.id_proveedor == id_proveedor
@@ -664,11 +989,8 @@ def update_proveedor(id_proveedor, nombre, telefono=None, email=None, pagina_web
         proveedor.notas = to_none_if_empty(notas)  # Mantener notas existentes si no se pasan nuevas
 
         session.commit()
-
-        for fn in (get_proveedores_table_data, get_proveedores_for_edit):
-            clear_method = getattr(fn, "clear", None)
-            if callable(clear_method):
-                clear_method()
+        refresh_request_session()
+        _invalidate_after_write()
 
         return proveedor
     except Exception:
@@ -685,20 +1007,79 @@ def update_proveedor(id_proveedor, nombre, telefono=None, email=None, pagina_web
 def fetch_initial_data():
     """
     Obtiene los datos iniciales necesarios para el formulario de entradas:
-    nombres de artículos, nombres de cables y info de proyectos.
+    nombres de cables e info de proyectos. Los artículos existentes se
+    buscan bajo demanda con search_articulos.
 
     Returns:
-        tuple: (nombres_articulos, nombres_cables, proyectos_info)
+        tuple: (nombres_cables, proyectos_info)
 
     Raises:
         Exception: Si ocurre un error al consultar la base de datos.
     """
-    nombres_articulos = get_all_articulo_names()
     nombres_cables = get_cable_names()
     proyectos_info = get_proyectos_info()
-    return nombres_articulos, nombres_cables, proyectos_info
+    return nombres_cables, proyectos_info
+
+
+BULK_CHUNK_SIZE = 500
+
+
+def _chunks(items, size=BULK_CHUNK_SIZE):
+    """Divide una lista en bloques de a lo más size elementos."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _insert_in_chunks(session, table, rows, check_column):
+    """
+    Inserta filas con un INSERT de varias filas por bloque y asigna sus ids.
+
+    Donde el motor tiene RETURNING (SQLite, MariaDB) los ids vienen en el
+    mismo INSERT; RETURNING no garantiza el orden, pero el autoincremento
+    asigna ids crecientes en el orden de VALUES, así que los ids ordenados
+    corresponden a las filas. En MySQL se toma LAST_INSERT_ID(),
+    que en un INSERT de varias filas es el id de la primera: InnoDB reserva
+    ids consecutivos para un INSERT con número de filas conocido. Como
+    verificación, una consulta lee el bloque de ids recién asignados y compara
+    check_column contra lo insertado; si no coincide la transacción falla en
+    lugar de ligar detalles a artículos equivocados.
+
+    Args:
+        session (Session): Sesión de la transacción en curso.
+        table (Table): Tabla destino.
+        rows (list[dict]): Filas a insertar; cada dict recibe su id en la
+            llave primaria.
+        check_column (str): Columna con la que se verifican los ids en MySQL.
+
+    Raises:
+        RuntimeError: Si los ids leídos en MySQL no corresponden a las filas.
+    """
+    connection = session.connection()
+    pk = table.primary_key.columns.values()[0]
+    returning = connection.dialect.insert_returning
+    for chunk in _chunks(rows):
+        params = [{k: v for k, v in row.items() if k != pk.name} for row in chunk]
+        if returning:
+            ids = sorted(connection.execute(insert(table).values(params).returning(pk)).scalars())
+        else:
+            first_id = connection.execute(insert(table).values(params)).lastrowid
+            ids = list(range(first_id, first_id + len(chunk)))
+            check = table.c[check_column]
+            stored = connection.execute(
+                select(check)
+                .where(pk.between(ids[0], ids[-1]))
+                .order_by(pk)
+            ).scalars().all()
+            if stored != [row[check_column] for row in chunk]:
+                raise RuntimeError(
+                    f"Los ids asignados en {table.name} no son consecutivos; "
+                    "no se pudo registrar el movimiento."
+                )
+        for row, row_id in zip(chunk, ids):
+            row[pk.name] = row_id
 
 
+@retry_transaction()
 def add_movement_to_db(movement_items, id_proyecto, responsable):
     """
     Crea un registro de Movimiento tipo 'entrada' y agrega los DetalleMovimiento
@@ -718,7 +1099,7 @@ def add_movement_to_db(movement_items, id_proyecto, responsable):
     Raises:
         Exception: Si ocurre un error en la base de datos.
     """
-    session = get_session()
+    session = get_session(shared=False)
     try:
         movimiento = Movimientos(
             id_proyecto=id_proyecto,
@@ -735,79 +1116,145 @@ def add_movement_to_db(movement_items, id_proyecto, responsable):
             for item in movement_items
             if not item["is_new"]
         }
-        existing_articles = {}
+        existing_ids = {}
         if existing_names:
-            existing_articles = {
-                articulo.nombre: articulo
-                for articulo in session.query(Articulos).filter(
-                    Articulos.nombre.in_(existing_names)
-                ).all()
-            }
+            # Orden descendente para que, con nombres repetidos, gane el menor id
+            # (igual que el catálogo en memoria).
+            existing_ids = dict(
+                session.query(Articulos.nombre, Articulos.id_articulo)
+                .filter(Articulos.nombre.in_(existing_names))
+                .order_by(Articulos.id_articulo.desc())
+                .all()
+            )
 
+        # 1) Artículos nuevos: un INSERT de varias filas por lote, con sus ids.
+        lines = []
+        new_articles = []
+        new_by_name = {}
         for item_data in movement_items:
-            nueva_punta = None
-
+            cantidad = (
+                item_data["cantidad"]
+                if not item_data["es_cable"]
+                else item_data["longitud"]
+            )
             if item_data["is_new"]:
-                articulo = Articulos(
-                    nombre=item_data["nombre_item"],
-                    num_catalogo=item_data.get("num_catalogo", ""),
-                    tipo=item_data["tipo"],
-                    precio_unitario=item_data["precio_unitario"],
-                    unidad_medida=item_data["unidad_medida"],
-                    categoria=item_data["categoria"],
-                    stock_minimo=item_data["stock_minimo"],
-                    es_cable=True if item_data["es_cable"] else False,
-                    cantidad_en_stock=(
-                        item_data["cantidad"]
-                        if not item_data["es_cable"]
-                        else item_data["longitud"]
-                    ),
-                )
-                session.add(articulo)
-                session.flush()
-
-                if item_data["es_cable"]:
-                    nueva_punta = StockPuntas(
-                        id_articulo=articulo.id_articulo,
-                        nombre_punta=item_data["nombre_punta"],
-                        longitud=item_data["longitud"],
-                        color = item_data["color"]
-                    )
-                    session.add(nueva_punta)
-                    session.flush()
+                articulo = {
+                    "nombre": item_data["nombre_item"],
+                    "num_catalogo": item_data.get("num_catalogo", ""),
+                    "tipo": item_data["tipo"],
+                    "precio_unitario": item_data["precio_unitario"],
+                    "unidad_medida": item_data["unidad_medida"],
+                    "categoria": item_data["categoria"],
+                    "stock_minimo": item_data["stock_minimo"],
+                    "es_cable": True if item_data["es_cable"] else False,
+                    "cantidad_en_stock": cantidad,
+                }
+                new_articles.append(articulo)
+                new_by_name.setdefault(articulo["nombre"], articulo)
+                lines.append((item_data, articulo, cantidad))
+            elif item_data["nombre_item"] in existing_ids:
+                lines.append((item_data, existing_ids[item_data["nombre_item"]], cantidad))
+            elif item_data["nombre_item"] in new_by_name:
+                # Otra línea del mismo artículo nuevo (p. ej. varias puntas en
+                # una importación); su stock se suma como a uno existente.
+                lines.append((item_data, new_by_name[item_data["nombre_item"]], cantidad))
             else:
-                articulo = existing_articles.get(item_data["nombre_item"])
-                if not articulo:
-                    raise ValueError(
-                        f"Artículo no encontrado: {item_data['nombre_item']}"
-                    )
-
-                if item_data["es_cable"]:
-                    nueva_punta = StockPuntas(
-                        id_articulo=articulo.id_articulo,
-                        nombre_punta=item_data["nombre_punta"],
-                        longitud=item_data["longitud"],
-                    )
-                    session.add(nueva_punta)
-                    session.flush()
-                    articulo.cantidad_en_stock += item_data["longitud"]
-                else:
-                    articulo.cantidad_en_stock += item_data["cantidad"]
+                raise ValueError(
+                    f"Artículo no encontrado: {item_data['nombre_item']}"
+                )
+        _insert_in_chunks(session, Articulos.__table__, new_articles, "nombre")
+
+        new_rows = [
+            ArticuloRow(
+                id_articulo=articulo["id_articulo"],
+                nombre=articulo["nombre"],
+                num_catalogo=articulo["num_catalogo"],
+                cantidad_en_stock=articulo["cantidad_en_stock"],
+                unidad_medida=articulo["unidad_medida"],
+                es_cable=articulo["es_cable"],
+                tipo=item_data["tipo"],
+                categoria=item_data["categoria"],
+                stock_minimo=articulo["stock_minimo"],
+                precio_unitario=articulo["precio_unitario"],
+            )
+            for item_data, articulo, _ in lines
+            if item_data["is_new"]
+        ]
+        lines = [
+            (
+                item_data,
+                articulo if isinstance(articulo, int) else articulo["id_articulo"],
+                cantidad,
+            )
+            for item_data, articulo, cantidad in lines
+        ]
 
-            detalle = DetalleMovimiento(
-                id_movimiento=movimiento.id_movimiento,
-                id_articulo=articulo.id_articulo,
-                cantidad=(
-                    item_data["cantidad"]
-                    if not item_data["es_cable"]
-                    else item_data["longitud"]
-                ),
-                id_punta=nueva_punta.id_punta if nueva_punta else None,
+        # 2) Puntas de cable, también por lotes.
+        puntas = {}
+        for idx, (item_data, id_articulo, _) in enumerate(lines):
+            if item_data["es_cable"]:
+                puntas[idx] = {
+                    "id_articulo": id_articulo,
+                    "nombre_punta": item_data["nombre_punta"],
+                    "longitud": item_data["longitud"],
+                    "color": item_data.get("color"),
+                }
+        _insert_in_chunks(session, StockPuntas.__table__, list(puntas.values()), "nombre_punta")
+
+        # 3) Incremento de stock de artículos existentes: un UPDATE atómico por
+        #    artículo, enviado como executemany.
+        stock_deltas = {}
+        for item_data, id_articulo, cantidad in lines:
+            if not item_data["is_new"]:
+                stock_deltas[id_articulo] = stock_deltas.get(id_articulo, 0) + cantidad
+        connection = session.connection()
+        if stock_deltas:
+            increment = (
+                update(Articulos.__table__)
+                .where(Articulos.__table__.c.id_articulo == bindparam("b_id_articulo"))
+                .values(
+                    cantidad_en_stock=Articulos.__table__.c.cantidad_en_stock
+                    + bindparam("b_cantidad")
+                )
             )
-            session.add(detalle)
+            params = [
+                {"b_id_articulo": id_articulo, "b_cantidad": delta}
+                for id_articulo, delta in sorted(stock_deltas.items())
+            ]
+            for chunk in _chunks(params):
+                connection.execute(increment, chunk)
 
+        # 4) Detalles del movimiento con INSERT de varias filas.
+        detalles = [
+            {
+                "id_movimiento": movimiento.id_movimiento,
+                "id_articulo": id_articulo,
+                "cantidad": cantidad,
+                "id_punta": puntas[idx]["id_punta"] if idx in puntas else None,
+            }
+            for idx, (item_data, id_articulo, cantidad) in enumerate(lines)
+        ]
+        for chunk in _chunks(detalles):
+            connection.execute(insert(DetalleMovimiento.__table__), chunk)
+        rollup_lines = [(d["id_articulo"], d["cantidad"]) for d in detalles]
+
+        add_movement_to_rollup(
+            session,
+            id_proyecto,
+            "entrada",
+            movimiento.fecha_hora,
+            rollup_lines,
+        )
         session.commit()
-        #clear_cached_reference_data()
+        refresh_request_session()
+
+        def patch_catalog(catalog):
+            for row in new_rows:
+                catalog.upsert(row)
+            for id_articulo, delta in stock_deltas.items():
+                catalog.adjust_stock(id_articulo, delta)
+
+        _invalidate_after_write(patch_catalog)
         return True
     except Exception:
         session.rollback()
@@ -816,10 +1263,87 @@ def add_movement_to_db(movement_items, id_proyecto, responsable):
         session.close()
 
 
+_DETALLE_COLUMNS = (
+    DetalleMovimiento.cantidad,
+    Articulos.nombre,
+    Articulos.num_catalogo,
+    Articulos.es_cable,
+    Articulos.unidad_medida,
+    StockPuntas.nombre_punta,
+    StockPuntas.longitud,
+    StockPuntas.color,
+)
+
+
+def _detalle_item(detalle):
+    """Convierte una fila de detalle (ver _DETALLE_COLUMNS) en {'Item', 'Cantidad'}."""
+    if detalle.es_cable:
+        if detalle.nombre_punta:
+            item_info = f"{detalle.nombre} - {detalle.nombre_punta} - {detalle.color}"
+            cantidad = f"{detalle.longitud} {detalle.unidad_medida}(s)"
+        else:
+            item_info = f"{detalle.nombre} (punta no encontrada)"
+            cantidad = "N/A"
+    else:
+        item_info = detalle.nombre
+        cantidad = detalle.cantidad
+    return {"Item": item_info, "Cantidad": cantidad}
+
+
+def _movements_with_items(session, movimientos):
+    """
+    Agrega los detalles a una lista de movimientos con una sola consulta.
+
+    Args:
+        session (sqlalchemy.orm.Session): Sesión activa.
+        movimientos (list): Filas con id_movimiento, fecha_hora, id_proyecto y responsable.
+
+    Returns:
+        list[dict]: Movimientos en el mismo orden, con sus 'items'.
+    """
+    if not movimientos:
+        return []
+
+    movement_ids = [mov.id_movimiento for mov in movimientos]
+    detalles = session.query(
+        DetalleMovimiento.id_movimiento,
+        *_DETALLE_COLUMNS,
+    ).join(
+        Articulos, DetalleMovimiento.id_articulo == Articulos.id_articulo
+    ).outerjoin(
+        StockPuntas, DetalleMovimiento.id_punta == StockPuntas.id_punta
+    ).filter(
+        DetalleMovimiento.id_movimiento.in_(movement_ids)
+    ).order_by(
+        DetalleMovimiento.id_movimiento,
+        DetalleMovimiento.id_detalle,
+    ).all()
+
+    result_by_id = {}
+    for mov in movimientos:
+        result_by_id[mov.id_movimiento] = {
+            "id_movimiento": mov.id_movimiento,
+            "fecha_hora": mov.fecha_hora,
+            "id_proyecto": mov.id_proyecto,
+            "items": [],
+            "responsable": mov.responsable,
+        }
+
+    for detalle in detalles:
+        result_by_id[detalle.id_movimiento]["items"].append(_detalle_item(detalle))
+
+    return [result_by_id[mov.id_movimiento] for mov in movimientos]
+
+
+@versioned_cache()
 def get_recent_movements(tipo, limit=5):
     """
     Obtiene los movimientos más recientes de un tipo dado con sus detalles.
 
+    Una sola consulta: un CTE toma los últimos `limit` movimientos por el
+    índice (tipo, fecha_hora) y se une a detalles, artículos y puntas. Las
+    filas se agrupan por movimiento conforme llegan, sin crear objetos ORM.
+
     Args:
         tipo (str): Tipo de movimiento ('entrada' o 'salida').
         limit (int): Cantidad máxima de movimientos a devolver.
@@ -834,65 +1358,129 @@ def get_recent_movements(tipo, limit=5):
                 'responsable': str
             }
     """
-    session = get_session()
+    ultimos = (
+        select(
+            Movimientos.id_movimiento,
+            Movimientos.fecha_hora,
+            Movimientos.id_proyecto,
+            Movimientos.responsable,
+        )
+        .where(Movimientos.tipo == tipo)
+        .order_by(Movimientos.fecha_hora.desc(), Movimientos.id_movimiento.desc())
+        .limit(limit)
+        .cte("ultimos")
+    )
+    stmt = (
+        select(ultimos, DetalleMovimiento.id_detalle, *_DETALLE_COLUMNS)
+        .select_from(ultimos)
+        # Outer join: un movimiento sin detalles también se muestra.
+        .outerjoin(DetalleMovimiento, DetalleMovimiento.id_movimiento == ultimos.c.id_movimiento)
+        .outerjoin(Articulos, DetalleMovimiento.id_articulo == Articulos.id_articulo)
+        .outerjoin(StockPuntas, DetalleMovimiento.id_punta == StockPuntas.id_punta)
+        .order_by(
+            ultimos.c.fecha_hora.desc(),
+            ultimos.c.id_movimiento.desc(),
+            DetalleMovimiento.id_detalle,
+        )
+    )
+
+    session = get_cached_read_session()
     try:
-        movimientos = session.query(Movimientos).filter(
-            Movimientos.tipo == tipo
-        ).order_by(Movimientos.fecha_hora.desc()).limit(limit).all()
+        movements = []
+        current = None
+        for row in session.execute(stmt):
+            if current is None or current["id_movimiento"] != row.id_movimiento:
+                current = {
+                    "id_movimiento": row.id_movimiento,
+                    "fecha_hora": row.fecha_hora,
+                    "id_proyecto": row.id_proyecto,
+                    "items": [],
+                    "responsable": row.responsable,
+                }
+                movements.append(current)
+            if row.id_detalle is not None:
+                current["items"].append(_detalle_item(row))
+        return movements
+    finally:
+        session.close()
 
-        if not movimientos:
-            return []
 
-        movement_ids = [mov.id_movimiento for mov in movimientos]
-        detalles = session.query(
-            DetalleMovimiento.id_movimiento,
-            DetalleMovimiento.cantidad,
-            Articulos.nombre,
-            Articulos.num_catalogo,
-            Articulos.es_cable,
-            Articulos.unidad_medida,
-            StockPuntas.nombre_punta,
-            StockPuntas.longitud,
-            StockPuntas.color,
-        ).join(
-            Articulos, DetalleMovimiento.id_articulo == Articulos.id_articulo
-        ).outerjoin(
-            StockPuntas, DetalleMovimiento.id_punta == StockPuntas.id_punta
-        ).filter(
-            DetalleMovimiento.id_movimiento.in_(movement_ids)
-        ).order_by(
-            DetalleMovimiento.id_movimiento,
-            DetalleMovimiento.id_detalle,
-        ).all()
+def _movement_history_filters(filters):
+    filters = filters or {}
+    predicates = []
+    if filters.get("id_proyecto") is not None:
+        predicates.append(Movimientos.id_proyecto == filters["id_proyecto"])
+    responsable = (filters.get("responsable") or "").strip()
+    if responsable:
+        predicates.append(Movimientos.responsable == responsable)
+    if filters.get("id_articulo") is not None:
+        predicates.append(
+            select(DetalleMovimiento.id_detalle)
+            .where(
+                DetalleMovimiento.id_movimiento == Movimientos.id_movimiento,
+                DetalleMovimiento.id_articulo == filters["id_articulo"],
+            )
+            .exists()
+        )
+    return predicates
 
-        result_by_id = {}
-        for mov in movimientos:
-            result_by_id[mov.id_movimiento] = {
-                "id_movimiento": mov.id_movimiento,
-                "fecha_hora": mov.fecha_hora,
-                "id_proyecto": mov.id_proyecto,
-                "items": [],
-                "responsable": mov.responsable,
-            }
 
-        for detalle in detalles:
-            if detalle.es_cable:
-                if detalle.nombre_punta:
-                    item_info = f"{detalle.nombre} - {detalle.nombre_punta} - {detalle.color}"
-                    cantidad = f"{detalle.longitud} {detalle.unidad_medida}(s)"
-                else:
-                    item_info = f"{detalle.nombre} (punta no encontrada)"
-                    cantidad = "N/A"
-            else:
-                item_info = detalle.nombre
-                cantidad = detalle.cantidad
+@versioned_cache()
+def get_movement_history(tipo, filters=None, cursor=None, page_size=10):
+    """
+    Obtiene una página del historial de movimientos, del más reciente al más antiguo.
+
+    Pagina por llave sobre (fecha_hora, id_movimiento): el cursor es la
+    última fila de la página anterior y la consulta sigue el índice
+    (tipo, fecha_hora) desde ahí, así que la página 5,000 cuesta lo mismo que
+    la primera. Solo se consultan los detalles de los movimientos de la
+    página. No se calcula el total de resultados, que obligaría a contar
+    todo el historial en cada página.
+
+    Args:
+        tipo (str): Tipo de movimiento ('entrada' o 'salida').
+        filters (dict, optional): Filtros opcionales "id_proyecto",
+            "responsable" (coincidencia exacta) e "id_articulo" (movimientos
+            que incluyen ese artículo).
+        cursor (tuple, optional): next_cursor devuelto por la página anterior.
+        page_size (int): Cantidad máxima de movimientos por página.
 
-            result_by_id[detalle.id_movimiento]["items"].append({
-                "Item": item_info,
-                "Cantidad": cantidad,
-            })
+    Returns:
+        dict: {"movements": list[dict], "next_cursor": tuple | None}. Los
+            movimientos tienen el mismo formato que get_recent_movements.
+    """
+    session = get_cached_read_session()
+    try:
+        query = session.query(
+            Movimientos.id_movimiento,
+            Movimientos.fecha_hora,
+            Movimientos.id_proyecto,
+            Movimientos.responsable,
+        ).filter(Movimientos.tipo == tipo, *_movement_history_filters(filters))
 
-        return [result_by_id[mov.id_movimiento] for mov in movimientos]
+        if cursor is not None:
+            last_fecha, last_id = cursor
+            query = query.filter(
+                Movimientos.fecha_hora <= last_fecha,
+                (Movimientos.fecha_hora < last_fecha) | (Movimientos.id_movimiento < last_id),
+            )
+
+        # Se pide una fila extra solo para saber si existe una página siguiente.
+        movimientos = (
+            query.order_by(Movimientos.fecha_hora.desc(), Movimientos.id_movimiento.desc())
+            .limit(page_size + 1)
+            .all()
+        )
+        next_cursor = None
+        if len(movimientos) > page_size:
+            movimientos = movimientos[:page_size]
+            last = movimientos[-1]
+            next_cursor = (last.fecha_hora, last.id_movimiento)
+
+        return {
+            "movements": _movements_with_items(session, movimientos),
+            "next_cursor": next_cursor,
+        }
     finally:
         session.close()
 
@@ -901,6 +1489,48 @@ def get_recent_movements(tipo, limit=5):
 # MOVIMIENTOS - SALIDAS
 # =============================================================================
 
+class StockInsuficienteError(ValueError):
+    """No hay stock suficiente para retirar la cantidad pedida de un artículo."""
+
+    def __init__(self, nombre_item, cantidad):
+        super().__init__(f"Stock insuficiente para {nombre_item}")
+        self.nombre_item = nombre_item
+        self.cantidad = cantidad
+
+
+def _decrement_stock(session, id_articulo, cantidad, nombre_item):
+    """
+    Descuenta stock con un UPDATE condicional, sin leer ni bloquear antes la fila.
+
+    La condición cantidad_en_stock >= cantidad se evalúa dentro del UPDATE,
+    así que dos salidas simultáneas del mismo artículo no pueden dejar el
+    stock negativo ni perder un descuento; salidas de artículos distintos
+    solo bloquean sus propias filas.
+
+    Raises:
+        ValueError: Si el artículo no existe.
+        StockInsuficienteError: Si el stock no alcanza.
+    """
+    updated = session.execute(
+        update(Articulos)
+        .where(
+            Articulos.id_articulo == id_articulo,
+            Articulos.cantidad_en_stock >= cantidad,
+        )
+        .values(cantidad_en_stock=Articulos.cantidad_en_stock - cantidad)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if updated == 1:
+        return
+    exists = session.query(Articulos.id_articulo).filter(
+        Articulos.id_articulo == id_articulo
+    ).first()
+    if exists is None:
+        raise ValueError(f"Artículo no encontrado: {nombre_item}")
+    raise StockInsuficienteError(nombre_item, cantidad)
+
+
+@retry_transaction()
 def add_salida_to_db(movement_items, id_proyecto=None, responsable=None):
     """
     Crea un registro de Movimiento tipo 'salida' y actualiza el stock.
@@ -915,10 +1545,11 @@ def add_salida_to_db(movement_items, id_proyecto=None, responsable=None):
         bool: True si se registró exitosamente.
 
     Raises:
-        ValueError: Si no hay stock suficiente o no se encuentra artículo/punta.
+        StockInsuficienteError: Si no hay stock suficiente de algún artículo.
+        ValueError: Si no se encuentra artículo/punta o una punta ya fue retirada.
         Exception: Si ocurre un error en la base de datos.
     """
-    session = get_session()
+    session = get_session(shared=False)
     try:
         movimiento = Movimientos(
             id_proyecto=id_proyecto,
@@ -930,13 +1561,6 @@ def add_salida_to_db(movement_items, id_proyecto=None, responsable=None):
         session.add(movimiento)
         session.flush()
 
-        article_ids = {item["id_articulo"] for item in movement_items}
-        articles = {
-            articulo.id_articulo: articulo
-            for articulo in session.query(Articulos).filter(
-                Articulos.id_articulo.in_(article_ids)
-            ).all()
-        }
         punta_ids = {
             item["id_punta"]
             for item in movement_items
@@ -950,38 +1574,46 @@ def add_salida_to_db(movement_items, id_proyecto=None, responsable=None):
                     StockPuntas.id_punta.in_(punta_ids)
                 ).all()
             }
-
-        for item_data in movement_items:
-            articulo = articles.get(item_data["id_articulo"])
-
-            if not articulo:
-                raise ValueError(
-                    f"Artículo no encontrado: {item_data['nombre_item']}"
+            # Marcar las puntas como consumidas solo si siguen disponibles;
+            # si otra salida concurrente ya tomó alguna, se aborta la transacción.
+            consumed = session.execute(
+                update(StockPuntas)
+                .where(
+                    StockPuntas.id_punta.in_(punta_ids),
+                    StockPuntas.disponible == True,
                 )
+                .values(disponible=False)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if consumed != len(punta_ids):
+                raise ValueError("Una o más puntas ya fueron retiradas en otra salida")
 
+        lines = []
+        for item_data in movement_items:
             if not item_data["es_cable"]:
-                if articulo.cantidad_en_stock < item_data["cantidad"]:
-                    raise ValueError(
-                        f"Stock insuficiente para {item_data['nombre_item']}"
-                    )
-                articulo.cantidad_en_stock -= item_data["cantidad"]
                 cantidad_detalle = item_data["cantidad"]
                 id_punta = None
             else:
                 punta = puntas.get(item_data["id_punta"])
-
                 if not punta:
                     raise ValueError("Punta no encontrada")
-
-                if articulo.cantidad_en_stock < punta.longitud:
-                    raise ValueError(
-                        f"Stock insuficiente para {item_data['nombre_item']}"
-                    )
-
-                articulo.cantidad_en_stock -= punta.longitud
                 cantidad_detalle = punta.longitud
                 id_punta = item_data["id_punta"]
-
+            lines.append((item_data, cantidad_detalle, id_punta))
+
+        # Un descuento condicional por artículo, en orden de id para que dos
+        # salidas que comparten artículos tomen los bloqueos en el mismo orden.
+        totals = {}
+        nombres = {}
+        for item_data, cantidad_detalle, _ in lines:
+            id_articulo = item_data["id_articulo"]
+            totals[id_articulo] = totals.get(id_articulo, 0) + cantidad_detalle
+            nombres.setdefault(id_articulo, item_data["nombre_item"])
+        for id_articulo in sorted(totals):
+            _decrement_stock(session, id_articulo, totals[id_articulo], nombres[id_articulo])
+
+        stock_deltas = []
+        for item_data, cantidad_detalle, id_punta in lines:
             detalle = DetalleMovimiento(
                 id_movimiento=movimiento.id_movimiento,
                 id_articulo=item_data["id_articulo"],
@@ -989,9 +1621,23 @@ def add_salida_to_db(movement_items, id_proyecto=None, responsable=None):
                 id_punta=id_punta,
             )
             session.add(detalle)
-
+            stock_deltas.append((item_data["id_articulo"], -cantidad_detalle))
+
+        add_movement_to_rollup(
+            session,
+            id_proyecto,
+            "salida",
+            movimiento.fecha_hora,
+            [(id_articulo, -delta) for id_articulo, delta in stock_deltas],
+        )
         session.commit()
-        #clear_cached_reference_data()
+        refresh_request_session()
+
+        def patch_catalog(catalog):
+            for id_articulo, delta in stock_deltas:
+                catalog.adjust_stock(id_articulo, delta)
+
+        _invalidate_after_write(patch_catalog)
         return True
     except Exception:
         session.rollback()
@@ -1004,7 +1650,119 @@ def add_salida_to_db(movement_items, id_proyecto=None, responsable=None):
 # REPORTES - CONSULTAS
 # =============================================================================
 
-def get_report_data(fecha_inicio=None, fecha_fin=None, cc_selected=None, movement_type="entrada"):
+def _as_date(value):
+    """Convierte 'YYYY-MM-DD', date o datetime a date."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+
+def _date_bounds(fecha_inicio, fecha_fin):
+    """
+    Devuelve (inicio incluido, fin excluido) como date.
+
+    Como siempre en los reportes, el rango solo se aplica si vienen ambas
+    fechas; con una sola se devuelve (None, None) y no se filtra por fecha.
+    """
+    if not (fecha_inicio and fecha_fin):
+        return None, None
+    return _as_date(fecha_inicio), _as_date(fecha_fin) + timedelta(days=1)
+
+
+def _cc_filters(column, cc_selected):
+    if cc_selected is None:
+        return []
+    if isinstance(cc_selected, list):
+        return [column.in_(cc_selected)]
+    return [column == cc_selected]
+
+
+def build_report_filters(fecha_inicio=None, fecha_fin=None, cc_selected=None):
+    """
+    Construye los filtros de fecha y centro de costo compartidos por los reportes.
+
+    Las fechas se traducen a un rango semiabierto sobre la columna fecha_hora,
+    [fecha_inicio 00:00, fecha_fin + 1 día 00:00), en lugar de envolver la
+    columna en DATE(); así MySQL puede usar el índice (tipo, fecha_hora).
+
+    Args:
+        fecha_inicio (str | date, optional): Fecha inicial incluida ('YYYY-MM-DD').
+        fecha_fin (str | date, optional): Fecha final incluida ('YYYY-MM-DD').
+        cc_selected (int | list[int], optional): Centro(s) de costo a filtrar.
+
+    Returns:
+        list: Predicados de SQLAlchemy para usar con .filter(*predicados).
+    """
+    filters = []
+    start, end = _date_bounds(fecha_inicio, fecha_fin)
+    if start is not None:
+        filters.append(Movimientos.fecha_hora >= datetime.combine(start, time.min))
+    if end is not None:
+        filters.append(Movimientos.fecha_hora < datetime.combine(end, time.min))
+    filters.extend(_cc_filters(Proyectos.c_c, cc_selected))
+    return filters
+
+
+def build_rollup_filters(fecha_inicio=None, fecha_fin=None, cc_selected=None):
+    """
+    Filtros equivalentes a build_report_filters sobre resumen_movimientos_diario.
+
+    El centro de costo vive en proyectos: se filtra con una subconsulta de
+    sus id_proyecto, para que el motor busque el resumen por su llave
+    primaria (id_proyecto, ...) en lugar de recorrerlo completo.
+
+    Args:
+        fecha_inicio (str | date, optional): Fecha inicial incluida ('YYYY-MM-DD').
+        fecha_fin (str | date, optional): Fecha final incluida ('YYYY-MM-DD').
+        cc_selected (int | list[int], optional): Centro(s) de costo a filtrar.
+
+    Returns:
+        list: Predicados de SQLAlchemy para usar con .filter(*predicados).
+    """
+    filters = []
+    start, end = _date_bounds(fecha_inicio, fecha_fin)
+    if start is not None:
+        filters.append(ResumenMovimientosDiario.dia >= start)
+    if end is not None:
+        filters.append(ResumenMovimientosDiario.dia < end)
+    cc_filters = _cc_filters(Proyectos.c_c, cc_selected)
+    if cc_filters:
+        filters.append(
+            ResumenMovimientosDiario.id_proyecto.in_(
+                select(Proyectos.id_proyecto).where(*cc_filters)
+            )
+        )
+    return filters
+
+
+REPORT_CHUNK_SIZE = 1000
+
+
+def _report_statement(fecha_inicio, fecha_fin, cc_selected, movement_type):
+    """Consulta de renglones del reporte de entradas/salidas, del más reciente al más antiguo."""
+    return (
+        select(
+            Movimientos.fecha_hora,
+            Proyectos.c_c,
+            Articulos.nombre,
+            DetalleMovimiento.cantidad,
+            Articulos.precio_unitario,
+            Articulos.unidad_medida,
+        )
+        .join(DetalleMovimiento, Movimientos.id_movimiento == DetalleMovimiento.id_movimiento)
+        .join(Articulos, DetalleMovimiento.id_articulo == Articulos.id_articulo)
+        .join(Proyectos, Movimientos.id_proyecto == Proyectos.id_proyecto)
+        .where(
+            Movimientos.tipo == movement_type,
+            *build_report_filters(fecha_inicio, fecha_fin, cc_selected),
+        )
+    )
+
+
+@versioned_cache()
+def get_report_data(fecha_inicio=None, fecha_fin=None, cc_selected=None, movement_type="entrada", limit=None):
     """
     Obtiene datos de entradas para generación de reportes.
 
@@ -1012,57 +1770,116 @@ def get_report_data(fecha_inicio=None, fecha_fin=None, cc_selected=None, movemen
         fecha_inicio (str, optional): Fecha de inicio en formato 'YYYY-MM-DD'.
         fecha_fin (str, optional): Fecha de fin en formato 'YYYY-MM-DD'.
         cc_selected (int | list[int], optional): Centro(s) de costo a filtrar.
+        limit (int, optional): Máximo de renglones (p. ej. para una vista previa).
 
     Returns:
         list[tuple]: Lista de tuplas (fecha_hora, c_c, nombre, cantidad,
-                     precio_unitario, observaciones).
+                     precio_unitario, unidad_medida).
 
     Raises:
         Exception: Si ocurre un error en la consulta.
     """
-    session = get_session()
+    stmt = _report_statement(fecha_inicio, fecha_fin, cc_selected, movement_type).order_by(
+        Movimientos.fecha_hora.desc(), DetalleMovimiento.id_detalle.desc()
+    )
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    session = get_cached_read_session()
     try:
-        query = session.query(
-            Movimientos.fecha_hora,
-            Proyectos.c_c,
-            Articulos.nombre,
-            DetalleMovimiento.cantidad,
-            Articulos.precio_unitario,
-            Articulos.unidad_medida
-        ).join(
-            DetalleMovimiento,
-            Movimientos.id_movimiento == DetalleMovimiento.id_movimiento,
-        ).join(
-            Articulos, DetalleMovimiento.id_articulo == Articulos.id_articulo
-        ).join(
-            Proyectos, Movimientos.id_proyecto == Proyectos.id_proyecto
-        ).filter(Movimientos.tipo == movement_type)
-
-        # Filtros de fecha
-        if fecha_inicio and fecha_fin:
-            query = query.filter(
-                and_(
-                    func.date(Movimientos.fecha_hora) >= fecha_inicio,
-                    func.date(Movimientos.fecha_hora) <= fecha_fin,
-                )
-            )
+        return [tuple(row) for row in session.execute(stmt)]
+    finally:
+        session.close()
 
-        # Filtro de centro de costo
-        if cc_selected is not None:
-            if isinstance(cc_selected, list):
-                query = query.filter(Proyectos.c_c.in_(cc_selected))
-            else:
-                query = query.filter(Proyectos.c_c == cc_selected)
 
-        return query.order_by(Movimientos.fecha_hora.desc()).all()
+@versioned_cache()
+def count_report_rows(fecha_inicio=None, fecha_fin=None, cc_selected=None, movement_type="entrada"):
+    """
+    Cuenta los renglones que tendría el reporte, sin traerlos.
+
+    Args:
+        fecha_inicio (str, optional): Fecha de inicio en formato 'YYYY-MM-DD'.
+        fecha_fin (str, optional): Fecha de fin en formato 'YYYY-MM-DD'.
+        cc_selected (int | list[int], optional): Centro(s) de costo a filtrar.
+        movement_type (str): 'entrada' o 'salida'.
+
+    Returns:
+        int: Cantidad de renglones.
+    """
+    stmt = select(func.count()).select_from(
+        _report_statement(fecha_inicio, fecha_fin, cc_selected, movement_type).subquery()
+    )
+    session = get_cached_read_session()
+    try:
+        return session.execute(stmt).scalar() or 0
     finally:
         session.close()
 
 
+def iter_report_data(
+    fecha_inicio=None,
+    fecha_fin=None,
+    cc_selected=None,
+    movement_type="entrada",
+    chunk_size=REPORT_CHUNK_SIZE,
+):
+    """
+    Recorre los renglones del reporte en bloques, con memoria acotada.
+
+    Cada bloque es una consulta independiente paginada por llave sobre
+    (fecha_hora, id_detalle), en el mismo orden que get_report_data. El
+    conector mysql-connector no permite cursores del lado del servidor
+    (SQLAlchemy siempre lo usa con buffered=True), así que yield_per traería
+    igualmente todo el resultado al cliente; con bloques por llave la memoria
+    depende de chunk_size y no se retiene una conexión mientras se dibuja
+    el PDF entre bloque y bloque.
+
+    Los movimientos sin fecha_hora no se incluyen (las escrituras siempre la
+    registran).
+
+    Args:
+        fecha_inicio (str, optional): Fecha de inicio en formato 'YYYY-MM-DD'.
+        fecha_fin (str, optional): Fecha de fin en formato 'YYYY-MM-DD'.
+        cc_selected (int | list[int], optional): Centro(s) de costo a filtrar.
+        movement_type (str): 'entrada' o 'salida'.
+        chunk_size (int): Renglones por bloque.
+
+    Yields:
+        list[tuple]: Bloques de hasta chunk_size tuplas con el formato de get_report_data.
+    """
+    base = _report_statement(fecha_inicio, fecha_fin, cc_selected, movement_type).add_columns(
+        DetalleMovimiento.id_detalle
+    ).where(Movimientos.fecha_hora.is_not(None))
+    cursor = None
+    while True:
+        stmt = base
+        if cursor is not None:
+            last_fecha, last_id = cursor
+            stmt = stmt.where(
+                Movimientos.fecha_hora <= last_fecha,
+                (Movimientos.fecha_hora < last_fecha) | (DetalleMovimiento.id_detalle < last_id),
+            )
+        stmt = stmt.order_by(
+            Movimientos.fecha_hora.desc(), DetalleMovimiento.id_detalle.desc()
+        ).limit(chunk_size)
+
+        session = get_session(shared=False)
+        try:
+            rows = session.execute(stmt).all()
+        finally:
+            session.close()
+        if not rows:
+            return
+        cursor = (rows[-1].fecha_hora, rows[-1].id_detalle)
+        yield [tuple(row)[:-1] for row in rows]
+        if len(rows) < chunk_size:
+            return
+
+
 # =============================================================================
 # REPORTES - GENERACIÓN DE PDF
 # =============================================================================
 
+@versioned_cache()
 def get_comparacion_data(fecha_inicio=None, fecha_fin=None, cc_selected=None):
     """
     Obtiene datos agrupados de entradas y salidas por artículo para un centro de costo,
@@ -1077,22 +1894,10 @@ def get_comparacion_data(fecha_inicio=None, fecha_fin=None, cc_selected=None):
         list[dict]: Lista de diccionarios con campos:
             c_c, material, tipo, total_entrada, total_salida, diferencia, porcentaje_uso
     """
-    session = get_session()
+    session = get_cached_read_session()
     try:
-        date_filters = []
-        if fecha_inicio and fecha_fin:
-            date_filters = [
-                func.date(Movimientos.fecha_hora) >= fecha_inicio,
-                func.date(Movimientos.fecha_hora) <= fecha_fin,
-            ]
-
-        cc_selecteds = []
-        if cc_selected is not None:
-            if isinstance(cc_selected, list):
-                cc_selecteds = [Proyectos.c_c.in_(cc_selected)]
-            else:
-                cc_selecteds = [Proyectos.c_c == cc_selected]
-
+        # Lee del resumen diario: el costo depende de cuántos artículos tiene
+        # cada centro de costo y no de cuántas líneas de movimiento existen.
         base_query = (
             session.query(
                 Proyectos.c_c,
@@ -1100,20 +1905,19 @@ def get_comparacion_data(fecha_inicio=None, fecha_fin=None, cc_selected=None):
                 Articulos.tipo,
                 Articulos.unidad_medida,
                 Articulos.precio_unitario,
-                Movimientos.tipo.label("tipo_movimiento"),
-                func.sum(DetalleMovimiento.cantidad).label("total_cantidad"),
+                ResumenMovimientosDiario.tipo_movimiento,
+                func.sum(ResumenMovimientosDiario.cantidad).label("total_cantidad"),
             )
-            .join(DetalleMovimiento, Movimientos.id_movimiento == DetalleMovimiento.id_movimiento)
-            .join(Articulos, DetalleMovimiento.id_articulo == Articulos.id_articulo)
-            .join(Proyectos, Movimientos.id_proyecto == Proyectos.id_proyecto)
-            .filter(*date_filters, *cc_selecteds)
+            .join(Proyectos, ResumenMovimientosDiario.id_proyecto == Proyectos.id_proyecto)
+            .join(Articulos, ResumenMovimientosDiario.id_articulo == Articulos.id_articulo)
+            .filter(*build_rollup_filters(fecha_inicio, fecha_fin, cc_selected))
             .group_by(
                 Proyectos.c_c,
                 Articulos.nombre,
                 Articulos.tipo,
                 Articulos.unidad_medida,
                 Articulos.precio_unitario,
-                Movimientos.tipo,
+                ResumenMovimientosDiario.tipo_movimiento,
             )
             .all()
         )
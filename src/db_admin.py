@@ -0,0 +1,325 @@
+"""
+db_admin.py - Comandos de administración de la base de datos
+
+Ejecutar desde la raíz del proyecto. Sin --url se usa la conexión
+[mysql_local] de .streamlit/secrets.toml; con --url puede apuntarse a otra
+base, por ejemplo una copia local en SQLite (sqlite:///almacen_local.db).
+
+    python src/db_admin.py migrate
+    python src/db_admin.py check-plans
+    python src/db_admin.py rebuild-rollup
+    python src/db_admin.py --url sqlite:///almacen_local.db load-dump --multiply 10
+    python src/db_admin.py retry-stats
+    python src/db_admin.py bench-excel --filas 1000 100000 1000000
+    python src/db_admin.py bench-pdf --filas 1000 20000
+    python src/db_admin.py bench-pdf --filas 20000 --comparar --minimo 5
+"""
+import argparse
+import sys
+
+from utils import get_engine, init_engine
+
+
+def cmd_migrate(args):
+    from migrations import apply_migrations
+
+    applied = apply_migrations(get_engine())
+    if applied:
+        for migration in applied:
+            print(f"Aplicada migración {migration.version:03d} - {migration.name}")
+    else:
+        print("El esquema ya está actualizado.")
+    return 0
+
+
+def cmd_check_plans(args):
+    from query_plans import check_query_plans
+
+    results = check_query_plans()
+    failures = 0
+    for result in results:
+        status = "OK   " if result.uses_index else "FALLA"
+        failures += not result.uses_index
+        print(f"{status} {result.name:<32} {result.table:<22} {result.detail}")
+    if failures:
+        print(f"{failures} consulta(s) recorren tablas completas.")
+        return 1
+    print("Todas las consultas frecuentes usan índices.")
+    return 0
+
+
+def cmd_rebuild_rollup(args):
+    from rollup import rebuild_rollup
+
+    with get_engine().begin() as connection:
+        rows = rebuild_rollup(connection)
+    print(f"Resumen diario reconstruido: {rows} fila(s).")
+    return 0
+
+
+def cmd_load_dump(args):
+    from dump_loader import load_fixture
+
+    if not args.url:
+        # Protección: la carga nunca debe caer por omisión en la base configurada.
+        print("load-dump requiere --url explícito con la base destino.")
+        return 2
+    counts = load_fixture(
+        get_engine(),
+        args.paths,
+        multiply=args.multiply,
+        replace=args.replace,
+        movimientos=args.movimientos,
+    )
+    for table, rows in counts.items():
+        print(f"{table:<22} {rows} fila(s)")
+    return 0
+
+
+def cmd_retry_stats(args):
+    import data  # noqa: F401  (registra las escrituras decoradas)
+    from retry import get_retry_metrics
+
+    metrics = get_retry_metrics()
+    if not metrics:
+        # Con el backend "memory" los contadores viven en cada proceso de Streamlit.
+        print("Sin reintentos registrados en el backend de caché.")
+        return 0
+    for function_name, counts in metrics.items():
+        detail = ", ".join(f"{outcome}={n}" for outcome, n in sorted(counts.items()))
+        print(f"{function_name:<22} {detail}")
+    return 0
+
+
+def _synthetic_report_chunks(rows, chunk_size=1000):
+    import datetime
+
+    start = datetime.datetime(2025, 1, 1)
+    for first in range(0, rows, chunk_size):
+        yield [
+            (
+                start + datetime.timedelta(minutes=i),
+                1000 + i % 20,
+                # Cerca de la mitad de los nombres del catálogo real no caben
+                # en una línea de la columna Material del PDF.
+                f"Material de prueba {i % 5000}" + (" CABLE UTP CAT6 305M AZUL EXTERIOR" if i % 2 else ""),
+                1 + i % 7,
+                round(10 + i % 300 * 1.25, 2),
+                "pza",
+            )
+            for i in range(first, min(first + chunk_size, rows))
+        ]
+
+
+def _original_reporte_pdf(report_chunks, movement_type="salida", output=None):
+    """
+    Arma el PDF como lo hacía create_reporte_pdf antes de partirlo en bloques.
+
+    Una sola Table con un Paragraph por material, la hoja de estilos de
+    ejemplo armada en cada llamada y el logo original en cada página. Solo
+    sirve de referencia para bench-pdf --comparar.
+    """
+    import datetime
+    from xml.sax.saxutils import escape
+
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    import pdf_styles
+    from reportes import REPORTE_HEADERS_PDF, _build_metadata_table
+    from utils import LOGO_PATH
+
+    report_data = [row for chunk in report_chunks for row in chunk]
+    styles = getSampleStyleSheet()
+    material_style = ParagraphStyle(
+        "MaterialCell",
+        parent=styles["BodyText"],
+        fontSize=pdf_styles.PDF_MATERIAL_FONT_SIZE,
+        leading=pdf_styles.PDF_MATERIAL_LEADING,
+        alignment=1,
+        textColor=pdf_styles.PDF_TABLE_TEXT_COLOR,
+    )
+    table_data = [REPORTE_HEADERS_PDF]
+    for fecha_hora, cc, material, cantidad, precio_unitario, unidad in report_data:
+        table_data.append([
+            fecha_hora.strftime("%Y-%m-%d %H:%M"),
+            Paragraph(escape(material), material_style),
+            str(cantidad),
+            str(unidad),
+            f"${precio_unitario:.2f}" if precio_unitario else "$0.00",
+            f"${cantidad * (precio_unitario or 0):.2f}",
+        ])
+    table = Table(table_data, colWidths=pdf_styles.PDF_COL_WIDTHS)
+    table.setStyle(TableStyle(pdf_styles.PDF_TABLE_STYLE_REPORTE))
+
+    def draw_logo(canvas, doc):
+        canvas.saveState()
+        canvas.drawImage(
+            LOGO_PATH,
+            x=pdf_styles.PDF_LOGO_X,
+            y=doc.pagesize[1] - pdf_styles.PDF_LOGO_LATER_PAGE_Y_OFFSET,
+            width=pdf_styles.PDF_LOGO_LATER_PAGE_WIDTH,
+            height=pdf_styles.PDF_LOGO_LATER_PAGE_HEIGHT,
+            preserveAspectRatio=True,
+            mask="auto",
+        )
+        canvas.restoreState()
+        pdf_styles.draw_pdf_page_number(canvas, doc)
+
+    doc = SimpleDocTemplate(
+        output, pagesize=letter, rightMargin=50, leftMargin=50, topMargin=72, bottomMargin=18
+    )
+    doc.build(
+        [
+            Paragraph(f"Reporte de {movement_type}s de Almacén", styles["Heading1"]),
+            Spacer(1, 0.2 * inch),
+            _build_metadata_table(datetime.datetime.now(), report_data[0][1] if report_data else None),
+            Spacer(1, 0.3 * inch),
+            table,
+        ],
+        onFirstPage=draw_logo,
+        onLaterPages=draw_logo,
+    )
+    return output
+
+
+def _bench_report(create_report, suffix, filas):
+    import os
+    import tempfile
+    import time
+    import tracemalloc
+
+    # No usa la base de datos: mide solo la escritura del archivo, con
+    # renglones sintéticos. La memoria se mide en una segunda corrida porque
+    # tracemalloc hace varias veces más lenta la escritura.
+    print(f"{'renglones':>10} {'segundos':>9} {'pico MB':>8} {'archivo MB':>10}")
+    for rows in filas:
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        os.close(fd)
+        try:
+            started = time.perf_counter()
+            create_report(_synthetic_report_chunks(rows), "salida", output=path)
+            elapsed = time.perf_counter() - started
+            size = os.path.getsize(path)
+
+            tracemalloc.start()
+            create_report(_synthetic_report_chunks(rows), "salida", output=path)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        finally:
+            os.remove(path)
+        print(f"{rows:>10} {elapsed:>9.1f} {peak / 1e6:>8.1f} {size / 1e6:>10.1f}")
+    return 0
+
+
+def cmd_bench_excel(args):
+    from reportes import create_reporte_excel
+
+    return _bench_report(create_reporte_excel, ".xlsx", args.filas)
+
+
+def _compare_report_pdf(filas, repeticiones, minimo):
+    import time
+    from io import BytesIO
+
+    from reportes import create_reporte_pdf
+
+    # Se toma la mejor de las repeticiones de cada versión, alternándolas,
+    # para que la carga de la máquina afecte a ambas por igual.
+    print(f"{'renglones':>10} {'original s':>11} {'actual s':>9} {'veces':>6}")
+    failures = 0
+    for rows in filas:
+        elapsed = {_original_reporte_pdf: [], create_reporte_pdf: []}
+        for _ in range(repeticiones):
+            for create_report, times in elapsed.items():
+                started = time.perf_counter()
+                create_report(_synthetic_report_chunks(rows), "salida", output=BytesIO())
+                times.append(time.perf_counter() - started)
+        original = min(elapsed[_original_reporte_pdf])
+        actual = min(elapsed[create_reporte_pdf])
+        speedup = original / actual
+        failures += minimo is not None and speedup < minimo
+        print(f"{rows:>10} {original:>11.1f} {actual:>9.1f} {speedup:>6.1f}")
+    if failures:
+        print(f"{failures} corrida(s) por debajo de {minimo:g} veces más rápido que el original.")
+        return 1
+    return 0
+
+
+def cmd_bench_pdf(args):
+    from reportes import create_reporte_pdf
+
+    if args.comparar:
+        return _compare_report_pdf(args.filas, args.repeticiones, args.minimo)
+    return _bench_report(create_reporte_pdf, ".pdf", args.filas)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Administración de la base de datos del almacén.")
+    parser.add_argument("--url", help="URL de SQLAlchemy; por defecto [mysql_local] de secrets.toml")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("migrate", help="Aplica las migraciones pendientes").set_defaults(func=cmd_migrate)
+    subparsers.add_parser(
+        "check-plans", help="Verifica con EXPLAIN que las consultas frecuentes usan índices"
+    ).set_defaults(func=cmd_check_plans)
+    subparsers.add_parser(
+        "rebuild-rollup", help="Reconstruye el resumen diario de movimientos desde el historial"
+    ).set_defaults(func=cmd_rebuild_rollup)
+    load_dump = subparsers.add_parser(
+        "load-dump", help="Carga dumps de mysqldump (por defecto DumpALMACEN3) como fixture local"
+    )
+    load_dump.add_argument("paths", nargs="*", help="Archivos .sql; por defecto DumpALMACEN3/*.sql")
+    load_dump.add_argument(
+        "--multiply", type=int, default=1, help="Copias de los datos para generar volumen (por defecto 1)"
+    )
+    load_dump.add_argument(
+        "--movimientos", type=int, default=0, help="Movimientos sintéticos a generar (por defecto 0)"
+    )
+    load_dump.add_argument("--replace", action="store_true", help="Vacía las tablas antes de cargarlas")
+    load_dump.set_defaults(func=cmd_load_dump)
+    subparsers.add_parser(
+        "retry-stats", help="Muestra los reintentos de escrituras por error transitorio"
+    ).set_defaults(func=cmd_retry_stats)
+    bench_excel = subparsers.add_parser(
+        "bench-excel", help="Mide tiempo y memoria pico del Excel de reportes con datos sintéticos"
+    )
+    bench_excel.add_argument(
+        "--filas", type=int, nargs="+", default=[1000, 10000, 100000],
+        help="Renglones por corrida (por defecto 1000 10000 100000)",
+    )
+    bench_excel.set_defaults(func=cmd_bench_excel)
+    bench_pdf = subparsers.add_parser(
+        "bench-pdf", help="Mide tiempo y memoria pico del PDF de reportes con datos sintéticos"
+    )
+    bench_pdf.add_argument(
+        "--filas", type=int, nargs="+", default=[1000, 20000],
+        help="Renglones por corrida (por defecto 1000 20000)",
+    )
+    bench_pdf.add_argument(
+        "--comparar", action="store_true",
+        help="Compara el tiempo contra el PDF original de una sola tabla",
+    )
+    bench_pdf.add_argument(
+        "--repeticiones", type=int, default=1,
+        help="Corridas de cada versión con --comparar; se toma la mejor (por defecto 1)",
+    )
+    bench_pdf.add_argument(
+        "--minimo", type=float,
+        help="Con --comparar, termina con error si alguna corrida mejora menos de estas veces",
+    )
+    bench_pdf.set_defaults(func=cmd_bench_pdf)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.url:
+        init_engine(args.url)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
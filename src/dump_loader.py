@@ -0,0 +1,431 @@
+"""
+dump_loader.py - Carga los dumps de mysqldump (DumpALMACEN3/*.sql) como fixture
+
+Lee los archivos de mysqldump como flujo, línea por línea: toma el orden de
+columnas de cada CREATE TABLE y convierte cada INSERT ... VALUES (...),(...)
+en filas de Python sin ejecutar el SQL original. Las filas se insertan por
+bloques con executemany en una base MySQL local o en un archivo SQLite que la
+aplicación puede usar con --url.
+
+Con --multiply N se generan N copias de cada tabla con ids desplazados (y
+nombres con sufijo " #k"), manteniendo las relaciones entre tablas, para
+probar las consultas de data.py con volúmenes grandes. Como los dumps no
+traen historial, --movimientos N genera N movimientos sintéticos con sus
+detalles para medir el historial y los reportes.
+
+Uso desde la raíz del proyecto:
+
+    python src/db_admin.py --url sqlite:///fixtures/almacen.db load-dump --replace
+    python src/db_admin.py --url sqlite:///fixtures/almacen_x20.db load-dump --multiply 20 --movimientos 50000
+"""
+import random
+import re
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import MetaData, String, Table, func, inspect, insert, select, text
+
+from classes import Articulos, Base, Proyectos
+
+DEFAULT_DUMP_DIR = Path(__file__).resolve().parent.parent / "DumpALMACEN3"
+LOAD_CHUNK_SIZE = 1000
+SYNTHETIC_PROJECTS = 20
+SYNTHETIC_DAYS = 365
+
+# Columnas de texto que reciben el sufijo " #k" en cada copia de --multiply
+# y columnas numéricas únicas que se desplazan igual que la llave primaria.
+MULTIPLY_SUFFIX_COLUMNS = {
+    "articulos": ("nombre", "num_catalogo"),
+    "proveedores": ("nombre",),
+    "proyectos": ("nombre_obra",),
+}
+MULTIPLY_OFFSET_COLUMNS = {
+    "proyectos": ("c_c",),
+}
+
+
+# =============================================================================
+# LECTURA DEL DUMP
+# =============================================================================
+
+_CREATE_TABLE = re.compile(r"^CREATE TABLE `([^`]+)`")
+_COLUMN_DEFINITION = re.compile(r"^\s+`([^`]+)`\s")
+_INSERT = re.compile(r"^INSERT INTO `([^`]+)`\s*(?:\(([^)]*)\)\s*)?VALUES\s*", re.IGNORECASE)
+_VALUE_TOKEN = re.compile(
+    r"""
+    (?P<string>'(?:[^'\\]|\\.|'')*')
+    | (?P<null>NULL)
+    | (?P<hex>0x[0-9A-Fa-f]+)
+    | (?P<number>-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)
+    | (?P<open>\()
+    | (?P<close>\))
+    """,
+    re.VERBOSE,
+)
+_ESCAPES = {
+    "0": "\0", "n": "\n", "r": "\r", "t": "\t", "Z": "\x1a",
+    "b": "\b", "\\": "\\", "'": "'", '"': '"',
+}
+_ESCAPE = re.compile(r"\\(.)|''")
+
+
+def _unescape(literal):
+    body = literal[1:-1]
+    return _ESCAPE.sub(
+        lambda m: "'" if m.group(0) == "''" else _ESCAPES.get(m.group(1), m.group(1)),
+        body,
+    )
+
+
+def parse_values(values_sql):
+    """
+    Convierte la parte VALUES de un INSERT de mysqldump en tuplas.
+
+    Args:
+        values_sql (str): Texto desde el primer "(" hasta el ";" final.
+
+    Returns:
+        list[tuple]: Una tupla por fila, con str, int, float, bytes o None.
+    """
+    rows = []
+    current = None
+    for match in _VALUE_TOKEN.finditer(values_sql):
+        kind = match.lastgroup
+        token = match.group(kind)
+        if kind == "open":
+            current = []
+        elif kind == "close":
+            rows.append(tuple(current))
+            current = None
+        elif current is None:
+            continue
+        elif kind == "string":
+            current.append(_unescape(token))
+        elif kind == "null":
+            current.append(None)
+        elif kind == "number":
+            current.append(float(token) if any(c in token for c in ".eE") else int(token))
+        else:
+            current.append(bytes.fromhex(token[2:]))
+    return rows
+
+
+def iter_dump(path):
+    """
+    Recorre un archivo de mysqldump sin cargarlo completo en memoria.
+
+    Args:
+        path (str | Path): Ruta del archivo .sql.
+
+    Yields:
+        tuple[str, list[str], list[tuple]]: (tabla, columnas, filas) por cada
+            INSERT del archivo. Las columnas salen de la lista explícita del
+            INSERT o, si no la tiene, del CREATE TABLE previo. Cada CREATE
+            TABLE produce además una tupla sin filas, aunque la tabla esté vacía.
+    """
+    columns_by_table = {}
+    creating = None
+    with open(path, encoding="utf-8") as dump:
+        for line in dump:
+            if creating is not None:
+                column = _COLUMN_DEFINITION.match(line)
+                if column:
+                    columns_by_table[creating].append(column.group(1))
+                elif line.startswith(")"):
+                    yield creating, columns_by_table[creating], []
+                    creating = None
+                continue
+
+            create = _CREATE_TABLE.match(line)
+            if create:
+                creating = create.group(1)
+                columns_by_table[creating] = []
+                continue
+
+            insert_match = _INSERT.match(line)
+            if not insert_match:
+                continue
+            table = insert_match.group(1)
+            if insert_match.group(2):
+                columns = [c.strip().strip("`") for c in insert_match.group(2).split(",")]
+            else:
+                columns = columns_by_table.get(table)
+                if not columns:
+                    raise ValueError(f"{path}: INSERT en `{table}` sin CREATE TABLE previo")
+            yield table, columns, parse_values(line[insert_match.end():])
+
+
+# =============================================================================
+# CARGA
+# =============================================================================
+
+def _python_defaults(table_name):
+    """Valores por defecto del lado de Python definidos en classes.py (p. ej. disponible=True)."""
+    model_table = Base.metadata.tables.get(table_name)
+    if model_table is None:
+        return {}
+    return {
+        column.name: column.default.arg
+        for column in model_table.columns
+        if column.default is not None and column.default.is_scalar
+    }
+
+
+def _prepare_target(engine):
+    if engine.dialect.name == "sqlite":
+        Base.metadata.create_all(engine)
+    elif not inspect(engine).has_table("articulos"):
+        raise ValueError(
+            "La base destino no tiene el esquema; créelo con sql_code/sql_table_creation.sql."
+        )
+
+
+def _count_rows(connection, tables):
+    return {
+        table.name: connection.execute(select(func.count()).select_from(table)).scalar()
+        for table in tables
+    }
+
+
+def _disable_fk_checks(connection):
+    if connection.dialect.name == "mysql":
+        connection.execute(text("SET FOREIGN_KEY_CHECKS=0"))
+
+
+def load_dump_files(engine, paths, replace=False, chunk_size=LOAD_CHUNK_SIZE):
+    """
+    Carga uno o más archivos de mysqldump en la base del engine.
+
+    En SQLite el esquema se crea con classes.py; en MySQL debe existir. Las
+    columnas del dump que no existen en la tabla destino se ignoran y las que
+    faltan toman el valor por defecto de classes.py o de la base.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): Base destino.
+        paths (Iterable[str | Path]): Archivos .sql a cargar.
+        replace (bool): Si True, vacía cada tabla del dump antes de cargarla
+            (también las que el dump trae vacías).
+        chunk_size (int): Filas por executemany.
+
+    Returns:
+        dict[str, int]: Filas insertadas por tabla del dump.
+    """
+    _prepare_target(engine)
+    loaded = {}
+    targets = {}
+    metadata = MetaData()
+    for path in paths:
+        with engine.begin() as connection:
+            _disable_fk_checks(connection)
+            for table_name, columns, rows in iter_dump(path):
+                if table_name not in loaded:
+                    if not inspect(connection).has_table(table_name):
+                        raise ValueError(f"La tabla `{table_name}` no existe en la base destino")
+                    targets[table_name] = Table(table_name, metadata, autoload_with=connection)
+                    if replace:
+                        connection.execute(targets[table_name].delete())
+                    loaded[table_name] = 0
+                if not rows:
+                    continue
+
+                target = targets[table_name]
+                keep = [(i, c) for i, c in enumerate(columns) if c in target.columns]
+                defaults = {
+                    name: value
+                    for name, value in _python_defaults(table_name).items()
+                    if name not in columns and name in target.columns
+                }
+                records = [
+                    dict(defaults, **{name: row[i] for i, name in keep})
+                    for row in rows
+                ]
+                for start in range(0, len(records), chunk_size):
+                    connection.execute(insert(target), records[start:start + chunk_size])
+                loaded[table_name] += len(records)
+    return loaded
+
+
+def multiply_tables(engine, tables, factor):
+    """
+    Replica factor - 1 veces las filas de las tablas con ids desplazados.
+
+    La copia k de una fila con id n recibe el id n + k * max(id); las llaves
+    foráneas hacia tablas replicadas se desplazan igual, así que cada copia
+    es un conjunto de datos consistente.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): Base ya cargada.
+        tables (Iterable[str]): Tablas a replicar.
+        factor (int): Número total de copias (1 no hace nada).
+
+    Returns:
+        dict[str, int]: Filas finales por tabla.
+    """
+    tables = list(tables)
+    with engine.begin() as connection:
+        _disable_fk_checks(connection)
+        metadata = MetaData()
+        reflected = {
+            name: Table(name, metadata, autoload_with=connection) for name in tables
+        }
+        primary_keys = {}
+        max_ids = {}
+        for name, table in reflected.items():
+            pk = list(table.primary_key.columns)
+            if len(pk) != 1:
+                continue
+            primary_keys[name] = pk[0]
+            max_ids[name] = connection.execute(select(func.max(pk[0]))).scalar() or 0
+
+        for name, table in reflected.items():
+            if name not in primary_keys or not max_ids[name]:
+                continue
+            pk = primary_keys[name]
+            offsets = {pk.name: max_ids[name]}
+            for fk in table.foreign_keys:
+                parent = fk.column.table.name
+                if parent in max_ids:
+                    offsets[fk.parent.name] = max_ids[parent]
+            for column_name in MULTIPLY_OFFSET_COLUMNS.get(name, ()):
+                offsets[column_name] = (
+                    connection.execute(select(func.max(table.c[column_name]))).scalar() or 0
+                )
+
+            for k in range(1, factor):
+                expressions = []
+                for column in table.columns:
+                    if column.name in offsets:
+                        expressions.append(column + k * offsets[column.name])
+                    elif column.name in MULTIPLY_SUFFIX_COLUMNS.get(name, ()):
+                        expressions.append(column.cast(String) + f" #{k}")
+                    else:
+                        expressions.append(column)
+                connection.execute(
+                    insert(table).from_select(
+                        [column.name for column in table.columns],
+                        select(*expressions).where(pk <= max_ids[name]),
+                    )
+                )
+
+        return _count_rows(connection, reflected.values())
+
+
+def generate_movements(engine, count, proyectos=SYNTHETIC_PROJECTS, days=SYNTHETIC_DAYS, seed=0):
+    """
+    Genera movimientos sintéticos sobre los artículos cargados.
+
+    Los dumps solo traen catálogo y proveedores; para medir el historial y los
+    reportes se crean `count` entradas/salidas repartidas en los últimos
+    `days` días, cada una con 1 a 10 detalles de artículos que no son cable.
+    Si no hay proyectos se crean `proyectos` obras sintéticas. El stock de los
+    artículos no se modifica. Con la misma semilla el resultado es idéntico.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): Base ya cargada.
+        count (int): Movimientos a generar.
+        proyectos (int): Obras sintéticas a crear si la tabla está vacía.
+        days (int): Días hacia atrás en los que se reparten los movimientos.
+        seed (int): Semilla del generador aleatorio.
+
+    Returns:
+        int: Detalles generados.
+    """
+    rng = random.Random(seed)
+    movimientos = Table("movimientos", MetaData(), autoload_with=engine)
+    detalles = Table("detalle_movimientos", MetaData(), autoload_with=engine)
+    with engine.begin() as connection:
+        _disable_fk_checks(connection)
+        project_ids = connection.execute(select(Proyectos.id_proyecto)).scalars().all()
+        if not project_ids:
+            connection.execute(
+                insert(Proyectos.__table__),
+                [
+                    {"c_c": 1000 + i, "nombre_obra": f"Obra sintética {i}", "encargado": f"Encargado {i % 5}"}
+                    for i in range(1, proyectos + 1)
+                ],
+            )
+            project_ids = connection.execute(select(Proyectos.id_proyecto)).scalars().all()
+        article_ids = connection.execute(
+            select(Articulos.id_articulo).where(Articulos.es_cable.is_not(True))
+        ).scalars().all()
+        if not article_ids:
+            return 0
+
+        next_movement = (
+            connection.execute(select(func.max(movimientos.c.id_movimiento))).scalar() or 0
+        ) + 1
+        first_detail = next_detail = (
+            connection.execute(select(func.max(detalles.c.id_detalle))).scalar() or 0
+        ) + 1
+        now = datetime.now().replace(microsecond=0)
+        movement_rows = []
+        detail_rows = []
+        for id_movimiento in range(next_movement, next_movement + count):
+            movement_rows.append({
+                "id_movimiento": id_movimiento,
+                "id_proyecto": rng.choice(project_ids),
+                "tipo": rng.choice(("entrada", "salida")),
+                "fecha_hora": now - timedelta(seconds=rng.randrange(days * 86400)),
+                "observaciones": None,
+                "responsable": f"Responsable {rng.randrange(10)}",
+            })
+            for id_articulo in rng.sample(article_ids, min(len(article_ids), rng.randint(1, 10))):
+                detail_rows.append({
+                    "id_detalle": next_detail,
+                    "id_movimiento": id_movimiento,
+                    "id_articulo": id_articulo,
+                    "cantidad": rng.randint(1, 20),
+                    "id_punta": None,
+                })
+                next_detail += 1
+            if len(detail_rows) >= LOAD_CHUNK_SIZE:
+                connection.execute(insert(movimientos), movement_rows)
+                connection.execute(insert(detalles), detail_rows)
+                movement_rows, detail_rows = [], []
+        if movement_rows:
+            connection.execute(insert(movimientos), movement_rows)
+        if detail_rows:
+            connection.execute(insert(detalles), detail_rows)
+    return next_detail - first_detail
+
+
+def load_fixture(engine, paths=None, multiply=1, replace=False, movimientos=0):
+    """
+    Carga los dumps, replica los datos si se pide y deja la base lista para la app.
+
+    Después de cargar registra las migraciones como aplicadas (el esquema ya
+    es el actual) y reconstruye el resumen diario de movimientos.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): Base destino.
+        paths (Iterable[str | Path], optional): Archivos .sql; por defecto
+            todos los de DumpALMACEN3.
+        multiply (int): Número de copias de los datos.
+        replace (bool): Si True, vacía las tablas antes de cargarlas.
+        movimientos (int): Movimientos sintéticos a generar (0 para ninguno).
+
+    Returns:
+        dict[str, int]: Filas finales por tabla cargada o generada.
+    """
+    from migrations import apply_migrations
+    from rollup import rebuild_rollup
+
+    if not paths:
+        paths = sorted(DEFAULT_DUMP_DIR.glob("*.sql"))
+    counts = load_dump_files(engine, paths, replace=replace)
+    if multiply > 1:
+        multiply_tables(engine, counts, multiply)
+    if movimientos:
+        generate_movements(engine, movimientos)
+
+    apply_migrations(engine)
+    with engine.begin() as connection:
+        rebuild_rollup(connection)
+        metadata = MetaData()
+        tables = set(counts)
+        if movimientos:
+            tables |= {"proyectos", "movimientos", "detalle_movimientos"}
+        return _count_rows(
+            connection,
+            [Table(name, metadata, autoload_with=connection) for name in sorted(tables)],
+        )
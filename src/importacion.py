@@ -0,0 +1,290 @@
+"""
+importacion.py - Importación de entradas desde listas de empaque CSV o Excel
+
+Lee un archivo CSV o XLSX fila por fila (sin cargarlo completo en memoria),
+valida cada fila contra el catálogo de artículos en una sola pasada y
+produce los movement_items que espera data.add_movement_to_db. Los
+artículos que no existen en el catálogo se marcan como nuevos y se crean al
+registrar la entrada.
+
+No contiene llamadas a Streamlit; la interfaz vive en p_entradas.py.
+
+Columnas reconocidas (los encabezados no distinguen mayúsculas ni acentos):
+
+    nombre*           descripcion, articulo, material
+    cantidad          cant, piezas            (* obligatoria si no es cable)
+    num_catalogo      catalogo, no catalogo, numero de catalogo, codigo, sku
+    es_cable          cable                   (si/no, 1/0, x)
+    nombre_punta      punta, carrete, tramo
+    longitud          metros, longitud (m)    (* obligatoria si es cable)
+    color
+    tipo              material / herramienta  (solo artículos nuevos)
+    categoria                                 (solo artículos nuevos)
+    unidad_medida     unidad, um              (solo artículos nuevos)
+    precio_unitario   precio, costo           (solo artículos nuevos)
+    stock_minimo      minimo                  (solo artículos nuevos)
+"""
+import codecs
+import csv
+from collections import namedtuple
+from pathlib import Path
+
+from search import normalize_text
+from utils import CATEGORIAS, TIPOS, UNIDAD_DE_MEDIDA
+
+ImportResult = namedtuple("ImportResult", ["items", "errors", "nuevos", "existentes"])
+
+MAX_ERRORS = 200
+
+_COLUMN_ALIASES = {
+    "nombre": ("nombre", "descripcion", "articulo", "material", "nombre item", "nombre_item"),
+    "cantidad": ("cantidad", "cant", "piezas"),
+    "num_catalogo": (
+        "num_catalogo", "num catalogo", "catalogo", "no catalogo", "no. catalogo",
+        "numero de catalogo", "codigo", "sku",
+    ),
+    "es_cable": ("es_cable", "es cable", "cable"),
+    "nombre_punta": ("nombre_punta", "nombre punta", "punta", "carrete", "tramo"),
+    "longitud": ("longitud", "metros", "longitud (m)", "longitud m"),
+    "color": ("color",),
+    "tipo": ("tipo",),
+    "categoria": ("categoria",),
+    "unidad_medida": ("unidad_medida", "unidad de medida", "unidad", "um"),
+    "precio_unitario": ("precio_unitario", "precio unitario", "precio", "costo"),
+    "stock_minimo": ("stock_minimo", "stock minimo", "minimo"),
+}
+_HEADER_TO_FIELD = {
+    normalize_text(alias): field
+    for field, aliases in _COLUMN_ALIASES.items()
+    for alias in aliases
+}
+_TRUE_VALUES = {"si", "s", "1", "x", "true", "verdadero", "yes"}
+
+
+# =============================================================================
+# LECTURA DE ARCHIVOS
+# =============================================================================
+
+def _iter_csv(file):
+    # utf-8-sig quita el BOM que agrega Excel al exportar CSV.
+    text = codecs.getreader("utf-8-sig")(file)
+    sample = text.read(4096)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+    except csv.Error:
+        # Una sola columna o muestra ambigua: CSV estándar separado por comas.
+        dialect = csv.excel
+    reader = csv.reader(_chain_sample(sample, text), dialect)
+    yield from reader
+
+
+def _chain_sample(sample, text):
+    # Reinyecta la muestra leída por el Sniffer sin rebobinar el archivo.
+    lines = sample.splitlines(keepends=True)
+    if lines and not lines[-1].endswith(("\n", "\r")):
+        lines[-1] += text.readline()
+    yield from lines
+    yield from text
+
+
+def _iter_xlsx(file):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        for row in workbook.active.iter_rows(values_only=True):
+            yield ["" if value is None else value for value in row]
+    finally:
+        workbook.close()
+
+
+def iter_packing_list_rows(file, filename):
+    """
+    Recorre las filas de una lista de empaque como diccionarios {campo: valor}.
+
+    Args:
+        file (BinaryIO): Archivo abierto en modo binario (p. ej. el de st.file_uploader).
+        filename (str): Nombre del archivo; su extensión define el formato.
+
+    Yields:
+        tuple[int, dict]: (número de fila en el archivo, valores por campo).
+
+    Raises:
+        ValueError: Si el formato no es CSV/XLSX o falta la columna de nombre.
+    """
+    extension = Path(filename).suffix.lower()
+    if extension == ".csv":
+        rows = _iter_csv(file)
+    elif extension in (".xlsx", ".xlsm"):
+        rows = _iter_xlsx(file)
+    else:
+        raise ValueError(f"Formato no soportado: {extension or filename}. Use CSV o XLSX.")
+
+    header = next(rows, None)
+    if header is None:
+        return
+    fields = [_HEADER_TO_FIELD.get(normalize_text(h)) for h in header]
+    if "nombre" not in fields:
+        raise ValueError("El archivo debe tener una columna 'nombre' (o 'descripcion').")
+
+    for row_number, row in enumerate(rows, start=2):
+        values = {
+            field: value
+            for field, value in zip(fields, row)
+            if field is not None
+        }
+        if all(str(v).strip() == "" for v in values.values()):
+            continue
+        yield row_number, values
+
+
+# =============================================================================
+# VALIDACIÓN
+# =============================================================================
+
+def _text(value):
+    return str(value).strip() if value is not None else ""
+
+
+def _number(value, field, errors, row_number):
+    text = _text(value).replace(",", ".") if isinstance(value, str) else value
+    if text in ("", None):
+        return None
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        errors.append(f"Fila {row_number}: '{field}' no es un número ({value}).")
+        return None
+
+
+def _choice(value, options, default, field, errors, row_number):
+    text = _text(value)
+    if not text:
+        return default
+    by_normalized = {normalize_text(option): option for option in options}
+    option = by_normalized.get(normalize_text(text))
+    if option is None:
+        errors.append(f"Fila {row_number}: {field} '{text}' no es válido.")
+    return option or default
+
+
+def _build_name_index(catalog):
+    """{nombre normalizado: fila}; con nombres repetidos gana el menor id."""
+    index = {}
+    for row in sorted(catalog.rows(), key=lambda r: r.id_articulo):
+        index.setdefault(normalize_text(row.nombre), row)
+    return index
+
+
+def _find_article(catalog, name_index, nombre, num_catalogo):
+    if num_catalogo:
+        row = catalog.by_num_catalogo(num_catalogo)
+        if row is not None:
+            return row
+    return catalog.by_name(nombre) or name_index.get(normalize_text(nombre))
+
+
+def parse_packing_list(file, filename, catalog):
+    """
+    Convierte una lista de empaque en movement_items validados contra el catálogo.
+
+    Cada fila se resuelve primero por número de catálogo y luego por nombre
+    (sin distinguir mayúsculas ni acentos). Las filas de artículos que no
+    existen crean un artículo nuevo; si el mismo artículo nuevo aparece en
+    varias filas, solo la primera lo crea y las demás suman a él.
+
+    Args:
+        file (BinaryIO): Archivo CSV o XLSX abierto en modo binario.
+        filename (str): Nombre original del archivo.
+        catalog (ArticleCatalog): Catálogo de artículos vigente.
+
+    Returns:
+        ImportResult: items (list[dict]), errors (list[str]), nuevos (int),
+            existentes (int). Si errors no está vacía, items no debe registrarse.
+
+    Raises:
+        ValueError: Si el archivo no tiene un formato o encabezado válido.
+    """
+    items = []
+    errors = []
+    new_articles = {}
+    existentes = 0
+    name_index = _build_name_index(catalog)
+
+    for row_number, values in iter_packing_list_rows(file, filename):
+        if len(errors) >= MAX_ERRORS:
+            errors.append(f"Se detuvo la validación después de {MAX_ERRORS} errores.")
+            break
+        row_errors = []
+
+        nombre = _text(values.get("nombre"))
+        if not nombre:
+            errors.append(f"Fila {row_number}: falta el nombre del artículo.")
+            continue
+        num_catalogo = _text(values.get("num_catalogo"))
+        articulo = _find_article(catalog, name_index, nombre, num_catalogo)
+        new_key = normalize_text(nombre)
+
+        if articulo is not None:
+            es_cable = bool(articulo.es_cable)
+            nombre_item = articulo.nombre
+        elif new_key in new_articles:
+            # Artículo nuevo ya creado por una fila anterior del archivo.
+            nombre_item, es_cable = new_articles[new_key]
+        else:
+            es_cable = normalize_text(_text(values.get("es_cable"))) in _TRUE_VALUES
+            nombre_item = nombre
+
+        cantidad = _number(values.get("cantidad"), "cantidad", row_errors, row_number)
+        longitud = _number(values.get("longitud"), "longitud", row_errors, row_number)
+        nombre_punta = _text(values.get("nombre_punta"))
+        if es_cable:
+            if not longitud or longitud <= 0:
+                row_errors.append(f"Fila {row_number}: la longitud del cable debe ser mayor a 0.")
+            if not nombre_punta:
+                row_errors.append(f"Fila {row_number}: falta el nombre de la punta/carrete/tramo.")
+        elif cantidad is None or cantidad <= 0:
+            row_errors.append(f"Fila {row_number}: la cantidad debe ser mayor a 0.")
+
+        item = {
+            "is_new": False,
+            "nombre_item": nombre_item,
+            "es_cable": es_cable,
+            "nombre_punta": nombre_punta if es_cable else "",
+            "longitud": (longitud or 0.0) if es_cable else 0.0,
+            "cantidad": (cantidad or 0) if not es_cable else 0,
+            "color": _text(values.get("color")) or None,
+        }
+
+        if articulo is None and new_key not in new_articles:
+            item.update({
+                "is_new": True,
+                "num_catalogo": num_catalogo,
+                "tipo": _choice(values.get("tipo"), TIPOS, "material", "tipo", row_errors, row_number),
+                "categoria": _choice(
+                    values.get("categoria"), CATEGORIAS, "general", "categoria", row_errors, row_number
+                ),
+                "unidad_medida": _choice(
+                    values.get("unidad_medida"),
+                    UNIDAD_DE_MEDIDA,
+                    "m" if es_cable else "pza",
+                    "unidad de medida",
+                    row_errors,
+                    row_number,
+                ),
+                "precio_unitario": _number(
+                    values.get("precio_unitario"), "precio", row_errors, row_number
+                ) or 0.0,
+                "stock_minimo": _number(
+                    values.get("stock_minimo"), "stock mínimo", row_errors, row_number
+                ) or 0,
+            })
+            new_articles[new_key] = (nombre, es_cable)
+        elif articulo is not None:
+            existentes += 1
+
+        errors.extend(row_errors)
+        if not row_errors:
+            items.append(item)
+
+    return ImportResult(items, errors, len(new_articles), existentes)
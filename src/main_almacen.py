@@ -7,7 +7,7 @@ entre las secciones: Inventario, Entradas, Salidas, Proyectos y Reportes.
 """
 
 import streamlit as st
-from utils import LOGO_PATH
+from utils import LOGO_PATH, request_session
 from user_passwords import main as login_main, logout, get_allowed_pages
 from p_entradas import main as entradas_main
 from p_inventario import main as inventario_main
@@ -46,21 +46,22 @@ with col2:
     st.image(str(LOGO_PATH))
     st.title('Almacén USSE')
 
-if page == "Inventario":
-    inventario_main()
+# Todas las lecturas del rerun comparten una sesión (una conexión, un snapshot)
+with request_session():
+    if page == "Inventario":
+        inventario_main()
 
-elif page == "Entradas":
-    entradas_main()
+    elif page == "Entradas":
+        entradas_main()
 
-elif page == "Salidas":
-    salidas_main()
+    elif page == "Salidas":
+        salidas_main()
 
-elif page == "Proyectos":
-    proyectos_main()
-    
-elif page == "Reportes":
-    reportes_main()
+    elif page == "Proyectos":
+        proyectos_main()
+
+    elif page == "Reportes":
+        reportes_main()
 
-elif page == "Proveedores":
-    proveedores_main()
-    
\ No newline at end of file
+    elif page == "Proveedores":
+        proveedores_main()
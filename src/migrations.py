@@ -0,0 +1,238 @@
+"""
+migrations.py - Migraciones versionadas del esquema de la base de datos
+
+Cada migración es una función idempotente que recibe una conexión y aplica
+sus cambios solo si hacen falta (revisa columnas e índices existentes), por lo
+que puede correr sobre una base creada con sql_table_creation.sql, sobre una
+base antigua o sobre una copia local en SQLite. Las versiones aplicadas se
+registran en la tabla schema_migrations.
+
+Uso desde la raíz del proyecto:
+
+    python src/db_admin.py migrate
+"""
+from collections import namedtuple
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, text
+
+Migration = namedtuple("Migration", ["version", "name", "apply"])
+
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String(100), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+# =============================================================================
+# HELPERS IDEMPOTENTES
+# =============================================================================
+
+def _has_column(connection, table, column):
+    return column in {c["name"] for c in inspect(connection).get_columns(table)}
+
+
+def _has_table(connection, table):
+    return inspect(connection).has_table(table)
+
+
+def _has_index(connection, table, index_name):
+    return index_name in {i["name"] for i in inspect(connection).get_indexes(table)}
+
+
+def add_column_if_missing(connection, table, column, ddl_by_dialect):
+    """
+    Agrega una columna si la tabla aún no la tiene.
+
+    Args:
+        connection: Conexión de SQLAlchemy.
+        table (str): Nombre de la tabla.
+        column (str): Nombre de la columna.
+        ddl_by_dialect (dict): Definición de la columna por dialecto
+            ({"mysql": "...", "sqlite": "..."}).
+    """
+    if _has_column(connection, table, column):
+        return
+    ddl = ddl_by_dialect[connection.dialect.name]
+    connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def create_index_if_missing(connection, table, index_name, columns):
+    """
+    Crea un índice si todavía no existe.
+
+    Args:
+        connection: Conexión de SQLAlchemy.
+        table (str): Nombre de la tabla.
+        index_name (str): Nombre del índice.
+        columns (list[str]): Columnas del índice, en orden.
+    """
+    if _has_index(connection, table, index_name):
+        return
+    connection.execute(
+        text(f"CREATE INDEX {index_name} ON {table} ({', '.join(columns)})")
+    )
+
+
+# =============================================================================
+# MIGRACIONES
+# =============================================================================
+
+def _m001_stock_puntas_disponible(connection):
+    """Estado materializado de puntas disponibles y relleno desde el historial."""
+    added = not _has_column(connection, "stock_puntas", "disponible")
+    add_column_if_missing(
+        connection,
+        "stock_puntas",
+        "disponible",
+        {
+            "mysql": "TINYINT(1) NOT NULL DEFAULT '1'",
+            "sqlite": "BOOLEAN NOT NULL DEFAULT 1",
+        },
+    )
+    create_index_if_missing(
+        connection,
+        "stock_puntas",
+        "idx_stock_puntas_articulo_disponible",
+        ["id_articulo", "disponible"],
+    )
+    if added:
+        connection.execute(text(
+            "UPDATE stock_puntas SET disponible = 0 "
+            "WHERE id_punta IN ("
+            "SELECT dm.id_punta FROM detalle_movimientos dm "
+            "JOIN movimientos m ON m.id_movimiento = dm.id_movimiento "
+            "WHERE m.tipo = 'salida' AND dm.id_punta IS NOT NULL)"
+        ))
+
+
+def _m002_indices_consultas_frecuentes(connection):
+    """Índices para búsquedas por nombre y listados de movimientos por tipo y fecha."""
+    create_index_if_missing(connection, "articulos", "idx_articulos_nombre", ["nombre"])
+    create_index_if_missing(
+        connection, "movimientos", "idx_movimientos_tipo_fecha", ["tipo", "fecha_hora"]
+    )
+
+
+def _m003_indice_movimientos_proyecto_fecha(connection):
+    """Índice para reportes por centro de costo con rango de fechas."""
+    create_index_if_missing(
+        connection, "movimientos", "idx_movimientos_proyecto_fecha", ["id_proyecto", "fecha_hora"]
+    )
+
+
+_RESUMEN_DDL = {
+    "mysql": (
+        "CREATE TABLE resumen_movimientos_diario ("
+        "id_proyecto INT NOT NULL, "
+        "id_articulo INT NOT NULL, "
+        "tipo_movimiento ENUM('entrada','salida') NOT NULL, "
+        "dia DATE NOT NULL, "
+        "cantidad DOUBLE NOT NULL DEFAULT '0', "
+        "PRIMARY KEY (id_proyecto, id_articulo, tipo_movimiento, dia), "
+        "KEY resumen_movimientos_diario_ibfk_1 (id_articulo), "
+        "CONSTRAINT resumen_movimientos_diario_ibfk_1 FOREIGN KEY (id_articulo) "
+        "REFERENCES articulos (id_articulo), "
+        "CONSTRAINT resumen_movimientos_diario_ibfk_2 FOREIGN KEY (id_proyecto) "
+        "REFERENCES proyectos (id_proyecto))"
+    ),
+    "sqlite": (
+        "CREATE TABLE resumen_movimientos_diario ("
+        "id_proyecto INTEGER NOT NULL REFERENCES proyectos (id_proyecto), "
+        "id_articulo INTEGER NOT NULL REFERENCES articulos (id_articulo), "
+        "tipo_movimiento VARCHAR(7) NOT NULL, "
+        "dia DATE NOT NULL, "
+        "cantidad FLOAT NOT NULL DEFAULT 0, "
+        "PRIMARY KEY (id_proyecto, id_articulo, tipo_movimiento, dia))"
+    ),
+}
+
+
+def _m004_resumen_movimientos_diario(connection):
+    """Resumen diario por proyecto y artículo, rellenado desde el historial."""
+    from rollup import rebuild_rollup
+
+    if _has_table(connection, "resumen_movimientos_diario"):
+        return
+    connection.execute(text(_RESUMEN_DDL[connection.dialect.name]))
+    rebuild_rollup(connection)
+
+
+def _m005_resumen_por_proyecto(connection):
+    """
+    Cambia la llave del resumen diario de c_c a id_proyecto.
+
+    Con el c_c copiado en el resumen, editar el centro de costo de un proyecto
+    dejaba el comparativo distinto del detalle; con id_proyecto el c_c se lee
+    de proyectos al consultar. La tabla se reconstruye desde el historial.
+    """
+    from rollup import rebuild_rollup
+
+    if not _has_column(connection, "resumen_movimientos_diario", "c_c"):
+        return
+    connection.execute(text("DROP TABLE resumen_movimientos_diario"))
+    connection.execute(text(_RESUMEN_DDL[connection.dialect.name]))
+    rebuild_rollup(connection)
+
+
+MIGRATIONS = [
+    Migration(1, "stock_puntas_disponible", _m001_stock_puntas_disponible),
+    Migration(2, "indices_consultas_frecuentes", _m002_indices_consultas_frecuentes),
+    Migration(3, "indice_movimientos_proyecto_fecha", _m003_indice_movimientos_proyecto_fecha),
+    Migration(4, "resumen_movimientos_diario", _m004_resumen_movimientos_diario),
+    Migration(5, "resumen_por_proyecto", _m005_resumen_por_proyecto),
+]
+
+
+# =============================================================================
+# RUNNER
+# =============================================================================
+
+def get_applied_versions(engine):
+    """
+    Devuelve las versiones de migración ya registradas en la base de datos.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): Engine de la base de datos.
+
+    Returns:
+        set[int]: Versiones aplicadas.
+    """
+    _metadata.create_all(engine, tables=[schema_migrations])
+    with engine.connect() as connection:
+        return set(connection.execute(select(schema_migrations.c.version)).scalars())
+
+
+def apply_migrations(engine, migrations=MIGRATIONS):
+    """
+    Aplica en orden las migraciones pendientes.
+
+    Cada migración corre en su propia transacción junto con su registro en
+    schema_migrations. En MySQL el DDL confirma implícitamente, por eso las
+    migraciones son idempotentes y pueden repetirse si una falla a la mitad.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): Engine de la base de datos.
+        migrations (list[Migration]): Migraciones disponibles.
+
+    Returns:
+        list[Migration]: Migraciones aplicadas en esta ejecución.
+    """
+    applied = get_applied_versions(engine)
+    pending = [m for m in sorted(migrations, key=lambda m: m.version) if m.version not in applied]
+
+    for migration in pending:
+        with engine.begin() as connection:
+            migration.apply(connection)
+            connection.execute(
+                schema_migrations.insert().values(
+                    version=migration.version,
+                    name=migration.name,
+                    applied_at=datetime.now(),
+                )
+            )
+    return pending
@@ -15,14 +15,24 @@ from utils import (
     render_project_selector,
     render_responsable_input,
     display_recent_movements_table,
+    render_movement_history,
     handle_movement_submission,
+    render_article_search,
 )
 from data import (
     fetch_initial_data,
+    get_article_catalog,
+    search_articulos,
     add_movement_to_db,
+    get_movement_history,
     get_recent_movements,
-    get_article_by_name,
+    get_pending_items_info,
 )
+from importacion import parse_packing_list
+
+# Con más ítems pendientes se muestra una tabla en lugar de un renglón con
+# botón por ítem, para que listas importadas grandes no hagan lento el rerun.
+MAX_ITEMS_WITH_CONTROLS = 50
 
 
 # =============================================================================
@@ -131,6 +141,57 @@ def display_quantity_form(key_suffix):
     )
 
 
+def display_import_section():
+    """
+    Permite agregar a la entrada todos los ítems de una lista de empaque CSV/XLSX.
+    El archivo se valida una sola vez contra el catálogo; los reruns reutilizan
+    el resultado guardado en session_state.
+    """
+    with st.expander("📄 Importar lista de empaque (CSV/XLSX)"):
+        st.caption(
+            "Columnas: nombre, cantidad, num_catalogo, es_cable, nombre_punta, "
+            "longitud, color y, para artículos nuevos, tipo, categoria, "
+            "unidad_medida, precio_unitario, stock_minimo."
+        )
+        archivo = st.file_uploader(
+            "Lista de empaque", type=["csv", "xlsx"], key="form_import_file"
+        )
+        if archivo is None:
+            return
+
+        file_key = (archivo.name, archivo.size, getattr(archivo, "file_id", None))
+        if st.session_state.get("form_import_key") != file_key:
+            try:
+                resultado = parse_packing_list(archivo, archivo.name, get_article_catalog())
+            except Exception as e:
+                st.error(f"❌ No se pudo leer el archivo: {e}")
+                return
+            st.session_state.form_import_key = file_key
+            st.session_state.form_import_result = resultado
+            st.session_state.form_import_added = False
+        resultado = st.session_state.form_import_result
+
+        st.write(
+            f"Filas válidas: {len(resultado.items)} · "
+            f"Artículos existentes: {resultado.existentes} · "
+            f"Artículos nuevos: {resultado.nuevos}"
+        )
+        if resultado.errors:
+            st.error("\n".join(["❌ " + error for error in resultado.errors[:20]]))
+            if len(resultado.errors) > 20:
+                st.caption(f"... y {len(resultado.errors) - 20} error(es) más.")
+            return
+
+        if st.session_state.get("form_import_added"):
+            st.success("✅ Los ítems de este archivo ya se agregaron a la entrada.")
+        elif st.button(
+            f"➕ Agregar {len(resultado.items)} item(s) a la entrada", key="form_import_add"
+        ):
+            st.session_state.movement_items.extend(resultado.items)
+            st.session_state.form_import_added = True
+            st.rerun()
+
+
 # =============================================================================
 # VALIDACIÓN Y RECOPILACIÓN DE DATOS
 # =============================================================================
@@ -199,14 +260,13 @@ def gather_form_data(nombre_item):
 # FORMULARIO PRINCIPAL DE ENTRADA
 # =============================================================================
 
-def form_entrada(nombres_articulos, nombres_cables, proyectos_info):
+def form_entrada(nombres_cables, proyectos_info):
     """
     Orquestador principal del formulario de entradas de inventario.
     Permite al usuario agregar múltiples ítems a un solo movimiento de entrada,
     seleccionar un proyecto y centro de costo.
 
     Args:
-        nombres_articulos (list[str]): Lista de nombres de artículos existentes.
         nombres_cables (list[str]): Lista de nombres de artículos tipo cable.
         proyectos_info (dict): {id_proyecto: (nombre_obra, c_c)}.
 
@@ -275,10 +335,29 @@ def form_entrada(nombres_articulos, nombres_cables, proyectos_info):
         st.divider()
 
         # --- Ítems ya agregados ---
-        if st.session_state.movement_items:
+        if len(st.session_state.movement_items) > MAX_ITEMS_WITH_CONTROLS:
+            st.write(f"**Items agregados a esta entrada:** {len(st.session_state.movement_items)}")
+            st.dataframe(
+                [
+                    {
+                        "Item": item["nombre_item"],
+                        "Nuevo": "Sí" if item["is_new"] else "",
+                        "Punta": item["nombre_punta"] if item["es_cable"] else "",
+                        "Cantidad": item["longitud"] if item["es_cable"] else item["cantidad"],
+                    }
+                    for item in st.session_state.movement_items
+                ],
+                hide_index=False,
+            )
+            if st.button("🗑️ Quitar todos los items", key="delete_all_items"):
+                st.session_state.movement_items = []
+                st.rerun()
+            st.divider()
+        elif st.session_state.movement_items:
             st.write("**Items agregados a esta entrada:**")
+            items_info = get_pending_items_info(st.session_state.movement_items)
             for idx, item in enumerate(st.session_state.movement_items):
-                articulo = get_article_by_name(item["nombre_item"])
+                articulo, _ = items_info[idx]
                 col1, col2, col3 = st.columns([3, 1, 1])
                 with col1:
                     if item.get("es_cable") or (articulo and articulo.es_cable):
@@ -297,13 +376,17 @@ def form_entrada(nombres_articulos, nombres_cables, proyectos_info):
                         st.rerun()
             st.divider()
 
+        # --- Importación de lista de empaque ---
+        display_import_section()
+
         # --- Formulario para agregar un ítem ---
         st.subheader("Agregar item a la entrada")
 
-        nombre_item = st.selectbox(
-            "Selecciona un item existente o crea uno nuevo:",
-            ["Otro (escribir nuevo)"] + nombres_articulos,
-            key="form_item_select",
+        nombre_item = render_article_search(
+            search_articulos,
+            select_label="Selecciona un item existente o crea uno nuevo:",
+            select_key="form_item_select",
+            fixed_options=["Otro (escribir nuevo)"],
         )
         st.session_state.form_is_new = nombre_item == "Otro (escribir nuevo)"
 
@@ -396,6 +479,30 @@ def display_recent_entrada_movements(proyectos_info):
         st.error(f"Error al obtener movimientos de entrada: {e}")
 
 
+def display_entrada_history(proyectos_info):
+    """
+    Muestra el historial paginado de entradas con filtros por proyecto,
+    responsable y artículo.
+
+    Args:
+        proyectos_info (dict): {id_proyecto: (nombre_obra, c_c)}.
+    """
+    # Los expanders ejecutan su contenido aunque estén cerrados; el toggle
+    # evita consultar y dibujar el historial si nadie lo está viendo.
+    if not st.toggle("Mostrar historial", key="entrada_historial_visible"):
+        return
+    try:
+        render_movement_history(
+            "entrada",
+            proyectos_info,
+            get_movement_history,
+            search_articulos,
+            key="entrada_historial",
+        )
+    except Exception as e:
+        st.error(f"Error al obtener el historial de entradas: {e}")
+
+
 # =============================================================================
 # MANEJO DE RESULTADO DEL FORMULARIO
 # =============================================================================
@@ -439,7 +546,7 @@ def main():
 
     # Obtener datos iniciales desde data.py
     try:
-        nombres_articulos, nombres_cables, proyectos_info = fetch_initial_data()
+        nombres_cables, proyectos_info = fetch_initial_data()
     except Exception as e:
         st.error(f"Error al obtener datos iniciales: {e}")
         return
@@ -448,6 +555,9 @@ def main():
     with st.expander("📋 Movimientos de Entrada Recientes", expanded=True):
         display_recent_entrada_movements(proyectos_info)
 
+    with st.expander("🗂️ Historial de Entradas"):
+        display_entrada_history(proyectos_info)
+
     # Formulario de nueva entrada y manejo del resultado
-    result = form_entrada(nombres_articulos, nombres_cables, proyectos_info)
+    result = form_entrada(nombres_cables, proyectos_info)
     handle_form_result(result)
\ No newline at end of file
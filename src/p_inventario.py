@@ -6,12 +6,11 @@ Toda la lógica de acceso a datos se delega al módulo data.py.
 """
 
 import streamlit as st
-import pandas as pd
 from types import SimpleNamespace
-from utils import CATEGORIAS, UNIDAD_DE_MEDIDA, UBICACIONES, ALMACENES
+from utils import CATEGORIAS, UNIDAD_DE_MEDIDA, UBICACIONES, ALMACENES, TIPOS
 from user_passwords import verify_credentials
 from data import (
-    get_all_articulos,
+    get_articulos_page,
     update_articulo,
     get_cable_names,
     get_article_by_name,
@@ -26,12 +25,38 @@ def highlight_low_stock(row):
             return [""] * len(row)
 
 
+INVENTARIO_PAGE_SIZE = 50
+
+
 def clear_inventory_filters():
     """Resetea el estado de filtros de inventario sin violar reglas de Streamlit."""
     st.session_state.inventario_categoria_filter = "Todas"
     st.session_state.inventario_tipo_filter = "Todos"
     st.session_state.inventario_nombre_filter = ""
     st.session_state.inventario_filtros_activos = False
+    st.session_state.inventario_cursores = [None]
+
+
+def next_inventory_page(next_cursor):
+    """Avanza a la página siguiente guardando su cursor en la pila."""
+    st.session_state.inventario_cursores.append(next_cursor)
+
+
+def previous_inventory_page():
+    """Regresa a la página anterior sacando el cursor actual de la pila."""
+    if len(st.session_state.inventario_cursores) > 1:
+        st.session_state.inventario_cursores.pop()
+
+
+def get_inventory_filters(categoria_filter, tipo_filter, nombre_filter):
+    """Traduce los widgets de filtro a los filtros de get_articulos_page."""
+    if not st.session_state.inventario_filtros_activos:
+        return {}
+    return {
+        "categoria": categoria_filter if categoria_filter != "Todas" else None,
+        "tipo": tipo_filter if tipo_filter != "Todos" else None,
+        "nombre": nombre_filter.strip(),
+    }
 
 #@st.dialog("Contraseña requerida")
 def password_required_dialog():
@@ -106,17 +131,13 @@ def main():
 
     try:
         # --- Tabla de artículos ---
-        data = get_all_articulos()
-
         st.subheader("Articulos")
 
-        df = pd.DataFrame(data)
-
         if "inventario_filtros_activos" not in st.session_state:
             st.session_state.inventario_filtros_activos = False
-
-        
-        tipos = sorted(df["tipo"].dropna().unique().tolist()) if "tipo" in df.columns else []
+        # Pila de cursores: el último es el de la página visible (None = primera).
+        if "inventario_cursores" not in st.session_state:
+            st.session_state.inventario_cursores = [None]
 
         st.markdown("### Filtros")
         col_f1, col_f2, col_f3 = st.columns(3)
@@ -129,7 +150,7 @@ def main():
         with col_f2:
             tipo_filter = st.selectbox(
                 "Tipo",
-                options=["Todos"] + tipos,
+                options=["Todos"] + TIPOS,
                 key="inventario_tipo_filter",
             )
         with col_f3:
@@ -150,31 +171,55 @@ def main():
                 on_click=clear_inventory_filters,
             )
 
-        filtered_df = df.copy()
-        if st.session_state.inventario_filtros_activos:
-            if categoria_filter != "Todas" and "categoria" in filtered_df.columns:
-                filtered_df = filtered_df[filtered_df["categoria"] == categoria_filter]
-            if tipo_filter != "Todos" and "tipo" in filtered_df.columns:
-                filtered_df = filtered_df[filtered_df["tipo"] == tipo_filter]
-            if nombre_filter.strip():
-                filtered_df = filtered_df[
-                    filtered_df["nombre"].astype(str).str.contains(nombre_filter.strip(), case=False, na=False)
-                ]
+        # Si cambian los filtros, los cursores guardados ya no aplican.
+        filtros = get_inventory_filters(categoria_filter, tipo_filter, nombre_filter)
+        if st.session_state.get("inventario_filtros_pagina") != filtros:
+            st.session_state.inventario_filtros_pagina = filtros
+            st.session_state.inventario_cursores = [None]
+
+        cursores = st.session_state.inventario_cursores
+        page = get_articulos_page(
+            filters=filtros,
+            sort="nombre",
+            cursor=cursores[-1],
+            page_size=INVENTARIO_PAGE_SIZE,
+        )
+        df = page["frame"]
 
-        st.caption(f"Resultados: {len(filtered_df)}")
+        page_number = len(cursores)
+        total_pages = max(1, -(-page["total"] // INVENTARIO_PAGE_SIZE))
+        st.caption(f"Resultados: {page['total']} — página {page_number} de {total_pages}")
 
-        styled_df = filtered_df.style.apply(highlight_low_stock, axis=1).format(
-            {"cantidad en stock": "{:.2f}", "stock minimo": "{:.2f}"}
-        )
-        articulos_edit = {f"{a['id']} - {a['nombre']}": a for a in data}
-        seleccionado = st.selectbox("Artículo a editar", options=list(articulos_edit.keys()), key="articulo_editar_select")
-        if st.button("✏️ Editar artículo seleccionado"):
-            editar_articulo_dialog(articulos_edit[seleccionado])
-
-        st.dataframe(styled_df, hide_index=True)
-        
-        # Selector para editar artículo
-       
+        col_p1, col_p2 = st.columns(2)
+        with col_p1:
+            st.button(
+                "⬅️ Anterior",
+                key="inventario_pagina_anterior",
+                disabled=page_number == 1,
+                on_click=previous_inventory_page,
+            )
+        with col_p2:
+            st.button(
+                "Siguiente ➡️",
+                key="inventario_pagina_siguiente",
+                disabled=page["next_cursor"] is None,
+                on_click=next_inventory_page,
+                args=(page["next_cursor"],),
+            )
+
+        if not df.empty:
+            styled_df = df.style.apply(highlight_low_stock, axis=1).format(
+                {"cantidad en stock": "{:.2f}", "stock minimo": "{:.2f}"}
+            )
+            articulos_edit = [f"{id_} - {nombre}" for id_, nombre in zip(df["id"], df["nombre"])]
+            seleccionado = st.selectbox("Artículo a editar", options=articulos_edit, key="articulo_editar_select")
+            if st.button("✏️ Editar artículo seleccionado"):
+                fila = df.iloc[articulos_edit.index(seleccionado)].astype(object)
+                editar_articulo_dialog(fila.where(fila.notna(), None).to_dict())
+
+            st.dataframe(styled_df, hide_index=True)
+        else:
+            st.info("No hay artículos que coincidan con los filtros.")
 
         # --- Sección de cables ---
         cable_names = get_cable_names()
@@ -3,7 +3,7 @@ import streamlit as st
 from data import (
     add_proveedor,
     get_proveedores_for_edit,
-    get_proveedores_table_data,
+    get_proveedores_table_df,
     update_proveedor,
 )
 
@@ -46,10 +46,10 @@ def main():
     st.write("Aquí puedes gestionar tus proveedores, agregar nuevos, editar información existente y eliminar proveedores que ya no necesites.")
 
     # Tabla de proveedores existentes
-    proveedores_data = get_proveedores_table_data()
+    proveedores_df = get_proveedores_table_df()
     st.subheader("Proveedores registrados")
-    if proveedores_data:
-        st.dataframe(proveedores_data, use_container_width=True, hide_index=True)
+    if not proveedores_df.empty:
+        st.dataframe(proveedores_df, use_container_width=True, hide_index=True)
 
         proveedores_edit_data = get_proveedores_for_edit()
         if proveedores_edit_data:
@@ -7,7 +7,7 @@ Toda la lógica de acceso a datos se delega al módulo data.py.
 
 import streamlit as st
 
-from data import add_proyecto, get_proyectos_table_data
+from data import add_proyecto, get_proyectos_table_df
 
 
 def main():
@@ -19,10 +19,10 @@ def main():
     st.title("Proyectos")
 
     # Tabla de proyectos existentes
-    proyectos_data = get_proyectos_table_data()
+    proyectos_df = get_proyectos_table_df()
     st.subheader("Proyectos registrados")
-    if proyectos_data:
-        st.dataframe(proyectos_data, use_container_width=True, hide_index=True)
+    if not proyectos_df.empty:
+        st.dataframe(proyectos_df, use_container_width=True, hide_index=True)
     else:
         st.info("Aún no hay proyectos registrados.")
 
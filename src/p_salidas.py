@@ -12,18 +12,20 @@ from utils import (
     render_project_selector,
     render_responsable_input,
     display_recent_movements_table,
+    render_movement_history,
     handle_movement_submission,
+    render_article_search,
 )
 
 from data import (
-    get_all_articulo_names,
     get_article_by_name,
-    get_article_by_id,
     get_available_puntas,
-    get_punta_by_id,
+    get_pending_items_info,
     get_proyectos_info,
     add_salida_to_db,
+    get_movement_history,
     get_recent_movements,
+    search_articulos,
 )
 
 
@@ -159,14 +161,13 @@ def gather_salida_form_data(nombre_item, articulo):
 # FORMULARIO PRINCIPAL DE SALIDA
 # =============================================================================
 
-def form_salida(nombres_articulos, proyectos_info):
+def form_salida(proyectos_info):
     """
     Orquestador principal del formulario de salidas de inventario.
     Permite al usuario retirar múltiples ítems del inventario
     y asociarlos a un proyecto.
 
     Args:
-        nombres_articulos (list[str]): Lista de nombres de artículos existentes.
         proyectos_info (dict): {id_proyecto: (nombre_obra, c_c)}.
 
     Returns:
@@ -226,19 +227,19 @@ def form_salida(nombres_articulos, proyectos_info):
         # --- Ítems ya agregados ---
         if st.session_state.salida_movement_items:
             st.write("**Items a retirar:**")
+            items_info = get_pending_items_info(st.session_state.salida_movement_items)
             for idx, item in enumerate(st.session_state.salida_movement_items):
-                articulo = get_article_by_id(item["id_articulo"])
+                articulo, punta = items_info[idx]
 
                 col1, col2, col3 = st.columns([3, 1, 1])
                 with col1:
                     if articulo and articulo.es_cable:
-                        punta = get_punta_by_id(item["id_punta"])
                         punta_name = (
-                            f" - {punta.nombre_punta}"
+                            f" - {punta['nombre_punta']}"
                             if punta
                             else " (punta no encontrada)"
                         )
-                        st.write(f"{idx + 1}. {item['nombre_item']}{punta_name} - Longitud: {punta.longitud}m" if punta else f"{idx + 1}. {item['nombre_item']} - Punta no encontrada")
+                        st.write(f"{idx + 1}. {item['nombre_item']}{punta_name} - Longitud: {punta['longitud']}m" if punta else f"{idx + 1}. {item['nombre_item']} - Punta no encontrada")
                     else:
                         st.write(
                             f"{idx + 1}. {item['nombre_item']} - "
@@ -253,10 +254,10 @@ def form_salida(nombres_articulos, proyectos_info):
         # --- Formulario para seleccionar ítem ---
         st.subheader("Agregar item a la salida")
 
-        nombre_item = st.selectbox(
-            "Selecciona un item existente:",
-            nombres_articulos,
-            key="salida_form_item_select",
+        nombre_item = render_article_search(
+            search_articulos,
+            select_label="Selecciona un item existente:",
+            select_key="salida_form_item_select",
         )
 
         if nombre_item:
@@ -360,6 +361,30 @@ def display_recent_salida_movements(proyectos_info):
         st.error(f"Error al obtener movimientos de salida: {e}")
 
 
+def display_salida_history(proyectos_info):
+    """
+    Muestra el historial paginado de salidas con filtros por proyecto,
+    responsable y artículo.
+
+    Args:
+        proyectos_info (dict): {id_proyecto: (nombre_obra, c_c)}.
+    """
+    # Los expanders ejecutan su contenido aunque estén cerrados; el toggle
+    # evita consultar y dibujar el historial si nadie lo está viendo.
+    if not st.toggle("Mostrar historial", key="salida_historial_visible"):
+        return
+    try:
+        render_movement_history(
+            "salida",
+            proyectos_info,
+            get_movement_history,
+            search_articulos,
+            key="salida_historial",
+        )
+    except Exception as e:
+        st.error(f"Error al obtener el historial de salidas: {e}")
+
+
 # =============================================================================
 # MANEJO DE RESULTADO DEL FORMULARIO
 # =============================================================================
@@ -402,13 +427,15 @@ def main():
     st.header("Salidas")
 
     # Obtener datos iniciales desde data.py
-    nombres_articulos = get_all_articulo_names()
     proyectos_info = get_proyectos_info()
 
     # Mostrar movimientos recientes
     with st.expander("📋 Movimientos de Salida Recientes", expanded=True):
         display_recent_salida_movements(proyectos_info)
 
+    with st.expander("🗂️ Historial de Salidas"):
+        display_salida_history(proyectos_info)
+
     # Formulario de nueva salida y manejo del resultado
-    result = form_salida(nombres_articulos, proyectos_info)
+    result = form_salida(proyectos_info)
     handle_salida_form_result(result)
\ No newline at end of file
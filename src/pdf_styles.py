@@ -15,6 +15,7 @@ PDF_TITLE_FONT_SIZE = 20
 PDF_CC_FONT_SIZE = 14
 PDF_SUMMARY_FONT_SIZE = 12
 PDF_TABLE_HEADER_FONT_SIZE = 10
+PDF_TABLE_BODY_FONT = "Helvetica"
 PDF_TABLE_BODY_FONT_SIZE = 8
 PDF_TABLE_HEADER_PADDING = 8
 PDF_MATERIAL_FONT_SIZE = 8
@@ -81,7 +82,11 @@ PDF_TABLE_STYLE_COMPARACION = [
 	("FONTSIZE", (0, 0), (-1, 0), PDF_TABLE_HEADER_FONT_SIZE),
 	("BOTTOMPADDING", (0, 0), (-1, 0), PDF_TABLE_HEADER_PADDING),
 	("GRID", (0, 0), (-1, -1), 1, PDF_TABLE_GRID_COLOR),
+	("FONTNAME", (0, 1), (-1, -1), PDF_TABLE_BODY_FONT),
 	("FONTSIZE", (0, 1), (-1, -1), PDF_TABLE_BODY_FONT_SIZE),
+	# Material con interlineado menor, centrado a la altura de las demás columnas.
+	("LEADING", (0, 1), (0, -1), PDF_MATERIAL_LEADING),
+	("TOPPADDING", (0, 1), (0, -1), 0),
 	("ROWBACKGROUNDS", (0, 1), (-1, -1), [PDF_TABLE_ROW_ALT_COLOR, PDF_TABLE_ROW_BASE_COLOR]),
 ]
 
@@ -94,7 +99,13 @@ PDF_TABLE_STYLE_REPORTE = [
 	("FONTSIZE", (0, 0), (-1, 0), PDF_TABLE_HEADER_FONT_SIZE),
 	("BOTTOMPADDING", (0, 0), (-1, 0), PDF_TABLE_HEADER_PADDING),
 	("GRID", (0, 0), (-1, -1), 1, PDF_TABLE_GRID_COLOR),
+	("FONTNAME", (0, 1), (-1, -1), PDF_TABLE_BODY_FONT),
 	("FONTSIZE", (0, 1), (-1, -1), PDF_TABLE_BODY_FONT_SIZE),
+	# Material con interlineado menor; los rellenos dejan su primer renglón a
+	# la altura del texto de las demás columnas.
+	("LEADING", (1, 1), (1, -1), PDF_MATERIAL_LEADING),
+	("TOPPADDING", (1, 1), (1, -1), 0),
+	("BOTTOMPADDING", (1, 1), (1, -1), 6),
 	("ROWBACKGROUNDS", (0, 1), (-1, -1), [PDF_TABLE_ROW_ALT_COLOR, PDF_TABLE_ROW_BASE_COLOR]),
 ]
 
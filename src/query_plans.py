@@ -0,0 +1,216 @@
+"""
+query_plans.py - Verificación con EXPLAIN de las consultas frecuentes de data.py
+
+Ejecuta cada consulta frecuente de data.py contra la base de datos
+configurada, captura el SQL que realmente se envía y lo analiza con EXPLAIN
+(MySQL) o EXPLAIN QUERY PLAN (SQLite). Una consulta falla la verificación si
+alguna de las tablas que debe resolverse por índice se recorre completa.
+
+Uso desde la raíz del proyecto (idealmente con datos realistas cargados):
+
+    python src/db_admin.py check-plans
+"""
+import re
+from collections import namedtuple
+from datetime import date, timedelta
+from itertools import islice
+
+from sqlalchemy import event, select
+
+import data
+from classes import Articulos, Proyectos, StockPuntas
+from utils import get_engine, get_session
+
+PlanCheck = namedtuple("PlanCheck", ["name", "run", "indexed_tables"])
+PlanResult = namedtuple("PlanResult", ["name", "statement", "table", "uses_index", "detail"])
+
+_SQLITE_FULL_SCAN = re.compile(r"^SCAN (\w+)(?: AS (\w+))?$")
+
+
+def _uncached(fn):
+    """Devuelve la función original si está envuelta por versioned_cache."""
+    return getattr(fn, "__wrapped__", fn)
+
+
+def _lookup_by_name(samples):
+    # Misma búsqueda por nombre que hace add_movement_to_db para artículos existentes.
+    session = get_session(shared=False)
+    try:
+        session.execute(
+            select(Articulos.id_articulo).where(Articulos.nombre.in_([samples["nombre"]]))
+        ).all()
+    finally:
+        session.close()
+
+
+HOT_QUERIES = [
+    PlanCheck(
+        "busqueda_articulo_por_nombre",
+        _lookup_by_name,
+        {"articulos"},
+    ),
+    PlanCheck(
+        "get_articulos_page",
+        lambda samples: _uncached(data.get_articulos_page)(
+            cursor=(samples["nombre"], 0), page_size=50
+        ),
+        {"articulos"},
+    ),
+    PlanCheck(
+        "get_available_puntas",
+        lambda samples: _uncached(data.get_available_puntas)(samples["id_articulo_cable"]),
+        {"stock_puntas"},
+    ),
+    PlanCheck(
+        "get_puntas_by_ids",
+        lambda samples: data.get_puntas_by_ids([samples["id_punta"]]),
+        {"stock_puntas"},
+    ),
+    PlanCheck(
+        "get_recent_movements",
+        lambda samples: data.get_recent_movements("salida", limit=5),
+        {"movimientos", "detalle_movimientos"},
+    ),
+    PlanCheck(
+        "get_movement_history",
+        lambda samples: _uncached(data.get_movement_history)(
+            "salida", cursor=(samples["fecha_fin"], 0), page_size=10
+        ),
+        {"movimientos", "detalle_movimientos"},
+    ),
+    PlanCheck(
+        "get_report_data",
+        lambda samples: _uncached(data.get_report_data)(
+            samples["fecha_inicio"], samples["fecha_fin"], samples["c_c"], "salida"
+        ),
+        {"movimientos", "detalle_movimientos"},
+    ),
+    PlanCheck(
+        "iter_report_data",
+        # Dos bloques: el segundo ya lleva el filtro por llave (fecha_hora, id_detalle).
+        lambda samples: list(islice(data.iter_report_data(
+            samples["fecha_inicio"], samples["fecha_fin"], samples["c_c"], "salida", chunk_size=50
+        ), 2)),
+        {"movimientos", "detalle_movimientos"},
+    ),
+    PlanCheck(
+        "get_comparacion_data",
+        lambda samples: _uncached(data.get_comparacion_data)(
+            samples["fecha_inicio"], samples["fecha_fin"], [samples["c_c"]]
+        ),
+        {"resumen_movimientos_diario", "articulos"},
+    ),
+]
+
+
+def _load_samples(engine):
+    """Obtiene ids y nombres reales para parametrizar las consultas."""
+    today = date.today()
+    samples = {
+        "nombre": "",
+        "id_articulo_cable": 1,
+        "id_punta": 1,
+        "c_c": 1,
+        "fecha_inicio": (today - timedelta(days=30)).isoformat(),
+        "fecha_fin": today.isoformat(),
+    }
+    with engine.connect() as connection:
+        punta = connection.execute(
+            select(StockPuntas.id_punta, StockPuntas.id_articulo).limit(1)
+        ).first()
+        if punta:
+            samples["id_punta"] = punta.id_punta
+            samples["id_articulo_cable"] = punta.id_articulo
+        nombre = connection.execute(select(Articulos.nombre).limit(1)).scalar()
+        if nombre:
+            samples["nombre"] = nombre
+        c_c = connection.execute(select(Proyectos.c_c).limit(1)).scalar()
+        if c_c is not None:
+            samples["c_c"] = c_c
+    return samples
+
+
+def _capture_statements(engine, run, samples):
+    """Ejecuta run(samples) y devuelve las sentencias SELECT que envió al driver."""
+    captured = []
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    try:
+        run(samples)
+    finally:
+        event.remove(engine, "before_cursor_execute", _before_cursor_execute)
+    return captured
+
+
+def _explain(connection, statement, parameters):
+    """
+    Devuelve [(tabla, usa_indice, detalle)] para cada tabla del plan.
+    """
+    dialect = connection.dialect.name
+    if dialect == "mysql":
+        rows = connection.exec_driver_sql(f"EXPLAIN {statement}", parameters).mappings().all()
+        return [
+            (
+                row["table"],
+                row["type"] != "ALL" and row["key"] is not None,
+                f"type={row['type']} key={row['key']}",
+            )
+            for row in rows
+            if row["table"]
+        ]
+    if dialect == "sqlite":
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+        plan = []
+        for row in rows:
+            detail = row[-1]
+            match = _SQLITE_FULL_SCAN.match(detail)
+            words = detail.split()
+            if match:
+                plan.append((match.group(1), False, detail))
+            elif len(words) > 1 and words[0] in ("SEARCH", "SCAN"):
+                plan.append((words[1], True, detail))
+        return plan
+    raise ValueError(f"Dialecto sin soporte para EXPLAIN: {dialect}")
+
+
+def check_query_plans(checks=HOT_QUERIES):
+    """
+    Analiza el plan de cada consulta frecuente sobre el engine de la aplicación.
+
+    Args:
+        checks (list[PlanCheck]): Consultas a verificar.
+
+    Returns:
+        list[PlanResult]: Un resultado por cada tabla relevante de cada consulta.
+    """
+    engine = get_engine()
+    samples = _load_samples(engine)
+    results = []
+    for check in checks:
+        for statement, parameters in _capture_statements(engine, check.run, samples):
+            with engine.connect() as connection:
+                plan = _explain(connection, statement, parameters)
+            for table, uses_index, detail in plan:
+                if table in check.indexed_tables:
+                    results.append(PlanResult(check.name, statement, table, uses_index, detail))
+    return results
+
+
+def assert_query_plans_use_indexes(checks=HOT_QUERIES):
+    """
+    Verifica que ninguna consulta frecuente recorra completa una tabla indexable.
+
+    Raises:
+        AssertionError: Con la lista de consultas que hacen un recorrido completo.
+    """
+    failures = [r for r in check_query_plans(checks) if not r.uses_index]
+    if failures:
+        raise AssertionError(
+            "Consultas sin índice:\n" + "\n".join(
+                f"- {r.name}: {r.table} ({r.detail})" for r in failures
+            )
+        )
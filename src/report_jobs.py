@@ -0,0 +1,464 @@
+"""
+report_jobs.py - Cola de trabajos de reportes en procesos aparte
+
+Un reporte grande (un año de salidas de un centro de costo) tarda varios
+segundos en consultarse y dibujarse. Si se genera dentro del hilo del script
+de Streamlit bloquea la página de ese usuario, y varios a la vez compiten
+por el CPU con las páginas de inventario. Aquí cada archivo se genera como
+un trabajo en un ProcessPoolExecutor de tamaño fijo: los que exceden el
+límite de concurrencia esperan en cola y, si la cola está llena, la
+solicitud se rechaza en lugar de saturar el servidor.
+
+Cada trabajo vive en su propio directorio bajo el directorio de trabajos:
+
+    <dir>/<id>/estado.json    estado, renglones procesados, total y error
+    <dir>/<id>/reporte.pdf    archivo generado (o reporte.xlsx)
+    <dir>/<id>/dueno.json     proceso que generó el trabajo, mientras no termine
+
+El directorio se comparte entre los workers de Streamlit, así que quién
+genera cada trabajo también se guarda en disco: dueno.json se crea con
+O_EXCL (sólo un proceso puede reclamar el trabajo) y guarda el pid y el host
+del dueño; su mtime es el latido, que renuevan el dueño mientras la página
+consulta el avance y el proceso del pool con cada avance. Un trabajo en cola
+o generándose se da por interrumpido sólo si el pid del dueño ya no existe o
+el latido es más viejo que LATIDO_VENCIDO_SEGUNDOS.
+
+El id se deriva de (tipo de reporte, formato, filtros, versión de datos), así
+que pedir dos veces el mismo reporte sin escrituras de por medio reutiliza
+el archivo ya generado. p_reportes.py consulta el estado con get_report_job
+mientras el trabajo avanza.
+
+Configuración opcional en .streamlit/secrets.toml:
+
+    [reportes]
+    max_workers = 2            # reportes generándose al mismo tiempo
+    max_pendientes = 8         # trabajos en cola + en proceso antes de rechazar
+    dir = "cache/reportes"     # directorio de trabajos y archivos
+    retencion_horas = 24       # antigüedad tras la cual se borran
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import socket
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import streamlit as st
+
+from cache import get_data_version
+from utils import get_engine
+
+DEFAULT_MAX_WORKERS = 2
+DEFAULT_MAX_PENDING = 8
+DEFAULT_JOBS_DIR = "cache/reportes"
+DEFAULT_RETENTION_HOURS = 24
+
+REPORT_KINDS = ("entrada", "salida", "comparativo")
+STATUS_FILE = "estado.json"
+CLAIM_FILE = "dueno.json"
+CLAIM_LOCK_FILE = "dueno.lock"
+LATIDO_VENCIDO_SEGUNDOS = 15 * 60
+
+ESTADO_EN_COLA = "en_cola"
+ESTADO_GENERANDO = "generando"
+ESTADO_LISTO = "listo"
+ESTADO_ERROR = "error"
+
+ReportJob = namedtuple("ReportJob", ["job_id", "estado", "procesados", "total", "error", "path"])
+
+
+class ColaDeReportesLlenaError(RuntimeError):
+    """Se alcanzó el máximo de reportes pendientes; hay que intentar más tarde."""
+
+
+_executor = None
+_executor_lock = threading.Lock()
+_futures = {}
+_futures_lock = threading.Lock()
+
+
+# =============================================================================
+# CONFIGURACIÓN
+# =============================================================================
+
+def _read_jobs_config():
+    try:
+        return dict(st.secrets.get("reportes", {}))
+    except FileNotFoundError:
+        return {}
+
+
+def _config_value(name, default):
+    return type(default)(_read_jobs_config().get(name, default))
+
+
+def get_jobs_dir():
+    """
+    Devuelve el directorio donde se guardan los trabajos, creándolo si no existe.
+
+    Returns:
+        Path: Directorio de trabajos.
+    """
+    jobs_dir = Path(_config_value("dir", DEFAULT_JOBS_DIR))
+    jobs_dir.mkdir(parents=True, exist_ok=True)
+    return jobs_dir
+
+
+# =============================================================================
+# ESTADO EN DISCO
+# =============================================================================
+
+def _write_status(job_dir, **status):
+    # Escritura atómica: quien consulta nunca lee un JSON a medias.
+    tmp_path = job_dir / f"{STATUS_FILE}.tmp"
+    tmp_path.write_text(json.dumps(status), encoding="utf-8")
+    os.replace(tmp_path, job_dir / STATUS_FILE)
+
+
+def _read_status(job_dir):
+    try:
+        return json.loads((job_dir / STATUS_FILE).read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+# =============================================================================
+# DUEÑO DEL TRABAJO
+# =============================================================================
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Existe pero pertenece a otro usuario.
+        return True
+    return True
+
+
+def _claim_job(job_dir):
+    """Crea dueno.json con O_EXCL; devuelve False si otro proceso ya lo tiene."""
+    try:
+        fd = os.open(job_dir / CLAIM_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+    except FileExistsError:
+        return False
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump({"pid": os.getpid(), "host": socket.gethostname()}, f)
+    return True
+
+
+def _touch_claim(job_dir):
+    try:
+        os.utime(job_dir / CLAIM_FILE)
+    except FileNotFoundError:
+        pass
+
+
+def _release_claim(job_dir):
+    try:
+        os.unlink(job_dir / CLAIM_FILE)
+    except FileNotFoundError:
+        pass
+
+
+def _claim_alive(job_dir):
+    """
+    Indica si el dueño del trabajo sigue vivo.
+
+    Args:
+        job_dir (Path): Directorio del trabajo.
+
+    Returns:
+        bool: True si hay dueño con latido reciente y, en este mismo host,
+            su pid todavía existe.
+    """
+    claim_path = job_dir / CLAIM_FILE
+    try:
+        if time.time() - claim_path.stat().st_mtime > LATIDO_VENCIDO_SEGUNDOS:
+            return False
+        claim = json.loads(claim_path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return False
+    except json.JSONDecodeError:
+        # Otro proceso lo acaba de crear y aún no termina de escribirlo.
+        return True
+    if claim.get("host") == socket.gethostname():
+        return _pid_alive(claim["pid"])
+    return True
+
+
+def _release_dead_claim(job_dir):
+    """Borra dueno.json si su dueño murió, de modo que el trabajo se pueda reclamar."""
+    lock_path = job_dir / CLAIM_LOCK_FILE
+    try:
+        fd = os.open(lock_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+    except FileExistsError:
+        try:
+            # Un proceso murió justo mientras liberaba; el lock sólo dura milisegundos.
+            if time.time() - lock_path.stat().st_mtime > 60:
+                os.unlink(lock_path)
+        except FileNotFoundError:
+            pass
+        return
+    os.close(fd)
+    try:
+        # Se revisa de nuevo dentro del lock: otro worker pudo reclamarlo ya.
+        if not _claim_alive(job_dir):
+            _release_claim(job_dir)
+    finally:
+        os.unlink(lock_path)
+
+
+def report_job_id(kind, formato, params, data_version=None):
+    """
+    Calcula el id de trabajo de un reporte.
+
+    Args:
+        kind (str): "entrada", "salida" o "comparativo".
+        formato (str): "pdf" o "xlsx".
+        params (dict): Filtros fecha_inicio, fecha_fin y cc_selected.
+        data_version (int, optional): Versión de datos; por defecto la vigente.
+
+    Returns:
+        str: Id del trabajo.
+    """
+    if data_version is None:
+        data_version = get_data_version()
+    payload = json.dumps([kind, formato, sorted(params.items()), data_version], default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:20]
+
+
+def get_report_job(job_id):
+    """
+    Devuelve el estado de un trabajo.
+
+    Args:
+        job_id (str): Id devuelto por submit_report_job.
+
+    Returns:
+        ReportJob | None: Estado del trabajo, o None si no existe.
+    """
+    job_dir = get_jobs_dir() / job_id
+    status = _read_status(job_dir)
+    if status is None:
+        return None
+    estado = status["estado"]
+    if estado in (ESTADO_EN_COLA, ESTADO_GENERANDO):
+        if job_id in _futures:
+            _touch_claim(job_dir)
+        elif not _claim_alive(job_dir):
+            # Su dueño murió (p. ej. se reinició ese worker o el servidor).
+            estado = ESTADO_ERROR
+            status["error"] = "El trabajo se interrumpió; genera el reporte de nuevo."
+    path = job_dir / status["archivo"] if status.get("archivo") else None
+    return ReportJob(
+        job_id,
+        estado,
+        status.get("procesados", 0),
+        status.get("total"),
+        status.get("error"),
+        path,
+    )
+
+
+def cleanup_report_jobs(max_age_hours=None):
+    """
+    Borra los trabajos terminados más antiguos que la retención configurada.
+
+    Args:
+        max_age_hours (float, optional): Antigüedad máxima; por defecto
+            retencion_horas de la configuración.
+
+    Returns:
+        int: Trabajos borrados.
+    """
+    if max_age_hours is None:
+        max_age_hours = _config_value("retencion_horas", DEFAULT_RETENTION_HOURS)
+    limit = time.time() - max_age_hours * 3600
+    removed = 0
+    for job_dir in get_jobs_dir().iterdir():
+        if not job_dir.is_dir() or job_dir.name in _futures or _claim_alive(job_dir):
+            continue
+        try:
+            if job_dir.stat().st_mtime < limit:
+                shutil.rmtree(job_dir)
+                removed += 1
+        except OSError as e:
+            print(f"Error al borrar el trabajo de reporte {job_dir.name}: {e}")
+    return removed
+
+
+# =============================================================================
+# EJECUCIÓN EN LOS PROCESOS DEL POOL
+# =============================================================================
+
+def _init_worker(engine_url):
+    import utils
+    from cache import LRUCacheBackend, get_cache_backend, set_cache_backend
+
+    utils.init_engine(engine_url, pool_pre_ping=True)
+    if isinstance(get_cache_backend(), LRUCacheBackend):
+        # La caché en memoria del worker no ve los cambios de versión de datos
+        # del proceso de Streamlit; sin entradas, cada trabajo lee datos vigentes.
+        set_cache_backend(LRUCacheBackend(max_entries=0))
+
+
+def _run_job(job_dir, kind, formato, params):
+    """Genera un reporte dentro de un proceso del pool y deja el archivo en job_dir."""
+    from data import count_report_rows
+    from reportes import render_comparacion, render_reporte
+
+    job_dir = Path(job_dir)
+    total = None
+    procesados = 0
+    try:
+        _write_status(job_dir, estado=ESTADO_GENERANDO, procesados=0, total=None)
+        if kind == "comparativo":
+            render, args = render_comparacion, (formato,)
+        else:
+            total = count_report_rows(
+                params["fecha_inicio"], params["fecha_fin"], params["cc_selected"], kind
+            )
+            render, args = render_reporte, (formato, kind)
+        _write_status(job_dir, estado=ESTADO_GENERANDO, procesados=0, total=total)
+
+        def on_progress(count):
+            nonlocal procesados
+            procesados = count
+            _write_status(job_dir, estado=ESTADO_GENERANDO, procesados=procesados, total=total)
+            _touch_claim(job_dir)
+
+        file_name = f"reporte.{formato}"
+        # Temporal por proceso: si el dueño anterior murió y su proceso del pool
+        # sigue vivo, los dos no escriben sobre el mismo archivo.
+        tmp_path = job_dir / f"{file_name}.{os.getpid()}.tmp"
+        render(
+            *args,
+            params["fecha_inicio"],
+            params["fecha_fin"],
+            params["cc_selected"],
+            on_progress=on_progress,
+            output=str(tmp_path),
+        )
+        os.replace(tmp_path, job_dir / file_name)
+        _write_status(
+            job_dir, estado=ESTADO_LISTO, procesados=procesados, total=total, archivo=file_name
+        )
+    except Exception as e:
+        print(f"Error al generar el reporte {job_dir.name}: {e}")
+        _write_status(job_dir, estado=ESTADO_ERROR, procesados=0, total=total, error=str(e))
+
+
+# =============================================================================
+# COLA
+# =============================================================================
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: el proceso de Streamlit tiene hilos y un fork podría
+            # heredar locks tomados.
+            _executor = ProcessPoolExecutor(
+                max_workers=_config_value("max_workers", DEFAULT_MAX_WORKERS),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(get_engine().url.render_as_string(hide_password=False),),
+            )
+        return _executor
+
+
+def _reset_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _job_finished(job_id, job_dir, future):
+    with _futures_lock:
+        _futures.pop(job_id, None)
+    exc = future.exception() if not future.cancelled() else None
+    if future.cancelled() or exc is not None:
+        # El proceso murió (p. ej. sin memoria) sin poder escribir su estado.
+        reason = "cancelado" if future.cancelled() else str(exc) or type(exc).__name__
+        print(f"Error en el trabajo de reporte {job_id}: {reason}")
+        _write_status(job_dir, estado=ESTADO_ERROR, procesados=0, total=None, error=reason)
+    _release_claim(job_dir)
+
+
+def submit_report_job(kind, formato, fecha_inicio=None, fecha_fin=None, cc_selected=None):
+    """
+    Encola la generación de un reporte y devuelve su id sin esperar a que termine.
+
+    Si el mismo reporte ya está listo o en proceso para la versión de datos
+    vigente, en este worker o en otro, devuelve ese trabajo en lugar de
+    generar otro.
+
+    Args:
+        kind (str): "entrada", "salida" o "comparativo".
+        formato (str): "pdf" o "xlsx".
+        fecha_inicio (str, optional): Fecha de inicio 'YYYY-MM-DD'.
+        fecha_fin (str, optional): Fecha de fin 'YYYY-MM-DD'.
+        cc_selected (int, optional): Centro de costo.
+
+    Returns:
+        str: Id del trabajo, para consultarlo con get_report_job.
+
+    Raises:
+        ValueError: Si el tipo de reporte o el formato no son válidos.
+        ColaDeReportesLlenaError: Si ya hay max_pendientes trabajos en cola o en proceso.
+    """
+    if kind not in REPORT_KINDS:
+        raise ValueError(f"Tipo de reporte desconocido: {kind}")
+    if formato not in ("pdf", "xlsx"):
+        raise ValueError(f"Formato de reporte desconocido: {formato}")
+
+    params = {"fecha_inicio": fecha_inicio, "fecha_fin": fecha_fin, "cc_selected": cc_selected}
+    job_id = report_job_id(kind, formato, params)
+    with _futures_lock:
+        if job_id in _futures:
+            return job_id
+        job = get_report_job(job_id)
+        if job is not None and job.estado == ESTADO_LISTO and job.path and job.path.exists():
+            return job_id
+        if job is not None and job.estado in (ESTADO_EN_COLA, ESTADO_GENERANDO):
+            # Lo está generando otro worker.
+            return job_id
+
+        if len(_futures) >= _config_value("max_pendientes", DEFAULT_MAX_PENDING):
+            raise ColaDeReportesLlenaError(
+                "Hay demasiados reportes en proceso; intenta de nuevo en unos minutos."
+            )
+        cleanup_report_jobs()
+
+        job_dir = get_jobs_dir() / job_id
+        job_dir.mkdir(parents=True, exist_ok=True)
+        if not _claim_job(job_dir):
+            _release_dead_claim(job_dir)
+            if not _claim_job(job_dir):
+                # Otro worker lo reclamó entre la consulta y este intento.
+                return job_id
+        _write_status(job_dir, estado=ESTADO_EN_COLA, procesados=0, total=None)
+        try:
+            try:
+                future = _get_executor().submit(_run_job, str(job_dir), kind, formato, params)
+            except BrokenProcessPool:
+                # Un proceso del pool murió; se crea un pool nuevo para este y los siguientes trabajos.
+                _reset_executor()
+                future = _get_executor().submit(_run_job, str(job_dir), kind, formato, params)
+        except Exception as e:
+            _write_status(job_dir, estado=ESTADO_ERROR, procesados=0, total=None, error=str(e))
+            _release_claim(job_dir)
+            raise
+        _futures[job_id] = future
+    future.add_done_callback(lambda f: _job_finished(job_id, job_dir, f))
+    return job_id
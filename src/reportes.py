@@ -0,0 +1,763 @@
+"""
+reportes.py - Generación de reportes PDF y Excel
+
+Construye los archivos de los reportes de entradas, salidas y comparativo a
+partir de las consultas de data.py. No contiene llamadas a Streamlit, de
+modo que también puede ejecutarse en los procesos de report_jobs.py; la
+interfaz vive en p_reportes.py.
+"""
+import datetime
+import warnings
+from collections import namedtuple
+from functools import lru_cache
+from io import BytesIO
+from itertools import chain
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, Side
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.filters import AutoFilter
+from openpyxl.worksheet.table import Table as ExcelTable, TableColumn, TableStyleInfo
+
+from PIL import Image
+from reportlab import rl_config
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.units import inch
+from reportlab.lib.utils import ImageReader, simpleSplit
+from reportlab.pdfbase.pdfmetrics import getFont, stringWidth
+from reportlab.platypus import SimpleDocTemplate, LongTable, Table, TableStyle, Paragraph, Spacer
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+
+from data import get_comparacion_data, iter_report_data
+from pdf_styles import (
+    PDF_COL_WIDTHS,
+    PDF_COL_WIDTHS_COMP,
+    PDF_COL_WIDTHS_METADATA,
+    draw_pdf_page_number,
+    PDF_LOGO_FIRST_PAGE_HEIGHT,
+    PDF_LOGO_FIRST_PAGE_WIDTH,
+    PDF_LOGO_FIRST_PAGE_Y_OFFSET,
+    PDF_LOGO_LATER_PAGE_HEIGHT,
+    PDF_LOGO_LATER_PAGE_WIDTH,
+    PDF_LOGO_LATER_PAGE_Y_OFFSET,
+    PDF_LOGO_X,
+    PDF_TABLE_STYLE_COMPARACION,
+    PDF_TABLE_STYLE_REPORTE,
+    PDF_SUMMARY_COLOR,
+    PDF_SUMMARY_FONT_SIZE,
+    PDF_TABLE_BODY_FONT,
+    PDF_TABLE_BODY_FONT_SIZE,
+    PDF_TABLE_METADATA,
+    PDF_TITLE_COLOR,
+    PDF_TITLE_FONT_SIZE,
+    PDF_ENTRADAS_TOTAL_COLOR,
+    PDF_ENTRADAS_TOTAL_FONT_SIZE,
+)
+from utils import LOGO_PATH
+
+REPORTE_HEADERS_EXCEL = ["Fecha/Hora", "C.C", "Material", "Cantidad", "Unidad", "Precio Unit.", "Total"]
+REPORTE_HEADERS_PDF = ["Fecha/Hora", "Material", "Cantidad", "Unidad", "Precio Unit.", "Total"]
+COMPARACION_HEADERS_EXCEL = [
+    "C.C", "Material", "Tipo", "Unidad", "Precio Unit.",
+    "Entradas", "Salidas",
+    "Usado", "Costo Mat. Usado",
+]
+COMPARACION_KEYS = [
+    "c_c", "material", "tipo", "unidad_medida", "precio_unitario",
+    "total_entrada", "total_salida",
+    "usado", "costo_material_usado",
+]
+COMPARACION_HEADERS_PDF = [
+    "Material", "Tipo", "Unidad", "Precio Unit.",
+    "Salidas", "Entradas",
+    "Usado", "Costo Mat. Usado",
+]
+# Renglones por tabla del PDF. Al pasar de página ReportLab parte la tabla y
+# vuelve a procesar todos los renglones restantes, así que una sola tabla
+# cuesta O(n²); en bloques de tamaño fijo (cada uno con su encabezado, que se
+# repite en cada página) el costo crece linealmente.
+PDF_ROWS_PER_TABLE = 500
+# Relleno horizontal por omisión de una celda de Table (6 pt por lado).
+PDF_CELL_HORIZONTAL_PADDING = 12
+# Resolución a la que se reduce el logo: el original (1777x1707) se dibuja a
+# 1.6" y ReportLab compara su contenido completo en cada página.
+PDF_LOGO_DPI = 300
+
+# Sin el filtro ASCII85 los flujos del PDF quedan en binario: casi 20 % menos
+# bytes y sin codificarlos en Python puro en cada página.
+rl_config.useA85 = 0
+
+EXCEL_CURRENCY_FORMAT = "[$$-es-MX]#,##0.00"
+EXCEL_MATERIAL_WIDTH = 46
+EXCEL_ALIGNMENT = Alignment(horizontal="center", vertical="center", wrap_text=True)
+EXCEL_ROW_BORDER = Border(
+    left=Side(style=None),
+    right=Side(style=None),
+    top=Side(style="thin", color="D3D3D3"),
+    bottom=Side(style="thin", color="D3D3D3"),
+)
+
+
+# =============================================================================
+# HELPERS DE PDF Y EXCEL
+# =============================================================================
+
+_PdfStyles = namedtuple(
+    "_PdfStyles",
+    ["normal", "title", "summary", "total", "metadata", "reporte", "comparacion"],
+)
+
+
+@lru_cache(maxsize=None)
+def _get_pdf_styles():
+    """
+    Compila una sola vez por proceso los estilos de párrafo y de tabla de los PDFs.
+
+    Returns:
+        _PdfStyles: Estilos compartidos por todos los reportes.
+    """
+    styles = getSampleStyleSheet()
+    return _PdfStyles(
+        normal=styles["Normal"],
+        title=ParagraphStyle(
+            "CustomTitle",
+            parent=styles["Heading1"],
+            fontSize=PDF_TITLE_FONT_SIZE,
+            textColor=PDF_TITLE_COLOR,
+            spaceAfter=20,
+            alignment=1,
+        ),
+        summary=ParagraphStyle(
+            "SummaryStyle",
+            parent=styles["Normal"],
+            fontSize=PDF_SUMMARY_FONT_SIZE,
+            textColor=PDF_SUMMARY_COLOR,
+            alignment=2,
+        ),
+        total=ParagraphStyle(
+            "TotalStyle",
+            parent=styles["Normal"],
+            fontSize=PDF_ENTRADAS_TOTAL_FONT_SIZE,
+            textColor=PDF_ENTRADAS_TOTAL_COLOR,
+            alignment=2,
+        ),
+        metadata=TableStyle(PDF_TABLE_METADATA),
+        reporte=TableStyle(PDF_TABLE_STYLE_REPORTE),
+        comparacion=TableStyle(PDF_TABLE_STYLE_COMPARACION),
+    )
+
+
+@lru_cache(maxsize=None)
+def _get_logo():
+    """
+    Carga el logo una sola vez por proceso, reducido a PDF_LOGO_DPI.
+
+    Returns:
+        ImageReader: Logo listo para canvas.drawImage.
+    """
+    with Image.open(LOGO_PATH) as image:
+        width = round(PDF_LOGO_FIRST_PAGE_WIDTH / inch * PDF_LOGO_DPI)
+        height = round(image.height * width / image.width)
+        return ImageReader(image.convert("RGB").resize((width, height), Image.LANCZOS))
+
+
+def _draw_logo(canvas, doc, width, height, y_offset):
+    # drawImage calcula el md5 de la imagen en cada llamada; como form XObject
+    # se arma una vez por documento y cada página solo lo referencia.
+    form_name = f"Logo{round(width)}x{round(height)}"
+    if not canvas.hasForm(form_name):
+        canvas.beginForm(form_name)
+        canvas.drawImage(
+            _get_logo(),
+            x=PDF_LOGO_X,
+            y=doc.pagesize[1] - y_offset,
+            width=width,
+            height=height,
+            preserveAspectRatio=True,
+            mask="auto",
+        )
+        canvas.endForm()
+    canvas.saveState()
+    canvas.doForm(form_name)
+    canvas.restoreState()
+
+
+def _draw_first_page_decorators(canvas, doc):
+    _draw_logo(
+        canvas,
+        doc,
+        PDF_LOGO_FIRST_PAGE_WIDTH,
+        PDF_LOGO_FIRST_PAGE_HEIGHT,
+        PDF_LOGO_FIRST_PAGE_Y_OFFSET,
+    )
+
+
+def _draw_later_page_decorators(canvas, doc):
+    _draw_logo(
+        canvas,
+        doc,
+        PDF_LOGO_LATER_PAGE_WIDTH,
+        PDF_LOGO_LATER_PAGE_HEIGHT,
+        PDF_LOGO_LATER_PAGE_Y_OFFSET,
+    )
+    draw_pdf_page_number(canvas, doc)
+
+
+def _pdf_text_cell(text, width):
+    """
+    Devuelve el texto de una celda partido en renglones que caben en la columna.
+
+    Los renglones se separan con "\n", que Table dibuja como texto simple: no
+    se necesita un Paragraph y la altura del renglón sale del LEADING del
+    estilo de la tabla.
+    """
+    available = width - PDF_CELL_HORIZONTAL_PADDING
+    if stringWidth(text, PDF_TABLE_BODY_FONT, PDF_TABLE_BODY_FONT_SIZE) <= available:
+        return text
+    return "\n".join(simpleSplit(text, PDF_TABLE_BODY_FONT, PDF_TABLE_BODY_FONT_SIZE, available))
+
+
+# Escape de cada byte en una cadena literal del PDF, como rl_accel.escapePDF:
+# diagonal invertida y paréntesis con diagonal, y lo no imprimible en octal.
+_PDF_STRING_ESCAPES = {i: chr(i) if 32 <= i < 127 else f"\\{i:03o}" for i in range(256)}
+_PDF_STRING_ESCAPES.update({ord("\\"): "\\\\", ord("("): "\\(", ord(")"): "\\)"})
+
+
+class _ReportTable(LongTable):
+    """
+    LongTable que escribe el texto simple de sus celdas directamente en el PDF.
+
+    Table dibuja cada renglón de texto con canvas.drawCentredString, que arma
+    y serializa un objeto de texto completo por celda; con decenas de miles de
+    celdas eso es la mayor parte del tiempo del reporte. Para texto centrado
+    en una fuente Type 1 estándar basta con posicionar y mostrar la cadena ya
+    codificada. Cualquier otra celda (flowables, otra alineación, caracteres
+    fuera de la codificación de la fuente) se dibuja como en Table.
+    """
+
+    _text_state = None
+
+    def draw(self):
+        self._text_state = None
+        super().draw()
+
+    def _drawCell(self, cellval, cellstyle, pos, size):
+        if not isinstance(cellval, str) or cellstyle.alignment not in ("CENTRE", "CENTER"):
+            return super()._drawCell(cellval, cellstyle, pos, size)
+        font = getFont(cellstyle.fontname)
+        if (
+            font._dynamicFont
+            or cellstyle.href
+            or cellstyle.destination
+            or cellstyle.direction
+            or cellstyle.shaping
+        ):
+            return super()._drawCell(cellval, cellstyle, pos, size)
+        try:
+            lines = [line.encode(font.encName) for line in cellval.split("\n")]
+        except UnicodeEncodeError:
+            return super()._drawCell(cellval, cellstyle, pos, size)
+
+        canv = self.canv
+        # Fuente y color son estado gráfico y se conservan entre bloques BT/ET;
+        # el LEADING no importa aquí porque cada renglón se posiciona con Tm.
+        text_state = (cellstyle.fontname, cellstyle.fontsize, cellstyle.color)
+        if self._curcellstyle is not None:
+            # Table._drawCell cambió el estado desde la última celda rápida.
+            self._text_state = None
+        if self._text_state != text_state:
+            previous = self._text_state
+            if previous is None or previous[2] != text_state[2]:
+                canv.setFillColor(cellstyle.color)
+            if previous is None or previous[:2] != text_state[:2]:
+                canv.setFont(cellstyle.fontname, cellstyle.fontsize)
+            self._text_state = text_state
+            # Obliga a Table._drawCell a reponer su estilo si le toca otra celda.
+            self._curcellstyle = None
+
+        colpos, rowpos = pos
+        colwidth, rowheight = size
+        leading = cellstyle.leading
+        fontsize = cellstyle.fontsize
+        # Misma colocación que Table._drawCell.
+        if cellstyle.valign == "TOP":
+            y = rowpos + rowheight - cellstyle.topPadding - fontsize
+        elif cellstyle.valign == "MIDDLE":
+            y = rowpos + (
+                cellstyle.bottomPadding + rowheight - cellstyle.topPadding + len(lines) * leading
+            ) / 2.0 - fontsize
+        else:
+            y = rowpos + cellstyle.bottomPadding + len(lines) * leading - fontsize
+        center = colpos + (colwidth + cellstyle.leftPadding - cellstyle.rightPadding) * 0.5
+        widths = font.widths
+        ops = []
+        for line in lines:
+            x = center - 0.0005 * fontsize * sum(map(widths.__getitem__, line))
+            ops.append(f"1 0 0 1 {x:.2f} {y:.2f} Tm ({line.decode('latin-1').translate(_PDF_STRING_ESCAPES)}) Tj")
+            y -= leading
+        canv.addLiteral(f"BT {' '.join(ops)} ET")
+
+
+def _build_pdf_table(headers, table_rows, col_widths, table_style):
+    # LongTable solo calcula la altura de los renglones que caben en la página.
+    return _ReportTable([headers] + table_rows, colWidths=col_widths, repeatRows=1, style=table_style)
+
+
+def _build_metadata_table(generated_at, cc_value):
+    meta_table_data = [
+        ["Fecha", "Hora", "C.C"],
+        [
+            generated_at.strftime("%d/%m/%Y"),
+            generated_at.strftime("%H:%M:%S"),
+            str(cc_value) if cc_value else "N/A",
+        ],
+    ]
+    meta_table = Table(
+        meta_table_data,
+        colWidths=PDF_COL_WIDTHS_METADATA,
+        hAlign="CENTER",
+    )
+    meta_table.setStyle(_get_pdf_styles().metadata)
+    return meta_table
+
+
+def _excel_table_name(table_name):
+    safe_table_name = "".join(c if c.isalnum() else "_" for c in table_name)
+    if safe_table_name and safe_table_name[0].isdigit():
+        safe_table_name = f"T_{safe_table_name}"
+    return safe_table_name
+
+
+def write_excel_table(output, sheet_name, headers, rows, currency_headers=(), table_name=None):
+    """
+    Escribe una hoja de Excel con formato de tabla, en memoria constante.
+
+    Usa un libro de openpyxl en modo write-only: cada renglón se serializa al
+    agregarse y no se conserva la hoja en memoria. El formato (centrado,
+    bordes horizontales, moneda y encabezado en negritas) va en un juego de
+    celdas prototipo por columna que se reutiliza en cada renglón, en lugar
+    de recorrer la hoja al final.
+
+    Args:
+        output (str | Path | BinaryIO): Archivo destino.
+        sheet_name (str): Nombre de la hoja.
+        headers (list[str]): Encabezados de las columnas.
+        rows (Iterable[Sequence]): Renglones con un valor por encabezado.
+        currency_headers (Iterable[str]): Encabezados con formato de moneda.
+        table_name (str, optional): Nombre de la tabla de Excel.
+
+    Returns:
+        int: Renglones escritos (sin contar el encabezado).
+    """
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(sheet_name)
+    if "Material" in headers:
+        # Aproximacion de pixeles a ancho Excel (325 px ~ 46)
+        material_column = get_column_letter(headers.index("Material") + 1)
+        worksheet.column_dimensions[material_column].width = EXCEL_MATERIAL_WIDTH
+
+    def styled_cell(value=None, bold=False, number_format=None):
+        cell = WriteOnlyCell(worksheet, value)
+        cell.alignment = EXCEL_ALIGNMENT
+        cell.border = EXCEL_ROW_BORDER
+        if bold:
+            cell.font = Font(bold=True)
+        if number_format:
+            cell.number_format = number_format
+        return cell
+
+    worksheet.append([styled_cell(header, bold=True) for header in headers])
+
+    currency_headers = set(currency_headers)
+    row_cells = [
+        styled_cell(number_format=EXCEL_CURRENCY_FORMAT if header in currency_headers else None)
+        for header in headers
+    ]
+    written = 0
+    for row in rows:
+        # append() serializa el renglón de inmediato, así que las celdas se reutilizan.
+        for cell, value in zip(row_cells, row):
+            cell.value = value
+        worksheet.append(row_cells)
+        written += 1
+
+    if written:
+        ref = f"A1:{get_column_letter(len(headers))}{written + 1}"
+        excel_table = ExcelTable(
+            displayName=_excel_table_name(table_name or f"Tabla_{sheet_name}"),
+            ref=ref,
+            tableColumns=[TableColumn(id=i, name=header) for i, header in enumerate(headers, 1)],
+            autoFilter=AutoFilter(ref=ref),
+        )
+        excel_table.tableStyleInfo = TableStyleInfo(
+            name="TableStyleMedium2",
+            showFirstColumn=False,
+            showLastColumn=False,
+            showRowStripes=True,
+            showColumnStripes=False,
+        )
+        with warnings.catch_warnings():
+            # openpyxl avisa siempre en modo write-only, aunque las columnas ya vengan definidas.
+            warnings.filterwarnings("ignore", message="In write-only mode you must add table columns")
+            worksheet.add_table(excel_table)
+
+    workbook.save(output)
+    return written
+
+
+def create_comparacion_pdf(comparacion_data, output=None):
+    """
+    Genera un PDF comparativo de entradas vs salidas por centro de costo.
+
+    Args:
+        comparacion_data (list[dict]): Datos obtenidos con get_comparacion_data().
+        output (str | Path | BinaryIO, optional): Archivo destino; por defecto
+            un BytesIO nuevo.
+
+    Returns:
+        str | Path | BinaryIO: output, o el BytesIO con el PDF generado.
+    """
+    buffer = BytesIO() if output is None else output
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=letter,
+        rightMargin=40,
+        leftMargin=40,
+        topMargin=72,
+        bottomMargin=18,
+    )
+
+    elements = []
+    styles = _get_pdf_styles()
+
+    elements.append(Paragraph("Reporte Comparativo: Entradas vs Salidas", styles.title))
+    elements.append(Spacer(1, 0.2 * inch))
+
+    generated_at = datetime.datetime.now()
+    metadata_cc = None
+    if comparacion_data:
+        ccs_unicos = sorted({item["c_c"] for item in comparacion_data})
+        metadata_cc = ccs_unicos[0] if len(ccs_unicos) == 1 else "Varios"
+    elements.append(_build_metadata_table(generated_at, metadata_cc))
+    elements.append(Spacer(1, 0.3 * inch))
+
+    if comparacion_data:
+        material_width = PDF_COL_WIDTHS_COMP[0]
+        table_rows = []
+        for item in sorted(
+            comparacion_data,
+            key=lambda row: (str(row["c_c"]), str(row["material"])),
+        ):
+            table_rows.append([
+                _pdf_text_cell(item["material"], material_width),
+                item["tipo"],
+                item["unidad_medida"],
+                f"${(item['precio_unitario'] or 0):,.2f}",
+                str(item["total_salida"]),
+                str(item["total_entrada"]),
+                str(item["usado"]),
+                f"${item['costo_material_usado']:,.2f}",
+            ])
+            if len(table_rows) == PDF_ROWS_PER_TABLE:
+                elements.append(_build_pdf_table(
+                    COMPARACION_HEADERS_PDF, table_rows, PDF_COL_WIDTHS_COMP, styles.comparacion
+                ))
+                table_rows = []
+        if table_rows:
+            elements.append(_build_pdf_table(
+                COMPARACION_HEADERS_PDF, table_rows, PDF_COL_WIDTHS_COMP, styles.comparacion
+            ))
+        elements.append(Spacer(1, 0.3 * inch))
+
+        total_costo = sum(i["costo_material_usado"] for i in comparacion_data)
+        elements.append(
+            Paragraph(
+                f"<b>Costo Total:</b> ${total_costo:,.2f}",
+                styles.summary,
+            )
+        )
+    else:
+        elements.append(
+            Paragraph("No hay datos comparativos para mostrar.", styles.normal)
+        )
+
+    doc.build(
+        elements,
+        onFirstPage=_draw_first_page_decorators,
+        onLaterPages=_draw_later_page_decorators,
+    )
+    if output is None:
+        buffer.seek(0)
+    return buffer
+
+
+def create_reporte_excel(report_chunks, movement_type="entrada", output=None):
+    """
+    Genera un archivo Excel con los datos de entradas o salidas.
+
+    Los renglones se escriben conforme llegan los bloques (write_excel_table),
+    sin armar antes una lista o un DataFrame con todo el reporte.
+
+    Args:
+        report_chunks (Iterable[list[tuple]]): Bloques de renglones como los de
+            iter_report_data(); para una lista ya cargada, pasar [report_data].
+        movement_type (str): Tipo de movimiento, "entrada" o "salida".
+        output (str | Path | BinaryIO, optional): Archivo destino; por defecto
+            un BytesIO nuevo.
+
+    Returns:
+        str | Path | BinaryIO: output, o el BytesIO con el Excel generado.
+    """
+    sheet_name = "Entradas" if movement_type == "entrada" else "Salidas"
+    buffer = BytesIO() if output is None else output
+
+    def rows():
+        for fecha_hora, cc, material, cantidad, precio_unitario, unidad in chain.from_iterable(report_chunks):
+            yield (
+                fecha_hora.strftime("%Y-%m-%d %H:%M:%S") if fecha_hora else "",
+                cc,
+                material,
+                cantidad,
+                unidad,
+                precio_unitario or 0,
+                cantidad * (precio_unitario or 0),
+            )
+
+    write_excel_table(
+        buffer,
+        sheet_name,
+        REPORTE_HEADERS_EXCEL,
+        rows(),
+        currency_headers={"Precio Unit.", "Total"},
+        table_name=f"Tabla_{sheet_name}",
+    )
+    if output is None:
+        buffer.seek(0)
+    return buffer
+
+
+def create_comparacion_excel(comparacion_data, output=None):
+    """
+    Genera un archivo Excel comparativo de entradas vs salidas.
+
+    Args:
+        comparacion_data (list[dict]): Datos obtenidos con get_comparacion_data().
+        output (str | Path | BinaryIO, optional): Archivo destino; por defecto
+            un BytesIO nuevo.
+
+    Returns:
+        str | Path | BinaryIO: output, o el BytesIO con el Excel generado.
+    """
+    buffer = BytesIO() if output is None else output
+    write_excel_table(
+        buffer,
+        "Comparativo",
+        COMPARACION_HEADERS_EXCEL,
+        ([item[key] for key in COMPARACION_KEYS] for item in comparacion_data),
+        currency_headers={"Precio Unit.", "Costo Mat. Usado"},
+        table_name="Tabla_Comparativo",
+    )
+    if output is None:
+        buffer.seek(0)
+    return buffer
+
+
+class _StreamedFlowables(list):
+    """
+    Lista de flowables que se llena desde un generador conforme ReportLab la consume.
+
+    BaseDocTemplate.build solo usa len(), indexado y borrado por el frente de
+    la lista, así que basta con mantener unos cuantos flowables por delante:
+    las tablas ya dibujadas se liberan antes de generar las siguientes.
+    """
+
+    def __init__(self, source, lookahead=2):
+        super().__init__()
+        self._source = iter(source)
+        self._lookahead = lookahead
+
+    def _fill(self):
+        while self._source is not None and list.__len__(self) < self._lookahead:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._source = None
+
+    def __len__(self):
+        self._fill()
+        return list.__len__(self)
+
+    def __getitem__(self, index):
+        self._fill()
+        return list.__getitem__(self, index)
+
+
+def _iter_reporte_flowables(report_chunks, movement_type):
+    """
+    Genera los flowables del reporte bloque por bloque.
+
+    Cada PDF_ROWS_PER_TABLE renglones se emite una LongTable con su
+    encabezado, que además se repite en cada página que ocupa la tabla.
+    """
+    styles = _get_pdf_styles()
+    rows = chain.from_iterable(report_chunks)
+    first_row = next(rows, None)
+
+    report_label = "Entradas" if movement_type == "entrada" else "Salidas"
+    yield Paragraph(f"Reporte de {report_label} de Almacén", styles.title)
+    yield Spacer(1, 0.2 * inch)
+
+    generated_at = datetime.datetime.now()
+    yield _build_metadata_table(generated_at, first_row[1] if first_row else None)
+    yield Spacer(1, 0.3 * inch)
+
+    if first_row is None:
+        yield Paragraph(f"No hay datos de {movement_type}s para mostrar.", styles.normal)
+        return
+
+    material_width = PDF_COL_WIDTHS[1]
+    total_general = 0
+    table_rows = []
+
+    for row in chain([first_row], rows):
+        fecha_hora, cc, material, cantidad, precio_unitario, unidad = row
+        total = cantidad * (precio_unitario or 0)
+        total_general += total
+        table_rows.append([
+            fecha_hora.strftime("%Y-%m-%d %H:%M") if fecha_hora else "",
+            _pdf_text_cell(material, material_width),
+            str(cantidad),
+            str(unidad),
+            f"${precio_unitario:.2f}" if precio_unitario else "$0.00",
+            f"${total:.2f}",
+        ])
+        if len(table_rows) == PDF_ROWS_PER_TABLE:
+            yield _build_pdf_table(REPORTE_HEADERS_PDF, table_rows, PDF_COL_WIDTHS, styles.reporte)
+            table_rows = []
+
+    if table_rows:
+        yield _build_pdf_table(REPORTE_HEADERS_PDF, table_rows, PDF_COL_WIDTHS, styles.reporte)
+    yield Spacer(1, 0.3 * inch)
+
+    yield Paragraph(f"<b>TOTAL GENERAL:</b> ${total_general:,.2f}", styles.total)
+
+
+def create_reporte_pdf(report_chunks, movement_type="entrada", output=None):
+    """
+    Genera un PDF con los datos de entradas o salidas.
+
+    Las tablas se construyen conforme ReportLab avanza de página, así que en
+    memoria solo hay unos cuantos bloques de renglones a la vez.
+
+    Args:
+        report_chunks (Iterable[list[tuple]]): Bloques de renglones como los de
+            iter_report_data(); para una lista ya cargada, pasar [report_data].
+        movement_type (str): Tipo de movimiento, "entrada" o "salida".
+        output (str | Path | BinaryIO, optional): Archivo destino; por defecto
+            un BytesIO nuevo.
+
+    Returns:
+        str | Path | BinaryIO: output, o el BytesIO con el PDF generado.
+    """
+    buffer = BytesIO() if output is None else output
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=letter,
+        rightMargin=50,
+        leftMargin=50,
+        topMargin=72,
+        bottomMargin=18,
+    )
+    doc.build(
+        _StreamedFlowables(_iter_reporte_flowables(report_chunks, movement_type)),
+        onFirstPage=_draw_first_page_decorators,
+        onLaterPages=_draw_later_page_decorators,
+    )
+    if output is None:
+        buffer.seek(0)
+    return buffer
+
+
+# =============================================================================
+# GENERACIÓN DE ARCHIVOS
+# =============================================================================
+
+REPORT_FORMATS = ("pdf", "xlsx")
+
+
+def _report_progress(report_chunks, on_progress):
+    procesados = 0
+    for chunk in report_chunks:
+        yield chunk
+        procesados += len(chunk)
+        on_progress(procesados)
+
+
+def render_reporte(
+    formato,
+    movement_type,
+    fecha_inicio=None,
+    fecha_fin=None,
+    cc_selected=None,
+    on_progress=None,
+    output=None,
+):
+    """
+    Genera el archivo de un reporte de entradas o salidas.
+
+    Args:
+        formato (str): "pdf" o "xlsx".
+        movement_type (str): "entrada" o "salida".
+        fecha_inicio (str, optional): Fecha de inicio 'YYYY-MM-DD'.
+        fecha_fin (str, optional): Fecha de fin 'YYYY-MM-DD'.
+        cc_selected (int, optional): Centro de costo.
+        on_progress (Callable[[int], None], optional): Recibe los renglones
+            procesados después de cada bloque.
+        output (str | BinaryIO, optional): Archivo destino; por defecto un BytesIO nuevo.
+
+    Returns:
+        str | BinaryIO: output, o el BytesIO con el archivo generado.
+
+    Raises:
+        ValueError: Si el formato no es "pdf" ni "xlsx".
+    """
+    if formato not in REPORT_FORMATS:
+        raise ValueError(f"Formato de reporte desconocido: {formato}")
+    report_chunks = iter_report_data(fecha_inicio, fecha_fin, cc_selected, movement_type)
+    if on_progress is not None:
+        report_chunks = _report_progress(report_chunks, on_progress)
+    if formato == "pdf":
+        return create_reporte_pdf(report_chunks, movement_type=movement_type, output=output)
+    return create_reporte_excel(report_chunks, movement_type=movement_type, output=output)
+
+
+def render_comparacion(
+    formato, fecha_inicio=None, fecha_fin=None, cc_selected=None, on_progress=None, output=None
+):
+    """
+    Genera el archivo del reporte comparativo; ver render_reporte.
+
+    Args:
+        formato (str): "pdf" o "xlsx".
+        fecha_inicio (str, optional): Fecha de inicio 'YYYY-MM-DD'.
+        fecha_fin (str, optional): Fecha de fin 'YYYY-MM-DD'.
+        cc_selected (int, optional): Centro de costo.
+        on_progress (Callable[[int], None], optional): Recibe los materiales
+            comparados una vez leídos.
+        output (str | BinaryIO, optional): Archivo destino; por defecto un BytesIO nuevo.
+
+    Returns:
+        str | BinaryIO: output, o el BytesIO con el archivo generado.
+
+    Raises:
+        ValueError: Si el formato no es "pdf" ni "xlsx".
+    """
+    if formato not in REPORT_FORMATS:
+        raise ValueError(f"Formato de reporte desconocido: {formato}")
+    comparacion_data = get_comparacion_data(fecha_inicio, fecha_fin, cc_selected)
+    if on_progress is not None:
+        on_progress(len(comparacion_data))
+    if formato == "pdf":
+        return create_comparacion_pdf(comparacion_data, output=output)
+    return create_comparacion_excel(comparacion_data, output=output)
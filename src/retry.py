@@ -0,0 +1,173 @@
+"""
+retry.py - Reintento de transacciones de escritura ante errores transitorios
+
+MySQL puede abortar una transacción sana por causas que no dependen de los
+datos: un interbloqueo (1213), un tiempo de espera de bloqueo agotado (1205)
+o una conexión perdida (2006, 2013, 2055, o una conexión que el pool marcó
+como inválida). El decorador retry_transaction vuelve a ejecutar la función
+de escritura completa con una espera exponencial con jitter, en lugar de
+mostrar el error al operador y obligarlo a capturar de nuevo el formulario.
+
+Solo se reintenta si el error ocurrió antes de iniciar el COMMIT: si la
+conexión se pierde durante el COMMIT no se sabe si la transacción quedó
+confirmada, y repetirla podría duplicar el movimiento.
+
+Cada reintento y cada agotamiento de intentos se cuenta en el backend de
+caché (cache.py), de modo que con un backend compartido las cifras suman
+todos los workers:
+
+    python src/db_admin.py retry-stats
+"""
+import functools
+import random
+import sqlite3
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from cache import get_cache_backend
+
+DEFAULT_MAX_ATTEMPTS = 4
+DEFAULT_BASE_DELAY = 0.05
+DEFAULT_MAX_DELAY = 1.0
+
+RETRYABLE_MYSQL_ERRORS = {
+    1205: "lock_wait_timeout",
+    1213: "deadlock",
+    2006: "server_gone_away",
+    2013: "lost_connection",
+    2055: "lost_connection",
+}
+RETRY_REASONS = sorted(
+    set(RETRYABLE_MYSQL_ERRORS.values()) | {"connection_invalidated", "sqlite_locked"}
+)
+METRIC_PREFIX = "retry:"
+
+_registered = []
+_state = threading.local()
+
+
+# =============================================================================
+# CLASIFICACIÓN DE ERRORES
+# =============================================================================
+
+def classify_retryable_error(exc):
+    """
+    Indica si un error de base de datos es transitorio y vale la pena reintentar.
+
+    Args:
+        exc (BaseException): Excepción lanzada por la transacción.
+
+    Returns:
+        str | None: Motivo del reintento (p. ej. "deadlock") o None si no es
+            un error transitorio.
+    """
+    if not isinstance(exc, DBAPIError):
+        return None
+    if exc.connection_invalidated:
+        return "connection_invalidated"
+    orig = exc.orig
+    errno = getattr(orig, "errno", None)
+    if errno is None and getattr(orig, "args", None) and isinstance(orig.args[0], int):
+        errno = orig.args[0]
+    if errno in RETRYABLE_MYSQL_ERRORS:
+        return RETRYABLE_MYSQL_ERRORS[errno]
+    if isinstance(orig, sqlite3.OperationalError) and "database is locked" in str(orig):
+        return "sqlite_locked"
+    return None
+
+
+@event.listens_for(Session, "before_commit")
+def _mark_commit_started(session):
+    _state.commit_started = True
+
+
+# =============================================================================
+# MÉTRICAS
+# =============================================================================
+
+def _record(function_name, outcome):
+    try:
+        get_cache_backend().incr(f"{METRIC_PREFIX}{function_name}:{outcome}")
+    except Exception as e:
+        # Las métricas nunca deben impedir la escritura.
+        print(f"Error al registrar métrica de reintento ({function_name}, {outcome}): {e}")
+
+
+def get_retry_metrics():
+    """
+    Devuelve los contadores de reintentos de las funciones decoradas.
+
+    Returns:
+        dict[str, dict[str, int]]: {función: {motivo o "agotados": conteo}},
+            solo con los contadores distintos de cero.
+    """
+    backend = get_cache_backend()
+    metrics = {}
+    for function_name in _registered:
+        counts = {
+            outcome: backend.get_counter(f"{METRIC_PREFIX}{function_name}:{outcome}")
+            for outcome in RETRY_REASONS + ["agotados"]
+        }
+        counts = {outcome: n for outcome, n in counts.items() if n}
+        if counts:
+            metrics[function_name] = counts
+    return metrics
+
+
+# =============================================================================
+# DECORADOR
+# =============================================================================
+
+def retry_transaction(
+    max_attempts=DEFAULT_MAX_ATTEMPTS,
+    base_delay=DEFAULT_BASE_DELAY,
+    max_delay=DEFAULT_MAX_DELAY,
+):
+    """
+    Decorador que reintenta una función de escritura ante errores transitorios.
+
+    La función decorada debe abrir su propia sesión, hacer un solo commit al
+    final y no modificar sus argumentos, como las escrituras de data.py: así
+    cada intento parte de cero. La espera antes del intento n es aleatoria
+    entre 0 y min(max_delay, base_delay * 2 ** (n - 1)) ("full jitter"), para
+    que dos transacciones que chocaron no vuelvan a chocar al mismo tiempo.
+
+    Args:
+        max_attempts (int): Intentos totales, incluido el primero.
+        base_delay (float): Espera base en segundos.
+        max_delay (float): Espera máxima en segundos.
+
+    Returns:
+        Callable: Decorador.
+    """
+    def decorator(fn):
+        _registered.append(fn.__name__)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            for attempt in range(1, max_attempts + 1):
+                _state.commit_started = False
+                try:
+                    return fn(*args, **kwargs)
+                except Exception as e:
+                    reason = classify_retryable_error(e)
+                    if reason is None or _state.commit_started:
+                        raise
+                    if attempt == max_attempts:
+                        _record(fn.__name__, "agotados")
+                        raise
+                    _record(fn.__name__, reason)
+                    delay = random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+                    print(
+                        f"Reintentando {fn.__name__} ({reason}), intento "
+                        f"{attempt + 1}/{max_attempts} en {delay:.2f}s"
+                    )
+                    time.sleep(delay)
+
+        return wrapper
+
+    return decorator
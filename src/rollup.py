@@ -0,0 +1,110 @@
+"""
+rollup.py - Resumen diario de movimientos por proyecto y artículo
+
+La tabla resumen_movimientos_diario guarda la suma de
+detalle_movimientos.cantidad por (id_proyecto, id_articulo, tipo_movimiento,
+dia). Las escrituras de data.py la actualizan dentro de la misma transacción
+que el movimiento, así que el reporte comparativo lee pocas filas por centro
+de costo en lugar de reagrupar todo el historial de movimientos.
+
+El centro de costo no se copia al resumen: el comparativo lo toma de
+proyectos al consultar, así que editar el c_c de un proyecto mueve también su
+resumen. Los movimientos sin proyecto no entran al resumen, igual que en el
+reporte comparativo original.
+
+Para reconstruirla desde el historial (p. ej. tras cargar datos a mano):
+
+    python src/db_admin.py rebuild-rollup
+"""
+from collections import defaultdict
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from classes import DetalleMovimiento, Movimientos, ResumenMovimientosDiario
+
+_rollup = ResumenMovimientosDiario.__table__
+_KEY_COLUMNS = ["id_proyecto", "id_articulo", "tipo_movimiento", "dia"]
+
+
+def _upsert_statement(dialect):
+    """INSERT que suma la cantidad si la llave (proyecto, artículo, tipo, día) ya existe."""
+    if dialect == "mysql":
+        stmt = mysql_insert(_rollup)
+        return stmt.on_duplicate_key_update(cantidad=_rollup.c.cantidad + stmt.inserted.cantidad)
+    if dialect in ("sqlite", "postgresql"):
+        stmt = (sqlite_insert if dialect == "sqlite" else postgresql_insert)(_rollup)
+        return stmt.on_conflict_do_update(
+            index_elements=_KEY_COLUMNS,
+            set_={"cantidad": _rollup.c.cantidad + stmt.excluded.cantidad},
+        )
+    raise ValueError(f"Dialecto sin soporte para el resumen diario: {dialect}")
+
+
+def add_movement_to_rollup(session, id_proyecto, tipo_movimiento, fecha_hora, cantidades):
+    """
+    Suma las cantidades de un movimiento al resumen diario.
+
+    Debe llamarse con la misma sesión que registra el movimiento, antes del
+    commit, para que el resumen y los detalles se confirmen juntos.
+
+    Args:
+        session (sqlalchemy.orm.Session): Sesión de la transacción en curso.
+        id_proyecto (int | None): Proyecto del movimiento; si es None no se hace nada.
+        tipo_movimiento (str): 'entrada' o 'salida'.
+        fecha_hora (datetime): Fecha y hora del movimiento.
+        cantidades (Iterable[tuple[int, float]]): Pares (id_articulo, cantidad).
+    """
+    if id_proyecto is None:
+        return
+
+    totals = defaultdict(float)
+    for id_articulo, cantidad in cantidades:
+        totals[id_articulo] += cantidad or 0
+    if not totals:
+        return
+
+    dia = fecha_hora.date()
+    session.execute(
+        _upsert_statement(session.get_bind().dialect.name),
+        [
+            {
+                "id_proyecto": id_proyecto,
+                "id_articulo": id_articulo,
+                "tipo_movimiento": tipo_movimiento,
+                "dia": dia,
+                "cantidad": cantidad,
+            }
+            for id_articulo, cantidad in totals.items()
+        ],
+    )
+
+
+def rebuild_rollup(connection):
+    """
+    Reconstruye por completo el resumen diario a partir del historial.
+
+    Args:
+        connection: Conexión de SQLAlchemy dentro de una transacción.
+
+    Returns:
+        int: Filas del resumen después de la reconstrucción.
+    """
+    dia = func.date(Movimientos.fecha_hora)
+    history = (
+        select(
+            Movimientos.id_proyecto,
+            DetalleMovimiento.id_articulo,
+            Movimientos.tipo,
+            dia,
+            func.sum(DetalleMovimiento.cantidad),
+        )
+        .join(DetalleMovimiento, Movimientos.id_movimiento == DetalleMovimiento.id_movimiento)
+        .where(Movimientos.id_proyecto.is_not(None))
+        .group_by(Movimientos.id_proyecto, DetalleMovimiento.id_articulo, Movimientos.tipo, dia)
+    )
+    connection.execute(delete(_rollup))
+    connection.execute(insert(_rollup).from_select(_KEY_COLUMNS + ["cantidad"], history))
+    return connection.execute(select(func.count()).select_from(_rollup)).scalar()
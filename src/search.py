@@ -0,0 +1,214 @@
+"""
+search.py - Búsqueda de artículos por nombre y número de catálogo
+
+Índice en memoria para el autocompletado de artículos. Los textos se
+normalizan sin mayúsculas ni acentos ("Albañilería" → "albanileria") y se
+indexan de dos formas:
+
+- trigramas de cada palabra, para buscar subcadenas de 3 o más caracteres
+  (más los trigramas de borde " ab" y "yz ", que ayudan a la búsqueda
+  aproximada);
+- prefijos de 1 y 2 caracteres de cada palabra, para consultas cortas.
+
+Una búsqueda intersecta las listas de ids de cada palabra de la consulta,
+verifica las coincidencias y ordena por relevancia. Con fuzzy=True (los
+buscadores de Entradas y Salidas), si ninguna coincide de forma exacta se
+ofrecen los artículos que comparten más trigramas con la consulta
+(tolerancia a errores de escritura). El filtro de Inventario no la usa: un
+filtro sin coincidencias debe mostrar la tabla vacía.
+
+El índice vive dentro de ArticleCatalog (catalog.py) y se parcha con él
+después de cada escritura.
+"""
+import heapq
+import threading
+import unicodedata
+from collections import Counter
+
+SHORT_PREFIX_LENGTH = 2
+FUZZY_MIN_OVERLAP = 0.4
+
+# Relevancia: menor es mejor.
+_RANK_EXACT = 0
+_RANK_PREFIX = 1
+_RANK_WORD_PREFIX = 2
+_RANK_SUBSTRING = 3
+_RANK_FUZZY = 4
+
+
+def normalize_text(text):
+    """
+    Normaliza un texto para búsqueda: sin acentos, en minúsculas y con espacios simples.
+
+    Args:
+        text (str | None): Texto original.
+
+    Returns:
+        str: Texto normalizado ("" si text es vacío o None).
+    """
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", str(text))
+    without_accents = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(without_accents.casefold().split())
+
+
+def _trigrams(word):
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+
+def _padded_trigrams(word):
+    return _trigrams(f" {word} ")
+
+
+class ArticleSearchIndex:
+    """
+    Índice de búsqueda por subcadena sobre nombre y num_catalogo.
+
+    Args:
+        entries (Iterable[tuple[int, str, str]]): Tuplas (id_articulo, nombre, num_catalogo).
+    """
+
+    def __init__(self, entries=()):
+        self._docs = {}
+        self._grams = {}
+        self._prefixes = {}
+        self._lock = threading.Lock()
+        for id_articulo, nombre, num_catalogo in entries:
+            self._add(id_articulo, nombre, num_catalogo)
+
+    def __len__(self):
+        return len(self._docs)
+
+    # --- Mantenimiento -------------------------------------------------------
+
+    def _keys(self, words):
+        grams = set()
+        prefixes = set()
+        for word in words:
+            grams |= _padded_trigrams(word)
+            for length in range(1, SHORT_PREFIX_LENGTH + 1):
+                if len(word) >= length:
+                    prefixes.add(word[:length])
+        return grams, prefixes
+
+    def _add(self, id_articulo, nombre, num_catalogo):
+        nombre_norm = normalize_text(nombre)
+        num_norm = normalize_text(num_catalogo)
+        text = f"{nombre_norm} {num_norm}"
+        words = tuple(set(text.split()))
+        self._docs[id_articulo] = (nombre_norm, num_norm, text, words)
+        grams, prefixes = self._keys(words)
+        for gram in grams:
+            self._grams.setdefault(gram, set()).add(id_articulo)
+        for prefix in prefixes:
+            self._prefixes.setdefault(prefix, set()).add(id_articulo)
+
+    def _remove(self, id_articulo):
+        doc = self._docs.pop(id_articulo, None)
+        if doc is None:
+            return
+        grams, prefixes = self._keys(doc[3])
+        for key, postings in ((grams, self._grams), (prefixes, self._prefixes)):
+            for value in key:
+                ids = postings.get(value)
+                if ids is not None:
+                    ids.discard(id_articulo)
+                    if not ids:
+                        del postings[value]
+
+    def upsert(self, id_articulo, nombre, num_catalogo):
+        """Agrega o reemplaza un artículo en el índice."""
+        with self._lock:
+            self._remove(id_articulo)
+            self._add(id_articulo, nombre, num_catalogo)
+
+    def remove(self, id_articulo):
+        """Quita un artículo del índice, si está."""
+        with self._lock:
+            self._remove(id_articulo)
+
+    # --- Búsqueda ------------------------------------------------------------
+
+    def _candidates(self, words):
+        candidates = None
+        for word in words:
+            if len(word) <= SHORT_PREFIX_LENGTH:
+                ids = self._prefixes.get(word, set())
+            else:
+                postings = sorted(
+                    (self._grams.get(gram, set()) for gram in _trigrams(word)), key=len
+                )
+                ids = set.intersection(*postings) if postings[0] else set()
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return set()
+        return candidates
+
+    def _rank(self, id_articulo, query, words):
+        nombre_norm, num_norm, text, doc_words = self._docs[id_articulo]
+        for word in words:
+            # Las palabras cortas ya se verificaron con el índice de prefijos.
+            if len(word) > SHORT_PREFIX_LENGTH and word not in text:
+                return None
+        if query in (nombre_norm, num_norm):
+            return _RANK_EXACT
+        if nombre_norm.startswith(query) or (num_norm and num_norm.startswith(query)):
+            return _RANK_PREFIX
+        if all(any(w.startswith(word) for w in doc_words) for word in words):
+            return _RANK_WORD_PREFIX
+        return _RANK_SUBSTRING
+
+    def _fuzzy(self, words):
+        grams = set()
+        for word in words:
+            grams |= _padded_trigrams(word)
+        if not grams:
+            return {}
+        hits = Counter()
+        for gram in grams:
+            hits.update(self._grams.get(gram, ()))
+        min_hits = max(1, int(len(grams) * FUZZY_MIN_OVERLAP + 0.5))
+        return {
+            id_articulo: _RANK_FUZZY + 1 - count / len(grams)
+            for id_articulo, count in hits.items()
+            if count >= min_hits
+        }
+
+    def search(self, query, limit=20, fuzzy=False):
+        """
+        Devuelve los ids de los artículos que mejor coinciden con la consulta.
+
+        Cada palabra de la consulta debe aparecer en el nombre o en el número
+        de catálogo (las palabras de 1-2 caracteres, como prefijo de alguna
+        palabra). Con la consulta vacía se devuelven los primeros por nombre.
+
+        Args:
+            query (str): Texto buscado.
+            limit (int | None): Máximo de resultados; None para todos.
+            fuzzy (bool): Si ninguno coincide, devolver los más parecidos.
+
+        Returns:
+            list[int]: Ids ordenados por relevancia, longitud y nombre.
+        """
+        query = normalize_text(query)
+        words = query.split()
+        with self._lock:
+            if not words:
+                ranked = {id_articulo: _RANK_SUBSTRING for id_articulo in self._docs}
+            else:
+                ranked = {}
+                for id_articulo in self._candidates(words):
+                    rank = self._rank(id_articulo, query, words)
+                    if rank is not None:
+                        ranked[id_articulo] = rank
+                if not ranked and fuzzy:
+                    ranked = self._fuzzy(words)
+
+            def sort_key(id_articulo):
+                nombre_norm = self._docs[id_articulo][0]
+                return (ranked[id_articulo], len(nombre_norm), nombre_norm, id_articulo)
+
+            if limit is None:
+                return sorted(ranked, key=sort_key)
+            return heapq.nsmallest(limit, ranked, key=sort_key)
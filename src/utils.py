@@ -4,13 +4,17 @@ utils.py - Utilidades de configuración y conexión a base de datos
 Contiene la configuración de conexión a MySQL, la creación del engine
 de SQLAlchemy, y constantes compartidas (categorías, unidades de medida).
 """
+import contextvars
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Callable
 import streamlit as st
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from classes import CatEnum, TipoEnum, UbicacionEnum, AlmacenEnum
+from cache import get_data_version
 from typing import Callable, Optional
 
 # =============================================================================
@@ -21,32 +25,207 @@ CATEGORIAS= [e.value for e in CatEnum]
 UNIDAD_DE_MEDIDA = ['pza', 'm', 'lt', 'kg', 'tramo', 'juego']
 UBICACIONES = [e.value for e in UbicacionEnum]
 ALMACENES = [e.value for e in AlmacenEnum]
+TIPOS = [e.value for e in TipoEnum]
+MAX_LISTED_ITEMS = 50 # Más ítems se muestran como tabla en los diálogos de confirmación
 
 # =============================================================================
 # CONEXIÓN A BASE DE DATOS
 # =============================================================================
 
-db_user = st.secrets["mysql_local"]["user"]
-db_password = st.secrets["mysql_local"]["password"]
-db_host = st.secrets["mysql_local"]["host"]
-db_name = st.secrets["mysql_local"]["database"]
+# Valores por defecto del pool; pueden sobrescribirse en [mysql_local]
+# dentro de secrets.toml (pool_size, max_overflow, pool_recycle, pool_pre_ping).
+DEFAULT_POOL_SETTINGS = {
+    "pool_size": 5,
+    "max_overflow": 10,
+    "pool_recycle": 1800,
+    "pool_pre_ping": True,
+}
 
+_engine = None
+_session_factory = None
+_engine_lock = threading.RLock()
 
 
-def get_session():
+def _read_pool_settings(db_config):
     """
-    Crea y devuelve una nueva sesión de SQLAlchemy.
+    Combina la configuración del pool definida en secrets con los valores por defecto.
+
+    Args:
+        db_config (Mapping): Sección [mysql_local] de secrets.toml.
+
+    Returns:
+        dict: Argumentos de pool para create_engine.
+    """
+    settings = dict(DEFAULT_POOL_SETTINGS)
+    for key, default in DEFAULT_POOL_SETTINGS.items():
+        if key in db_config:
+            settings[key] = type(default)(db_config[key])
+    return settings
+
+
+def init_engine(url=None, **engine_kwargs):
+    """
+    Crea (o reemplaza) el engine compartido del proceso.
+
+    Sin argumentos usa la conexión MySQL de secrets.toml, o su clave `url` si
+    está definida (p. ej. un fixture SQLite generado con db_admin.py
+    load-dump); los scripts de administración pueden pasar otra URL.
+
+    Args:
+        url (str | None): URL de SQLAlchemy. None para usar [mysql_local].
+        **engine_kwargs: Argumentos extra para create_engine.
+
+    Returns:
+        sqlalchemy.engine.Engine: Engine creado.
+    """
+    global _engine, _session_factory
+    with _engine_lock:
+        if url is None:
+            db_config = st.secrets["mysql_local"]
+            url = db_config.get("url") or (
+                f"mysql+mysqlconnector://{db_config['user']}:{db_config['password']}"
+                f"@{db_config['host']}/{db_config['database']}"
+            )
+            engine_kwargs = {**_read_pool_settings(db_config), **engine_kwargs}
+        if url.startswith("sqlite"):
+            # Streamlit atiende cada sesión en su propio hilo.
+            engine_kwargs.setdefault("connect_args", {"check_same_thread": False})
+        engine = create_engine(url, **engine_kwargs)
+        _session_factory = sessionmaker(bind=engine)
+        _engine = engine
+    return engine
+
+
+def get_engine():
+    """
+    Devuelve el engine de SQLAlchemy del proceso, creándolo la primera vez.
+
+    El engine (y su pool de conexiones) se comparte entre todas las sesiones
+    y hilos del proceso, evitando un handshake con MySQL por cada consulta.
+
+    Returns:
+        sqlalchemy.engine.Engine: Engine compartido.
+    """
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                init_engine()
+    return _engine
+
+
+class _RequestScopedSession:
+    """
+    Envoltura de la sesión compartida de un rerun.
+
+    Delega todo a la sesión real excepto close(), para que las funciones de
+    data.py puedan seguir cerrando "su" sesión sin terminar la del rerun.
+    """
+
+    __slots__ = ("_session",)
+
+    def __init__(self, session):
+        self._session = session
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    def close(self):
+        pass
+
+
+_request_session = contextvars.ContextVar("request_session", default=None)
+# Versión de datos leída antes de que la sesión del rerun tomara su snapshot.
+_request_data_version = contextvars.ContextVar("request_data_version", default=None)
+
+
+def _read_data_version():
+    try:
+        return get_data_version()
+    except Exception as e:
+        print(f"Error al leer la versión de datos: {e}")
+        return None
+
+
+@contextmanager
+def request_session():
+    """
+    Abre una sesión compartida por todas las lecturas de un rerun de Streamlit.
+
+    Mientras el contexto está activo, get_session() devuelve esta misma sesión,
+    de modo que una página usa una sola conexión del pool y lee un único
+    snapshot transaccional. Los contextos anidados reutilizan la sesión externa.
+
+    Yields:
+        sqlalchemy.orm.Session: Sesión compartida del rerun.
+    """
+    current = _request_session.get()
+    if current is not None:
+        yield current
+        return
+
+    get_engine()
+    session = _session_factory()
+    token = _request_session.set(session)
+    version_token = _request_data_version.set(_read_data_version())
+    try:
+        yield session
+    finally:
+        _request_data_version.reset(version_token)
+        _request_session.reset(token)
+        session.close()
+
+
+def refresh_request_session():
+    """
+    Termina el snapshot de la sesión compartida tras una escritura confirmada,
+    para que las lecturas posteriores del mismo rerun vean los datos nuevos.
+    """
+    session = _request_session.get()
+    if session is not None:
+        session.rollback()
+        _request_data_version.set(_read_data_version())
+
+
+def get_session(shared=True):
+    """
+    Devuelve una sesión de SQLAlchemy sobre el engine compartido.
+
+    Args:
+        shared (bool): Si True y hay un request_session() activo, devuelve la
+            sesión del rerun. Las escrituras usan False para tener su propia
+            transacción.
 
     Returns:
         sqlalchemy.orm.Session: Sesión activa.
     """
-    engine = create_engine(
-        f"mysql+mysqlconnector://{db_user}:{db_password}@{db_host}/{db_name}",
-        pool_pre_ping=True
-    )
+    current = _request_session.get() if shared else None
+    if current is not None:
+        return _RequestScopedSession(current)
+
+    get_engine()
+    return _session_factory()
 
-    Session = sessionmaker(bind=engine)
-    return Session()
+
+def get_cached_read_session():
+    """
+    Devuelve la sesión para una lectura cacheada con cache.versioned_cache.
+
+    El resultado se guarda bajo la versión de datos vigente, así que solo
+    puede leerse con la sesión del rerun si su snapshot no es anterior a esa
+    versión: la versión del rerun se lee antes de que su sesión consulte
+    nada, y una escritura confirma antes de incrementar la versión. Si la
+    versión no ha cambiado desde entonces, toda escritura que la sesión no
+    ve todavía invalidará esta entrada al incrementar la versión; si cambió,
+    se abre una sesión propia.
+
+    Returns:
+        sqlalchemy.orm.Session: Sesión del rerun o una sesión nueva.
+    """
+    current = _request_session.get()
+    version = _request_data_version.get()
+    if current is not None and version is not None and version == _read_data_version():
+        return _RequestScopedSession(current)
+    return get_session(shared=False)
 
 
 def check_movement_db(
@@ -123,7 +302,12 @@ def check_movement_db(
     def _display_confirmation_dialog():
         st.write("Revisa los ítems que se registrarán:")
 
-        if movement_items:
+        if len(movement_items) > MAX_LISTED_ITEMS:
+            st.dataframe(
+                {"Ítem": [formatter(item, idx) for idx, item in enumerate(movement_items, start=1)]},
+                hide_index=True,
+            )
+        elif movement_items:
             for idx, item in enumerate(movement_items, start=1):
                 st.write(formatter(item, idx))
         else:
@@ -221,6 +405,54 @@ def render_responsable_input(label, state_key, input_key):
     return st.session_state[state_key]
 
 
+ARTICLE_SEARCH_LIMIT = 20
+
+
+def render_article_search(
+    search_fn: Callable,
+    select_label,
+    select_key,
+    fixed_options=(),
+    limit=ARTICLE_SEARCH_LIMIT,
+):
+    """
+    Renderiza un buscador de artículos con sus mejores coincidencias en un selectbox.
+
+    Solo se envían al navegador los primeros `limit` resultados de la búsqueda,
+    no el catálogo completo.
+
+    Args:
+        search_fn (Callable): Función (query, limit, fuzzy) -> list[ArticuloRow];
+            se llama con fuzzy=True para tolerar errores de escritura.
+        select_label (str): Etiqueta del selectbox.
+        select_key (str): Key del widget selectbox; el buscador usa f"{select_key}_query".
+        fixed_options (Sequence[str]): Opciones que siempre aparecen primero
+            (p. ej. "Otro (escribir nuevo)").
+        limit (int): Máximo de artículos a mostrar.
+
+    Returns:
+        str | None: Opción seleccionada.
+    """
+    query = st.text_input(
+        "Buscar artículo (nombre o núm. catálogo)",
+        key=f"{select_key}_query",
+        placeholder="Escribe para filtrar...",
+    )
+    resultados = search_fn(query, limit, fuzzy=True)
+    etiquetas = {
+        row.nombre: f"{row.nombre} ({row.num_catalogo})" if row.num_catalogo else row.nombre
+        for row in resultados
+    }
+    if query.strip() and not resultados:
+        st.caption("Sin coincidencias.")
+    return st.selectbox(
+        select_label,
+        list(fixed_options) + list(etiquetas),
+        key=select_key,
+        format_func=lambda nombre: etiquetas.get(nombre, nombre),
+    )
+
+
 def display_recent_movements_table(movements, proyectos_info):
     """
     Muestra una lista de movimientos recientes en formato homogéneo.
@@ -257,6 +489,103 @@ def display_recent_movements_table(movements, proyectos_info):
         st.write("No hay movimientos registrados.")
 
 
+MOVEMENT_HISTORY_PAGE_SIZE = 10
+
+
+def _push_history_cursor(key, next_cursor):
+    st.session_state[f"{key}_cursores"].append(next_cursor)
+
+
+def _pop_history_cursor(key):
+    if len(st.session_state[f"{key}_cursores"]) > 1:
+        st.session_state[f"{key}_cursores"].pop()
+
+
+def render_movement_history(tipo, proyectos_info, history_fn, search_fn, key, page_size=MOVEMENT_HISTORY_PAGE_SIZE):
+    """
+    Renderiza el historial paginado de movimientos con filtros.
+
+    La página visible se identifica con una pila de cursores en
+    session_state (f"{key}_cursores"); cambiar un filtro regresa a la
+    primera página.
+
+    Args:
+        tipo (str): Tipo de movimiento ('entrada' o 'salida').
+        proyectos_info (dict): {id_proyecto: (nombre_obra, c_c)}.
+        history_fn (Callable): data.get_movement_history.
+        search_fn (Callable): Función (query, limit, fuzzy) -> list[ArticuloRow];
+            se llama con fuzzy=True para tolerar errores de escritura.
+        key (str): Prefijo de las keys de widgets y de session_state.
+        page_size (int): Movimientos por página.
+    """
+    if f"{key}_cursores" not in st.session_state:
+        st.session_state[f"{key}_cursores"] = [None]
+
+    col_f1, col_f2, col_f3 = st.columns(3)
+    with col_f1:
+        id_proyecto = st.selectbox(
+            "Proyecto",
+            options=[None] + list(proyectos_info),
+            format_func=lambda pid: "Todos" if pid is None else f"{proyectos_info[pid][1]} - {proyectos_info[pid][0]}",
+            key=f"{key}_proyecto",
+        )
+    with col_f2:
+        responsable = st.text_input("Responsable", key=f"{key}_responsable")
+    with col_f3:
+        query = st.text_input(
+            "Artículo (nombre o núm. catálogo)",
+            key=f"{key}_articulo_query",
+            placeholder="Escribe para filtrar...",
+        )
+    id_articulo = None
+    if query.strip():
+        resultados = search_fn(query, ARTICLE_SEARCH_LIMIT, fuzzy=True)
+        if resultados:
+            etiquetas = {row.id_articulo: row.nombre for row in resultados}
+            id_articulo = st.selectbox(
+                "Artículo",
+                options=list(etiquetas),
+                format_func=etiquetas.get,
+                key=f"{key}_articulo",
+            )
+        else:
+            st.caption("Sin coincidencias.")
+
+    filtros = {
+        "id_proyecto": id_proyecto,
+        "responsable": responsable.strip() or None,
+        "id_articulo": id_articulo,
+    }
+    if st.session_state.get(f"{key}_filtros") != filtros:
+        st.session_state[f"{key}_filtros"] = filtros
+        st.session_state[f"{key}_cursores"] = [None]
+
+    cursores = st.session_state[f"{key}_cursores"]
+    page = history_fn(tipo, filters=filtros, cursor=cursores[-1], page_size=page_size)
+
+    col_p1, col_p2, col_p3 = st.columns([1, 1, 2])
+    with col_p1:
+        st.button(
+            "⬅️ Anterior",
+            key=f"{key}_anterior",
+            disabled=len(cursores) == 1,
+            on_click=_pop_history_cursor,
+            args=(key,),
+        )
+    with col_p2:
+        st.button(
+            "Siguiente ➡️",
+            key=f"{key}_siguiente",
+            disabled=page["next_cursor"] is None,
+            on_click=_push_history_cursor,
+            args=(key, page["next_cursor"]),
+        )
+    with col_p3:
+        st.caption(f"Página {len(cursores)}")
+
+    display_recent_movements_table(page["movements"], proyectos_info)
+
+
 def handle_movement_submission(
     result,
     db_writer,
@@ -0,0 +1,39 @@
+"""
+Configuración de pytest: las pruebas corren sobre una base SQLite temporal.
+
+SQLite se abre en modo WAL con BEGIN explícito, de modo que cada transacción
+lee un snapshot fijo, igual que REPEATABLE READ en MySQL.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import cache  # noqa: E402
+import data  # noqa: E402
+import utils  # noqa: E402
+from classes import Base  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = utils.init_engine(f"sqlite:///{tmp_path / 'almacen.db'}")
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        dbapi_connection.execute("PRAGMA journal_mode=WAL")
+
+    @event.listens_for(engine, "begin")
+    def _begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+    Base.metadata.create_all(engine)
+    cache.set_cache_backend(cache.LRUCacheBackend())
+    data._catalog = None
+    yield engine
+    data._catalog = None
+    engine.dispose()
@@ -0,0 +1,78 @@
+import pytest
+from sqlalchemy import event, insert
+from sqlalchemy.dialects import mysql
+from sqlalchemy.schema import CreateTable
+
+import data
+import utils
+from classes import Articulos
+
+ARTICULOS = [
+    (1, "Cemento para albañilería", "CEM-50"),
+    (2, "Cal para ALBANILERIA", "CAL-25"),
+    (3, "Arena fina", "ALBA-3"),
+    (4, "Tubo conduit", "TC-1"),
+    (5, "Cinta aislante", "CA-9"),
+]
+
+
+@pytest.fixture
+def articulos(db):
+    session = utils.get_session(shared=False)
+    session.add_all(
+        Articulos(id_articulo=i, nombre=nombre, num_catalogo=num, cantidad_en_stock=1)
+        for i, nombre, num in ARTICULOS
+    )
+    session.commit()
+    session.close()
+    data.clear_cached_reference_data()
+
+
+def _page(nombre, **kwargs):
+    page = data.get_articulos_page({"nombre": nombre}, **kwargs)
+    return page["total"], page["frame"]["id"].tolist()
+
+
+@pytest.mark.parametrize("limit", [data.SEARCH_IN_LIST_LIMIT, 1])
+def test_search_filter_keeps_accent_and_catalog_matching(articulos, monkeypatch, limit):
+    # Con limit=1 la búsqueda toma el camino de la tabla temporal de ids.
+    monkeypatch.setattr(data, "SEARCH_IN_LIST_LIMIT", limit)
+
+    assert _page("albañil") == (2, [2, 1])
+    assert _page("ALBANIL") == (2, [2, 1])
+    assert _page("alba", page_size=2) == (3, [3, 2])
+    assert _page("cinta") == (1, [5])
+
+
+def test_search_ids_table_is_dropped_after_each_page(articulos, monkeypatch):
+    monkeypatch.setattr(data, "SEARCH_IN_LIST_LIMIT", 1)
+
+    for page_size in (1, 2, 3):
+        total, ids = _page("alba", page_size=page_size)
+        assert total == 3
+        assert len(ids) == page_size
+
+
+def test_search_ids_table_left_on_a_pooled_connection_is_reused_empty(articulos, db, monkeypatch):
+    monkeypatch.setattr(data, "SEARCH_IN_LIST_LIMIT", 1)
+    statements = []
+
+    @event.listens_for(db, "before_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(" ".join(statement.split()))
+
+    # Tabla que quedó en la conexión del pool con un id que no coincide.
+    with db.connect() as connection:
+        connection.execute(CreateTable(data._SEARCH_IDS))
+        connection.execute(insert(data._SEARCH_IDS), [{"id_articulo": 4}])
+        connection.commit()
+
+    assert _page("alba") == (3, [3, 2, 1])
+    assert any(s.startswith("CREATE TEMPORARY TABLE IF NOT EXISTS tmp_busqueda_articulos") for s in statements)
+    assert "DROP TABLE IF EXISTS tmp_busqueda_articulos" in statements
+
+
+def test_search_ids_ddl_on_mysql_stays_temporary():
+    create = CreateTable(data._SEARCH_IDS, if_not_exists=True).compile(dialect=mysql.dialect())
+
+    assert str(create).strip().startswith("CREATE TEMPORARY TABLE IF NOT EXISTS tmp_busqueda_articulos")
@@ -0,0 +1,25 @@
+import threading
+
+import data
+import utils
+
+
+def _in_other_thread(fn, *args):
+    # Otro hilo no hereda la sesión del rerun: simula a otro usuario.
+    thread = threading.Thread(target=fn, args=args)
+    thread.start()
+    thread.join()
+
+
+def test_cached_read_after_concurrent_write_sees_the_write(db):
+    data.add_proyecto(1, "Obra 1", "Ana")
+
+    with utils.request_session():
+        # Abre el snapshot de la sesión del rerun.
+        assert data.get_all_cc() == [1]
+        _in_other_thread(data.add_proyecto, 2, "Obra 2", "Luis")
+        obras = {obra for obra, c_c in data.get_proyectos_info().values()}
+
+    assert obras == {"Obra 1", "Obra 2"}
+    # Lo que quedó en caché para la versión vigente también incluye la escritura.
+    assert {obra for obra, c_c in data.get_proyectos_info().values()} == {"Obra 1", "Obra 2"}
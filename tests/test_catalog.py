@@ -0,0 +1,79 @@
+import threading
+
+from sqlalchemy import event
+
+import data
+import utils
+from classes import Articulos, Proyectos
+
+
+def _set_stock(id_articulo, cantidad):
+    session = utils.get_session(shared=False)
+    try:
+        session.get(Articulos, id_articulo).cantidad_en_stock = cantidad
+        session.commit()
+    finally:
+        session.close()
+    data.clear_cached_reference_data()
+
+
+def test_catalog_rebuilt_in_a_rerun_sees_writes_from_other_users(db):
+    session = utils.get_session(shared=False)
+    session.add(Articulos(id_articulo=1, nombre="Tubo", num_catalogo="T-1", cantidad_en_stock=5))
+    session.commit()
+    session.close()
+    data.clear_cached_reference_data()
+
+    with utils.request_session():
+        # Abre el snapshot de la sesión del rerun.
+        assert data.get_all_cc() == []
+        thread = threading.Thread(target=_set_stock, args=(1, 3))
+        thread.start()
+        thread.join()
+        assert data.get_article_by_id(1).cantidad_en_stock == 3
+
+    assert data.get_article_by_id(1).cantidad_en_stock == 3
+
+
+
+def _add_proyecto(id_proyecto, c_c):
+    session = utils.get_session(shared=False)
+    session.add(Proyectos(id_proyecto=id_proyecto, c_c=c_c, nombre_obra=f"Obra {c_c}", encargado="E"))
+    session.commit()
+    session.close()
+    data.clear_cached_reference_data()
+
+
+def test_cached_reads_in_a_rerun_share_one_connection(db):
+    _add_proyecto(1, 100)
+    checkouts = []
+
+    def _checkout(*args):
+        checkouts.append(args)
+
+    event.listen(db, "checkout", _checkout)
+    try:
+        with utils.request_session():
+            data.get_proyectos_info()
+            data.get_all_cc()
+            data.get_cable_names()
+            data.search_articulos("tubo")
+    finally:
+        event.remove(db, "checkout", _checkout)
+
+    assert len(checkouts) == 1
+
+
+def test_cached_reads_after_another_users_write_use_a_fresh_session(db):
+    _add_proyecto(1, 100)
+
+    with utils.request_session():
+        # Abre el snapshot de la sesión del rerun.
+        assert data.get_all_cc() == [100]
+        thread = threading.Thread(target=_add_proyecto, args=(2, 200))
+        thread.start()
+        thread.join()
+        # La lectura sin caché sigue en el snapshot del rerun; la cacheada,
+        # con la versión nueva, no puede guardar ese snapshot.
+        assert data.get_all_cc() == [100]
+        assert sorted(c_c for _, c_c in data.get_proyectos_info().values()) == [100, 200]
@@ -0,0 +1,127 @@
+from io import BytesIO
+
+import pytest
+from openpyxl import Workbook
+
+import data
+import utils
+from classes import Articulos, StockPuntas
+from importacion import parse_packing_list
+
+
+@pytest.fixture
+def catalog(db):
+    session = utils.get_session(shared=False)
+    session.add_all([
+        Articulos(id_articulo=1, nombre="Cemento para albañilería", num_catalogo="CEM-50",
+                  cantidad_en_stock=10, unidad_medida="pza", es_cable=False),
+        Articulos(id_articulo=2, nombre="Cable UTP", num_catalogo="UTP-6",
+                  cantidad_en_stock=0, unidad_medida="m", es_cable=True),
+    ])
+    session.commit()
+    session.close()
+    data.clear_cached_reference_data()
+    return data.get_article_catalog()
+
+
+def _csv(text):
+    return BytesIO(("﻿" + text).encode("utf-8"))
+
+
+def test_csv_rows_resolve_existing_articles_and_create_new_ones_once(catalog):
+    archivo = _csv(
+        "Descripción;Cant;Código;Cable;Punta;Metros\n"
+        "CEMENTO PARA ALBANILERIA;3;;;;\n"
+        "Otro nombre;2;CEM-50;;;\n"
+        "Cable UTP;;;;Carrete 1;305\n"
+        "Tubo conduit;5;TC-1;;;\n"
+        "tubo conduit;4;;;;\n"
+        "Cable nuevo;;;si;Tramo A;20,5\n"
+        ";;;;;\n"
+    )
+
+    result = parse_packing_list(archivo, "lista.csv", catalog)
+
+    assert result.errors == []
+    assert (result.nuevos, result.existentes) == (2, 3)
+    nombres = [item["nombre_item"] for item in result.items]
+    assert nombres == [
+        "Cemento para albañilería", "Cemento para albañilería", "Cable UTP",
+        "Tubo conduit", "Tubo conduit", "Cable nuevo",
+    ]
+    assert [item["is_new"] for item in result.items] == [False, False, False, True, False, True]
+    assert result.items[2]["longitud"] == 305.0 and result.items[2]["nombre_punta"] == "Carrete 1"
+    assert result.items[3]["num_catalogo"] == "TC-1" and result.items[3]["unidad_medida"] == "pza"
+    assert result.items[5]["longitud"] == 20.5 and result.items[5]["unidad_medida"] == "m"
+
+
+def test_xlsx_rows_are_read_like_csv(catalog):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Nombre", "Cantidad", "Tipo", "Precio"])
+    sheet.append(["Cemento para albañilería", 2, None, None])
+    sheet.append(["Guantes", 6, "Herramienta", 12.5])
+    archivo = BytesIO()
+    workbook.save(archivo)
+    archivo.seek(0)
+
+    result = parse_packing_list(archivo, "lista.xlsx", catalog)
+
+    assert result.errors == []
+    assert [item["cantidad"] for item in result.items] == [2, 6]
+    assert result.items[1]["tipo"] == "herramienta"
+    assert result.items[1]["precio_unitario"] == 12.5
+
+
+def test_invalid_rows_are_reported_by_row_number(catalog):
+    archivo = _csv(
+        "nombre,cantidad,tipo\n"
+        "Cemento para albañilería,0,\n"
+        "Guantes,muchos,\n"
+        "Casco,1,vehiculo\n"
+        ",3,\n"
+        "Cable UTP,,\n"
+    )
+
+    result = parse_packing_list(archivo, "lista.csv", catalog)
+
+    assert result.items == []
+    assert result.errors == [
+        "Fila 2: la cantidad debe ser mayor a 0.",
+        "Fila 3: 'cantidad' no es un número (muchos).",
+        "Fila 3: la cantidad debe ser mayor a 0.",
+        "Fila 4: tipo 'vehiculo' no es válido.",
+        "Fila 5: falta el nombre del artículo.",
+        "Fila 6: la longitud del cable debe ser mayor a 0.",
+        "Fila 6: falta el nombre de la punta/carrete/tramo.",
+    ]
+
+
+def test_unsupported_files_and_missing_name_column_are_rejected(catalog):
+    with pytest.raises(ValueError, match="Formato no soportado"):
+        parse_packing_list(BytesIO(b""), "lista.pdf", catalog)
+    with pytest.raises(ValueError, match="columna 'nombre'"):
+        parse_packing_list(_csv("codigo,cantidad\nCEM-50,1\n"), "lista.csv", catalog)
+
+
+def test_imported_items_register_as_one_entry(catalog):
+    archivo = _csv(
+        "nombre,cantidad,punta,metros\n"
+        "Cemento para albañilería,3,,\n"
+        "Cable UTP,,Carrete 1,305\n"
+        "Cable UTP,,Carrete 2,100\n"
+        "Tubo conduit,5,,\n"
+        "Tubo conduit,4,,\n"
+    )
+    result = parse_packing_list(archivo, "lista.csv", catalog)
+
+    assert data.add_movement_to_db(result.items, None, "Responsable")
+
+    session = utils.get_session(shared=False)
+    try:
+        stock = dict(session.query(Articulos.nombre, Articulos.cantidad_en_stock))
+        puntas = session.query(StockPuntas.id_articulo).filter(StockPuntas.id_articulo == 2).count()
+    finally:
+        session.close()
+    assert stock == {"Cemento para albañilería": 13, "Cable UTP": 405, "Tubo conduit": 9}
+    assert puntas == 2
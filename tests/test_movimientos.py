@@ -0,0 +1,163 @@
+import threading
+
+import pytest
+from sqlalchemy import event
+
+import data
+import utils
+from classes import Articulos, DetalleMovimiento, Movimientos, StockPuntas
+
+
+def _new_item(nombre, es_cable=False, nombre_punta=None, longitud=None):
+    return {
+        "is_new": True,
+        "nombre_item": nombre,
+        "num_catalogo": f"CAT-{nombre}",
+        "tipo": "material",
+        "precio_unitario": 10.0,
+        "unidad_medida": "m" if es_cable else "pza",
+        "categoria": "cable" if es_cable else "componente",
+        "stock_minimo": 1,
+        "es_cable": es_cable,
+        "nombre_punta": nombre_punta,
+        "longitud": longitud,
+        "cantidad": 4,
+    }
+
+
+def _count_inserts(engine):
+    inserts = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("INSERT INTO"):
+            inserts.append(statement.split()[2].strip('"'))
+
+    return inserts
+
+
+# =============================================================================
+# ENTRADAS
+# =============================================================================
+
+def test_entry_inserts_new_articles_and_tips_with_one_statement_per_chunk(db):
+    items = [_new_item(f"Articulo {i}") for i in range(5)]
+    items += [_new_item(f"Cable {i}", es_cable=True, nombre_punta=f"P{i}", longitud=30.0) for i in range(3)]
+    inserts = _count_inserts(db)
+
+    assert data.add_movement_to_db(items, None, "Responsable")
+
+    assert inserts.count("articulos") == 1
+    assert inserts.count("stock_puntas") == 1
+    assert inserts.count("detalle_movimientos") == 1
+
+    session = utils.get_session(shared=False)
+    try:
+        articulos = {a.nombre: a for a in session.query(Articulos)}
+        puntas = {p.nombre_punta: p for p in session.query(StockPuntas)}
+        detalles = session.query(DetalleMovimiento).all()
+    finally:
+        session.close()
+    assert len(articulos) == 8
+    assert articulos["Articulo 3"].cantidad_en_stock == 4
+    assert puntas["P2"].id_articulo == articulos["Cable 2"].id_articulo
+    assert puntas["P2"].disponible
+    # Cada detalle apunta al artículo y a la punta que le corresponden.
+    by_articulo = {d.id_articulo: d for d in detalles}
+    assert by_articulo[articulos["Cable 1"].id_articulo].id_punta == puntas["P1"].id_punta
+    assert by_articulo[articulos["Articulo 0"].id_articulo].id_punta is None
+
+
+def test_entry_without_returning_checks_the_ids_it_derives(db, monkeypatch):
+    # Sin RETURNING se usa el id que devuelve el INSERT como el de la primera
+    # fila (MySQL). SQLite devuelve el de la última, así que la verificación
+    # debe detectar que los ids no corresponden y no registrar nada.
+    monkeypatch.setattr(db.dialect, "insert_returning", False)
+    inserts = _count_inserts(db)
+
+    with pytest.raises(RuntimeError, match="no son consecutivos"):
+        data.add_movement_to_db([_new_item(f"Articulo {i}") for i in range(3)], None, "Responsable")
+
+    assert inserts.count("articulos") == 1
+    session = utils.get_session(shared=False)
+    try:
+        assert session.query(Articulos).count() == 0
+    finally:
+        session.close()
+
+
+# =============================================================================
+# SALIDAS
+# =============================================================================
+
+def _stock(id_articulo):
+    session = utils.get_session(shared=False)
+    try:
+        return session.get(Articulos, id_articulo).cantidad_en_stock
+    finally:
+        session.close()
+
+
+def _movements(tipo):
+    session = utils.get_session(shared=False)
+    try:
+        return session.query(Movimientos).filter(Movimientos.tipo == tipo).count()
+    finally:
+        session.close()
+
+
+def _salida_item(id_articulo, cantidad, nombre="Tubo"):
+    return {"id_articulo": id_articulo, "nombre_item": nombre, "es_cable": False, "cantidad": cantidad, "id_punta": None}
+
+
+@pytest.fixture
+def tubo(db):
+    data.add_movement_to_db([_new_item("Tubo")], None, "Responsable")
+    return data.get_article_by_name("Tubo").id_articulo
+
+
+def test_salida_decrements_stock_with_a_conditional_update(db, tubo):
+    statements = []
+
+    @event.listens_for(db, "before_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(" ".join(statement.split()))
+
+    assert data.add_salida_to_db([_salida_item(tubo, 3), _salida_item(tubo, 1)], None, "R")
+
+    assert _stock(tubo) == 0
+    decrements = [s for s in statements if s.startswith("UPDATE articulos")]
+    # Un solo UPDATE por artículo, con la condición de stock en el WHERE.
+    assert len(decrements) == 1
+    assert "articulos.cantidad_en_stock >= ?" in decrements[0]
+    assert not any("FOR UPDATE" in s for s in statements)
+
+
+def test_salida_over_stock_raises_and_writes_nothing(db, tubo):
+    with pytest.raises(data.StockInsuficienteError) as excinfo:
+        data.add_salida_to_db([_salida_item(tubo, 5)], None, "R")
+
+    assert excinfo.value.nombre_item == "Tubo"
+    assert excinfo.value.cantidad == 5
+    assert _stock(tubo) == 4
+    assert _movements("salida") == 0
+
+
+def test_salida_checks_stock_written_by_another_user(db, tubo):
+    # El catálogo en memoria todavía dice 4; la condición se evalúa en la base.
+    assert data.get_article_by_id(tubo).cantidad_en_stock == 4
+    thread = threading.Thread(target=data.add_salida_to_db, args=([_salida_item(tubo, 3)], None, "Otro"))
+    thread.start()
+    thread.join()
+
+    with pytest.raises(data.StockInsuficienteError):
+        data.add_salida_to_db([_salida_item(tubo, 2)], None, "R")
+    assert _stock(tubo) == 1
+
+
+def test_salida_of_a_missing_article_is_not_reported_as_low_stock(db):
+    with pytest.raises(ValueError) as excinfo:
+        data.add_salida_to_db([_salida_item(999, 1, nombre="Fantasma")], None, "R")
+
+    assert not isinstance(excinfo.value, data.StockInsuficienteError)
+    assert "Fantasma" in str(excinfo.value)
@@ -0,0 +1,54 @@
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.sql.visitors import iterate
+
+import data
+import utils
+from classes import Proyectos
+from query_plans import HOT_QUERIES, assert_query_plans_use_indexes
+
+
+def _seed(db):
+    session = utils.get_session(shared=False)
+    session.add(Proyectos(id_proyecto=1, c_c=100, nombre_obra="Obra", encargado="Encargado"))
+    session.commit()
+    session.close()
+    items = [
+        {
+            "is_new": True,
+            "nombre_item": f"Articulo {i}",
+            "tipo": "material",
+            "precio_unitario": 1.0,
+            "unidad_medida": "m" if i % 2 else "pza",
+            "categoria": "cable" if i % 2 else "componente",
+            "stock_minimo": 1,
+            "es_cable": bool(i % 2),
+            "nombre_punta": f"P{i}",
+            "longitud": 10.0,
+            "cantidad": 5,
+        }
+        for i in range(20)
+    ]
+    data.add_movement_to_db(items, 1, "Responsable")
+
+
+def test_hot_queries_use_indexes(db):
+    _seed(db)
+
+    assert_query_plans_use_indexes(HOT_QUERIES)
+
+
+def test_report_filters_are_half_open_ranges_on_fecha_hora(db):
+    filters = data.build_report_filters("2025-01-01", "2025-01-31", 100)
+    compiled = [str(f.compile(db, compile_kwargs={"literal_binds": True})) for f in filters]
+
+    assert compiled[0] == "movimientos.fecha_hora >= '2025-01-01 00:00:00.000000'"
+    assert compiled[1] == "movimientos.fecha_hora < '2025-02-01 00:00:00.000000'"
+    # Ningún predicado envuelve la columna en una función como DATE().
+    assert not any(isinstance(e, FunctionElement) for f in filters for e in iterate(f))
+
+
+def test_report_filters_without_dates_only_filter_the_cost_center(db):
+    filters = data.build_report_filters(cc_selected=[100, 200])
+    compiled = [str(f.compile(db, compile_kwargs={"literal_binds": True})) for f in filters]
+
+    assert compiled == ["proyectos.c_c IN (100, 200)"]
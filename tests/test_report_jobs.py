@@ -0,0 +1,79 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+import report_jobs
+
+
+@pytest.fixture
+def jobs_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(report_jobs, "get_jobs_dir", lambda: tmp_path)
+    return tmp_path
+
+
+def _pending_job(jobs_dir, job_id, pid, host=None):
+    job_dir = jobs_dir / job_id
+    job_dir.mkdir()
+    report_jobs._write_status(job_dir, estado=report_jobs.ESTADO_GENERANDO, procesados=10, total=100)
+    claim = {"pid": pid, "host": host or socket.gethostname()}
+    (job_dir / report_jobs.CLAIM_FILE).write_text(json.dumps(claim), encoding="utf-8")
+    return job_dir
+
+
+def _dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_claim_file_admits_a_single_owner(jobs_dir):
+    job_dir = jobs_dir / "trabajo"
+    job_dir.mkdir()
+
+    assert report_jobs._claim_job(job_dir)
+    assert not report_jobs._claim_job(job_dir)
+    assert json.loads((job_dir / report_jobs.CLAIM_FILE).read_text())["pid"] == os.getpid()
+
+
+def test_job_owned_by_another_live_worker_is_still_pending(jobs_dir):
+    # El padre de pytest hace las veces de otro worker: no está en _futures.
+    _pending_job(jobs_dir, "otro_worker", os.getppid())
+
+    job = report_jobs.get_report_job("otro_worker")
+
+    assert job.estado == report_jobs.ESTADO_GENERANDO
+    assert job.procesados == 10
+
+
+def test_job_whose_owner_died_is_reported_as_interrupted(jobs_dir):
+    job_dir = _pending_job(jobs_dir, "huerfano", _dead_pid())
+
+    assert report_jobs.get_report_job("huerfano").estado == report_jobs.ESTADO_ERROR
+
+    report_jobs._release_dead_claim(job_dir)
+    assert report_jobs._claim_job(job_dir)
+    assert not (job_dir / report_jobs.CLAIM_LOCK_FILE).exists()
+
+
+def test_stale_heartbeat_from_another_host_marks_the_job_dead(jobs_dir):
+    job_dir = _pending_job(jobs_dir, "otro_host", 1, host="otro-servidor")
+    assert report_jobs.get_report_job("otro_host").estado == report_jobs.ESTADO_GENERANDO
+
+    vencido = time.time() - report_jobs.LATIDO_VENCIDO_SEGUNDOS - 1
+    os.utime(job_dir / report_jobs.CLAIM_FILE, (vencido, vencido))
+
+    assert report_jobs.get_report_job("otro_host").estado == report_jobs.ESTADO_ERROR
+
+
+def test_release_keeps_a_live_claim(jobs_dir):
+    job_dir = _pending_job(jobs_dir, "vivo", os.getppid())
+
+    report_jobs._release_dead_claim(job_dir)
+
+    assert (job_dir / report_jobs.CLAIM_FILE).exists()
+    assert not report_jobs._claim_job(job_dir)
@@ -0,0 +1,166 @@
+from datetime import datetime
+from functools import partial
+from io import BytesIO
+
+import pytest
+from openpyxl import load_workbook
+from reportlab.pdfgen.canvas import Canvas
+
+import data
+import reportes
+import utils
+from classes import Articulos, DetalleMovimiento, Movimientos, Proyectos
+from pdf_styles import PDF_COL_WIDTHS
+
+
+def _draw_table(rows):
+    buffer = BytesIO()
+    canvas = Canvas(buffer, pageCompression=0)
+    table = reportes._build_pdf_table(
+        reportes.REPORTE_HEADERS_PDF, rows, PDF_COL_WIDTHS, reportes._get_pdf_styles().reporte
+    )
+    table.wrapOn(canvas, 600, 700)
+    table.drawOn(canvas, 40, 40)
+    canvas.showPage()
+    canvas.save()
+    return buffer.getvalue()
+
+
+def test_report_table_writes_plain_cells_as_encoded_pdf_strings():
+    pdf = _draw_table([["2025-01-01 10:00", "Tubo (1/2\") \\ Grúa ñ", "3", "pza", "$1.00", "$3.00"]])
+
+    assert b"(Fecha/Hora) Tj" in pdf
+    assert b"(Tubo \\(1/2\"\\) \\\\ Gr\\372a \\361) Tj" in pdf
+    assert b"($3.00) Tj" in pdf
+
+
+def test_report_table_falls_back_for_text_outside_the_font_encoding():
+    # "≥" no existe en WinAnsi: la celda se dibuja con Table._drawCell.
+    pdf = _draw_table([["2025-01-01 10:00", "Cable ≥ 2 m", "3", "pza", "$1.00", "$3.00"]])
+
+    assert b"(2025-01-01 10:00) Tj" in pdf
+    assert b"Cable" in pdf
+
+
+def test_pdf_text_cell_only_splits_text_wider_than_the_column():
+    width = PDF_COL_WIDTHS[1]
+
+    assert reportes._pdf_text_cell("Material corto", width) == "Material corto"
+    lines = reportes._pdf_text_cell("Material de prueba CABLE UTP CAT6 305M AZUL EXTERIOR", width).split("\n")
+    assert lines == ["Material de prueba CABLE UTP CAT6", "305M AZUL EXTERIOR"]
+
+
+# =============================================================================
+# REPORTES POR BLOQUES
+# =============================================================================
+
+@pytest.fixture
+def salidas(db):
+    # 25 renglones; dos movimientos comparten fecha_hora para probar los empates del cursor.
+    session = utils.get_session(shared=False)
+    session.add(Proyectos(id_proyecto=1, c_c=100, nombre_obra="Obra", encargado="E"))
+    session.add_all(
+        Articulos(id_articulo=i, nombre=f"Material {i}", cantidad_en_stock=0,
+                  unidad_medida="pza", precio_unitario=1.5)
+        for i in range(1, 11)
+    )
+    fechas = [datetime(2025, 1, 10, 9), datetime(2025, 1, 10, 9), datetime(2025, 1, 12, 17)]
+    for id_movimiento, fecha_hora in enumerate(fechas, 1):
+        session.add(Movimientos(id_movimiento=id_movimiento, id_proyecto=1, tipo="salida", fecha_hora=fecha_hora))
+    session.flush()
+    session.add_all(
+        DetalleMovimiento(id_movimiento=1 + n % 3, id_articulo=1 + n % 10, cantidad=n + 1)
+        for n in range(25)
+    )
+    session.commit()
+    session.close()
+    data.clear_cached_reference_data()
+
+
+def test_iter_report_data_yields_the_same_rows_in_bounded_chunks(db, salidas):
+    expected = data.get_report_data(movement_type="salida")
+    checked_out = []
+
+    chunks = []
+    for chunk in data.iter_report_data(movement_type="salida", chunk_size=4):
+        # Entre bloques no se retiene ninguna conexión del pool.
+        checked_out.append(db.pool.checkedout())
+        chunks.append(chunk)
+
+    assert [len(chunk) for chunk in chunks] == [4, 4, 4, 4, 4, 4, 1]
+    assert [row for chunk in chunks for row in chunk] == expected
+    assert set(checked_out) == {0}
+
+
+def test_streamed_flowables_pull_only_a_few_items_ahead():
+    pulled = []
+
+    def source():
+        for n in range(10):
+            pulled.append(n)
+            yield n
+
+    flowables = reportes._StreamedFlowables(source(), lookahead=2)
+
+    assert len(flowables) == 2 and pulled == [0, 1]
+    del flowables[0]
+    assert flowables[0] == 1 and pulled == [0, 1, 2]
+    while len(flowables):
+        del flowables[0]
+    assert pulled == list(range(10))
+
+
+@pytest.mark.parametrize("formato", ["pdf", "xlsx"])
+def test_render_reporte_streams_chunks_and_reports_progress(db, salidas, monkeypatch, formato):
+    monkeypatch.setattr(reportes, "iter_report_data", partial(data.iter_report_data, chunk_size=10))
+    monkeypatch.setattr(reportes, "PDF_ROWS_PER_TABLE", 8)
+    progress = []
+
+    output = reportes.render_reporte(formato, "salida", on_progress=progress.append)
+
+    assert progress == [10, 20, 25]
+    content = output.getvalue()
+    assert content.startswith(b"%PDF" if formato == "pdf" else b"PK")
+
+
+# =============================================================================
+# EXCEL
+# =============================================================================
+
+def test_excel_report_is_a_formatted_table_with_currency_columns(db, salidas):
+    buffer = reportes.create_reporte_excel(
+        [data.get_report_data(movement_type="salida")], movement_type="salida"
+    )
+
+    worksheet = load_workbook(buffer)["Salidas"]
+    assert [cell.value for cell in worksheet[1]] == reportes.REPORTE_HEADERS_EXCEL
+    assert all(cell.font.bold for cell in worksheet[1])
+    assert worksheet.max_row == 26
+    precio, total = worksheet["F2"], worksheet["G2"]
+    assert precio.number_format == total.number_format == reportes.EXCEL_CURRENCY_FORMAT
+    assert worksheet["D2"].number_format == "General"
+    assert total.value == worksheet["D2"].value * 1.5
+    assert worksheet.column_dimensions["C"].width == reportes.EXCEL_MATERIAL_WIDTH
+
+    table = worksheet.tables["Tabla_Salidas"]
+    assert table.ref == "A1:G26"
+    assert table.autoFilter.ref == "A1:G26"
+    assert [column.name for column in table.tableColumns] == reportes.REPORTE_HEADERS_EXCEL
+
+
+def test_excel_table_name_is_sanitized_and_empty_sheets_have_no_table(tmp_path):
+    path = tmp_path / "tabla.xlsx"
+    written = reportes.write_excel_table(
+        path, "Hoja", ["C.C", "Precio Unit."], [(1, 2.5), (2, 3.0)],
+        currency_headers={"Precio Unit."}, table_name="2025 Comparativo",
+    )
+    worksheet = load_workbook(path)["Hoja"]
+
+    assert written == 2
+    assert list(worksheet.tables) == ["T_2025_Comparativo"]
+    assert worksheet.tables["T_2025_Comparativo"].ref == "A1:B3"
+    assert worksheet["B3"].number_format == reportes.EXCEL_CURRENCY_FORMAT
+
+    empty = tmp_path / "vacia.xlsx"
+    assert reportes.write_excel_table(empty, "Hoja", ["C.C"], []) == 0
+    assert load_workbook(empty)["Hoja"].tables == {}
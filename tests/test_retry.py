@@ -0,0 +1,136 @@
+import sqlite3
+
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+import retry
+import utils
+from retry import classify_retryable_error, get_retry_metrics, retry_transaction
+
+
+class _MySQLError(Exception):
+    def __init__(self, errno):
+        super().__init__(errno, "error de MySQL")
+        self.errno = errno
+
+
+def _db_error(errno, cls=OperationalError, **kwargs):
+    return cls("UPDATE articulos ...", {}, _MySQLError(errno), **kwargs)
+
+
+@pytest.fixture(autouse=True)
+def _no_sleep(db, monkeypatch):
+    delays = []
+    monkeypatch.setattr(retry.time, "sleep", delays.append)
+    return delays
+
+
+@pytest.mark.parametrize("errno, reason", [
+    (1213, "deadlock"),
+    (1205, "lock_wait_timeout"),
+    (2006, "server_gone_away"),
+    (2013, "lost_connection"),
+    (2055, "lost_connection"),
+])
+def test_transient_mysql_errors_are_retryable(errno, reason):
+    assert classify_retryable_error(_db_error(errno)) == reason
+
+
+def test_other_errors_are_not_retryable():
+    assert classify_retryable_error(_db_error(1062, IntegrityError)) is None
+    assert classify_retryable_error(ValueError("Stock insuficiente")) is None
+    assert classify_retryable_error(
+        OperationalError("s", {}, sqlite3.OperationalError("no such table: x"))
+    ) is None
+
+
+def test_invalidated_connections_and_sqlite_locks_are_retryable():
+    assert classify_retryable_error(
+        _db_error(0, connection_invalidated=True)
+    ) == "connection_invalidated"
+    assert classify_retryable_error(
+        OperationalError("s", {}, sqlite3.OperationalError("database is locked"))
+    ) == "sqlite_locked"
+
+
+def test_write_is_retried_until_it_succeeds_with_bounded_backoff(_no_sleep):
+    calls = []
+
+    @retry_transaction(max_attempts=4, base_delay=0.1, max_delay=0.15)
+    def escribir_reintentos():
+        calls.append(1)
+        if len(calls) < 3:
+            raise _db_error(1213)
+        return "ok"
+
+    assert escribir_reintentos() == "ok"
+    assert len(calls) == 3
+    assert len(_no_sleep) == 2
+    assert 0 <= _no_sleep[0] <= 0.1 and 0 <= _no_sleep[1] <= 0.15
+    assert get_retry_metrics()["escribir_reintentos"] == {"deadlock": 2}
+
+
+def test_exhausted_attempts_raise_and_are_counted():
+    calls = []
+
+    @retry_transaction(max_attempts=3)
+    def escribir_agotados():
+        calls.append(1)
+        raise _db_error(1205)
+
+    with pytest.raises(OperationalError):
+        escribir_agotados()
+    assert len(calls) == 3
+    assert get_retry_metrics()["escribir_agotados"] == {"agotados": 1, "lock_wait_timeout": 2}
+
+
+def test_non_transient_errors_are_not_retried():
+    calls = []
+
+    @retry_transaction()
+    def escribir_duplicado():
+        calls.append(1)
+        raise _db_error(1062, IntegrityError)
+
+    with pytest.raises(IntegrityError):
+        escribir_duplicado()
+    assert len(calls) == 1
+
+
+def test_errors_once_commit_started_are_not_retried():
+    calls = []
+
+    @retry_transaction()
+    def escribir_commit():
+        calls.append(1)
+        session = utils.get_session(shared=False)
+        try:
+            session.commit()
+            # Se perdió la conexión durante el COMMIT: no se sabe si quedó confirmado.
+            raise _db_error(2013)
+        finally:
+            session.close()
+
+    with pytest.raises(OperationalError):
+        escribir_commit()
+    assert len(calls) == 1
+
+
+def test_a_previous_commit_does_not_block_retries_of_the_next_write():
+    @retry_transaction()
+    def escribir_ok():
+        session = utils.get_session(shared=False)
+        session.commit()
+        session.close()
+
+    calls = []
+
+    @retry_transaction()
+    def escribir_siguiente():
+        calls.append(1)
+        if len(calls) == 1:
+            raise _db_error(2006)
+
+    escribir_ok()
+    escribir_siguiente()
+    assert len(calls) == 2
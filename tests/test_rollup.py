@@ -0,0 +1,102 @@
+from sqlalchemy import func, inspect, select, text
+
+import data
+import migrations
+import utils
+from classes import Articulos, Proyectos, ResumenMovimientosDiario
+from rollup import rebuild_rollup
+
+
+def _setup(db):
+    session = utils.get_session(shared=False)
+    session.add_all([
+        Proyectos(id_proyecto=1, c_c=100, nombre_obra="Obra A", encargado="E"),
+        Proyectos(id_proyecto=2, c_c=200, nombre_obra="Obra B", encargado="E"),
+        Articulos(id_articulo=1, nombre="Tubo", num_catalogo="T-1", cantidad_en_stock=0,
+                  unidad_medida="pza", es_cable=False, precio_unitario=2.0),
+    ])
+    session.commit()
+    session.close()
+    data.clear_cached_reference_data()
+
+
+def _entrada(id_proyecto, cantidad):
+    item = {"is_new": False, "nombre_item": "Tubo", "es_cable": False, "cantidad": cantidad}
+    data.add_movement_to_db([item], id_proyecto, "Responsable")
+
+
+def _salida(id_proyecto, cantidad):
+    item = {"id_articulo": 1, "nombre_item": "Tubo", "es_cable": False, "cantidad": cantidad, "id_punta": None}
+    data.add_salida_to_db([item], id_proyecto, "Responsable")
+
+
+def _rollup_rows(db):
+    with db.connect() as connection:
+        return sorted(
+            (row.id_proyecto, row.tipo_movimiento.value, row.cantidad)
+            for row in connection.execute(select(ResumenMovimientosDiario.__table__))
+        )
+
+
+def test_movements_of_the_same_day_are_summed_into_one_row(db):
+    _setup(db)
+    _entrada(1, 5)
+    _entrada(1, 3)
+    _salida(1, 2)
+    _entrada(None, 7)  # Sin proyecto: no entra al resumen.
+
+    assert _rollup_rows(db) == [(1, "entrada", 8.0), (1, "salida", 2.0)]
+
+    with db.begin() as connection:
+        rebuild_rollup(connection)
+    assert _rollup_rows(db) == [(1, "entrada", 8.0), (1, "salida", 2.0)]
+
+
+def test_comparison_follows_an_edited_cost_center(db):
+    _setup(db)
+    _entrada(1, 5)
+    _salida(2, 1)
+
+    session = utils.get_session(shared=False)
+    session.get(Proyectos, 1).c_c = 300
+    session.commit()
+    session.close()
+    data.clear_cached_reference_data()
+
+    comparacion = data.get_comparacion_data(cc_selected=[300])
+    assert [(row["c_c"], row["total_entrada"]) for row in comparacion] == [(300, 5.0)]
+    assert data.get_comparacion_data(cc_selected=[100]) == []
+
+
+def test_comparison_only_filters_dates_when_both_are_given(db):
+    _setup(db)
+    _entrada(1, 5)
+
+    assert len(data.get_comparacion_data("2000-01-01", None)) == 1
+    assert len(data.get_comparacion_data(None, "2000-01-01")) == 1
+    assert data.get_comparacion_data("2000-01-01", "2000-01-02") == []
+
+
+def test_migration_rekeys_an_old_rollup_by_project(db):
+    _setup(db)
+    _entrada(2, 4)
+    with db.begin() as connection:
+        connection.execute(text("DROP TABLE resumen_movimientos_diario"))
+        connection.execute(text(
+            "CREATE TABLE resumen_movimientos_diario ("
+            "c_c INTEGER NOT NULL, id_articulo INTEGER NOT NULL, "
+            "tipo_movimiento VARCHAR(7) NOT NULL, dia DATE NOT NULL, "
+            "cantidad FLOAT NOT NULL DEFAULT 0, "
+            "PRIMARY KEY (c_c, id_articulo, tipo_movimiento, dia))"
+        ))
+
+    with db.begin() as connection:
+        migrations._m005_resumen_por_proyecto(connection)
+        columns = {c["name"] for c in inspect(connection).get_columns("resumen_movimientos_diario")}
+        total = connection.execute(
+            select(func.count()).select_from(ResumenMovimientosDiario.__table__)
+        ).scalar()
+
+    assert "c_c" not in columns and "id_proyecto" in columns
+    assert total == 1
+    assert _rollup_rows(db) == [(2, "entrada", 4.0)]
@@ -0,0 +1,47 @@
+from search import ArticleSearchIndex
+
+ARTICULOS = [
+    (1, "Cemento para albañilería", "CEM-50"),
+    (2, "Cal para ALBANILERIA", "CAL-25"),
+    (3, "Arena fina", "ALBA-3"),
+    (4, "Tubo conduit 1/2", "TC-12"),
+    (5, "Tubo conduit 3/4", "TC-34"),
+    (6, "Cinta aislante", "CA-9"),
+]
+
+
+def _index():
+    return ArticleSearchIndex(ARTICULOS)
+
+
+def test_search_ignores_case_and_accents():
+    index = _index()
+
+    assert sorted(index.search("albañilería")) == [1, 2]
+    assert sorted(index.search("ALBANILERIA")) == [1, 2]
+    assert sorted(index.search("Albañil")) == [1, 2]
+
+
+def test_search_matches_num_catalogo():
+    index = _index()
+
+    assert index.search("TC-34") == [5]
+    assert index.search("cem-50") == [1]
+    # "alba" coincide con el catálogo de la arena y con el nombre de dos artículos.
+    assert sorted(index.search("alba")) == [1, 2, 3]
+
+
+def test_search_returns_at_most_limit_results_in_relevance_order():
+    index = _index()
+
+    assert index.search("tubo", limit=1) == [4]
+    assert index.search("tubo conduit", limit=None) == [4, 5]
+    assert len(index.search("", limit=3)) == 3
+    assert len(index.search("", limit=None)) == len(ARTICULOS)
+
+
+def test_fuzzy_results_only_when_requested():
+    index = _index()
+
+    assert index.search("cemneto") == []
+    assert index.search("cemneto", fuzzy=True)[0] == 1